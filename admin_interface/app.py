@@ -310,6 +310,23 @@ def save_config():
 
 # ============= API BACS (WASTE MANAGEMENT) ============= 
 
+def _classifier():
+    """waste_classifier avec sa base ouverte une seule fois pour tout le processus admin
+    (connexions partagées entre les requêtes, fermées à l'arrêt)"""
+    import sys
+    import atexit
+    from pathlib import Path
+    src_dir = Path(__file__).resolve().parent.parent / 'src'
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
+    
+    import waste_classifier
+    if not waste_classifier.get_service().db_open:
+        waste_classifier.init_database()
+        atexit.register(waste_classifier.cleanup)
+    return waste_classifier
+
+
 @app.route('/api/bins/status')
 def bins_status():
     """Récupère l'état des bacs (remplissage, items, dernière vidange)"""
@@ -319,8 +336,7 @@ def bins_status():
         src_dir = Path(__file__).resolve().parent.parent / 'src'
         sys.path.insert(0, str(src_dir))
         
-        import waste_classifier
-        waste_classifier.init_database()
+        waste_classifier = _classifier()
         
         bins = waste_classifier.get_bin_status()
         
@@ -338,8 +354,6 @@ def bins_status():
                 'needs_emptying': fill_percent > 80
             })
         
-        waste_classifier.cleanup()
-        
         return jsonify({
             'success': True,
             'bins': data,
@@ -360,8 +374,7 @@ def bins_history():
         
         limit = request.args.get('limit', 50, type=int)
         
-        import waste_classifier
-        waste_classifier.init_database()
+        waste_classifier = _classifier()
         
         history = waste_classifier.get_detection_history(limit)
         
@@ -375,8 +388,6 @@ def bins_history():
                 'confidence': float(confidence)
             })
         
-        waste_classifier.cleanup()
-        
         return jsonify({
             'success': True,
             'history': data,
@@ -395,13 +406,10 @@ def empty_bin(bin_color):
         src_dir = Path(__file__).resolve().parent.parent / 'src'
         sys.path.insert(0, str(src_dir))
         
-        import waste_classifier
-        waste_classifier.init_database()
+        waste_classifier = _classifier()
         
         result = waste_classifier.empty_bin(bin_color)
         
-        waste_classifier.cleanup()
-        
         if result:
             return jsonify({
                 'success': True,
@@ -432,8 +440,7 @@ def waste_classify():
         if not item_name:
             return jsonify({'success': False, 'error': 'item_name requis'})
         
-        import waste_classifier
-        waste_classifier.init_database()
+        waste_classifier = _classifier()
         
         bin_color = waste_classifier.classify_and_sort(
             item_name, 
@@ -442,8 +449,6 @@ def waste_classify():
             confidence=confidence
         )
         
-        waste_classifier.cleanup()
-        
         if bin_color:
             return jsonify({
                 'success': True,
@@ -459,24 +464,264 @@ def waste_classify():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# ============= API ÉTIQUETAGE (MODE APPRENTISSAGE) ============= 
+
+@app.route('/api/labeling/pending')
+def labeling_pending():
+    """Demandes d'étiquetage en attente (détections à confirmer, objets sans bac)"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        limit = request.args.get('limit', 50, type=int)
+        
+        _classifier()
+        import labeling_queue
+        from config import VALID_BINS
+        
+        entries = labeling_queue.list_pending(limit)
+        total = labeling_queue.pending_count()
+        
+        for entry in entries:
+            entry['image_url'] = f"/api/labeling/{entry['id']}/image" if entry['frame_path'] else None
+        
+        return jsonify({
+            'success': True,
+            'pending': entries,
+            'count': len(entries),
+            'total': total,
+            'bins': list(VALID_BINS)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/labeling/<int:entry_id>/image')
+def labeling_image(entry_id):
+    """Image JPEG d'une demande d'étiquetage"""
+    try:
+        import sys
+        from pathlib import Path
+        from flask import send_file
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        _classifier()
+        import labeling_queue
+        
+        path = labeling_queue.frame_file(labeling_queue.get_entry(entry_id))
+        
+        if path is None:
+            return jsonify({'success': False, 'error': f'Image de la demande {entry_id} introuvable'}), 404
+        return send_file(str(path), mimetype='image/jpeg')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/labeling/<int:entry_id>/resolve', methods=['POST'])
+def labeling_resolve(entry_id):
+    """Répondre à une demande : {"label": "...", "bin_color": "..."} (bac optionnel sauf objet inconnu)"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        data = request.get_json(silent=True) or {}
+        
+        _classifier()
+        import labeling_queue
+        
+        ok, message = labeling_queue.resolve(entry_id, data.get('label'), data.get('bin_color'))
+        
+        if ok:
+            return jsonify({'success': True, 'message': message, 'id': entry_id})
+        return jsonify({'success': False, 'error': message})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/api/labeling/<int:entry_id>/skip', methods=['POST'])
+def labeling_skip(entry_id):
+    """Ignorer une demande d'étiquetage"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        _classifier()
+        import labeling_queue
+        
+        ok, message = labeling_queue.skip(entry_id)
+        
+        if ok:
+            return jsonify({'success': True, 'message': message, 'id': entry_id})
+        return jsonify({'success': False, 'error': message})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 # ============= API CAMÉRA ============= 
 
 @app.route('/api/camera/status')
 def camera_status():
-    """Récupère le statut de la caméra"""
+    """Statut de la caméra, lu dans l'anneau d'images partagé du détecteur"""
     try:
-        # TODO: Intégrer avec le code caméra réel
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        import frame_ring
+        try:
+            reader = frame_ring.FrameRingReader()
+        except FileNotFoundError:
+            return jsonify({
+                'success': True,
+                'connected': False,
+                'message': 'Détecteur non démarré'
+            })
+        
+        status = reader.status()
+        reader.close()
+        
+        last_frame = status['last_frame_time']
+        age = datetime.now().timestamp() - last_frame if last_frame else None
         return jsonify({
             'success': True,
-            'connected': True,
-            'resolution': '1920x1080',
-            'fps': 30,
-            'device': '/dev/video0',
-            'last_frame': datetime.now().isoformat()
+            'connected': age is not None and age < 5,
+            'resolution': f"{status['width']}x{status['height']}",
+            'fps': status['fps'],
+            'device': status['source'],
+            'frames': status['frames'],
+            'detector_pid': status['pid'],
+            'last_frame': datetime.fromtimestamp(last_frame).isoformat() if last_frame else None,
+            'last_frame_age_seconds': round(age, 2) if age is not None else None
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e), 'connected': False})
 
+
+@app.route('/api/camera/snapshot.jpg')
+def camera_snapshot():
+    """Dernière image du détecteur (JPEG), lue dans l'anneau partagé"""
+    try:
+        import sys
+        from pathlib import Path
+        from flask import Response
+        import cv2
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        import frame_ring
+        try:
+            reader = frame_ring.FrameRingReader()
+        except FileNotFoundError:
+            return jsonify({'success': False, 'error': 'Détecteur non démarré'}), 503
+        
+        view = reader.read_latest()
+        frame = view.copy() if view is not None else None
+        del view
+        reader.close()
+        
+        if frame is None:
+            return jsonify({'success': False, 'error': 'Aucune image disponible'}), 503
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        return Response(encoded.tobytes(), mimetype='image/jpeg')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ============= API DÉTECTEUR ============= 
+
+@app.route('/api/detector/metrics')
+def detector_metrics():
+    """Latences par étape (p50/p90/p99), compteurs et jauges exportés par le détecteur"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        import metrics
+        data = metrics.read_snapshot()
+        
+        if data is None:
+            return jsonify({
+                'success': False,
+                'error': 'Détecteur non démarré (aucune métrique exportée)'
+            })
+        
+        return jsonify({
+            'success': True,
+            'metrics': data,
+            'age_seconds': round(datetime.now().timestamp() - data.get('updated_at', 0), 1)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/detector/stream')
+def detector_stream():
+    """Redirige vers le flux MJPEG du détecteur (mode sans écran)"""
+    import sys
+    from pathlib import Path
+    from flask import redirect
+    src_dir = Path(__file__).resolve().parent.parent / 'src'
+    sys.path.insert(0, str(src_dir))
+    
+    from config import STREAM_PORT
+    host = request.host.split(':')[0]
+    return redirect(f'http://{host}:{STREAM_PORT}/stream.mjpg')
+
+@app.route('/api/detector/reload', methods=['POST'])
+def detector_reload():
+    """Demande au détecteur de recharger le modèle à chaud (best.pt ou un .pt de src/models)"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        import model_reloader
+        data = request.get_json(silent=True) or {}
+        model_path = data.get('model_path')
+        if model_path:
+            try:
+                model_path = str(model_reloader.model_file(model_path))
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        
+        model_reloader.request_reload(model_path)
+        return jsonify({
+            'success': True,
+            'message': 'Rechargement demandé (voir model_reloads dans /api/detector/metrics)'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/detector/shadow')
+def detector_shadow():
+    """Résumé de l'évaluation du modèle candidat (accord, écarts de confiance, latences)"""
+    try:
+        import sys
+        from pathlib import Path
+        src_dir = Path(__file__).resolve().parent.parent / 'src'
+        sys.path.insert(0, str(src_dir))
+        
+        import shadow_eval
+        summary = shadow_eval.summarize(all_sessions=request.args.get('all') == '1')
+        
+        if summary is None:
+            return jsonify({
+                'success': False,
+                'error': 'Aucune évaluation (SHADOW_MODEL_PATH non configuré)'
+            })
+        
+        return jsonify({'success': True, 'shadow': summary})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 # ============= API ARDUINO ============= 
 
 @app.route('/api/arduino/status')
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Smart Bin SI - Comparaison des backends d'inférence
+Exécute torch et ONNX (et OpenVINO si demandé) sur les mêmes images et affiche les FPS.
+Usage : python3 scripts/benchmark_backends.py [--source video.mp4|dossier/] [--frames 100] [--openvino]
+        python3 scripts/benchmark_backends.py --pool   (choisit INFERENCE_WORKERS pour INFERENCE_WORKERS = 0)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import cv2
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def load_frames(source, count):
+    """Charge `count` images depuis un dossier, une vidéo ou la caméra."""
+    path = Path(str(source))
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+        frames = [cv2.imread(str(p)) for p in files[:count]]
+        return [f for f in frames if f is not None]
+
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else str(source))
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def main():
+    from config import MODEL_PATH, CAMERA_SOURCE
+    import inference_backends
+
+    parser = argparse.ArgumentParser(description="Compare les FPS des backends YOLO")
+    parser.add_argument("--source", default=CAMERA_SOURCE, help="Vidéo, dossier d'images ou index caméra")
+    parser.add_argument("--frames", type=int, default=100, help="Nombre d'images")
+    parser.add_argument("--openvino", action="store_true", help="Inclure OpenVINO")
+    parser.add_argument("--pool", action="store_true",
+                        help="Comparer 1 processus et des pools de N processus (backend configuré)")
+    args = parser.parse_args()
+
+    if args.pool:
+        return benchmark_pool()
+
+    print("Smart Bin SI - Benchmark backends\n" + "=" * 50)
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f"✗ Aucune image lue depuis {args.source}")
+        return 1
+    print(f"✓ {len(frames)} images chargées ({frames[0].shape[1]}x{frames[0].shape[0]})\n")
+
+    backends = [inference_backends.TorchBackend, inference_backends.OnnxBackend]
+    if args.openvino:
+        backends.append(inference_backends.OpenVinoBackend)
+
+    results = []
+    for backend_class in backends:
+        try:
+            backend = backend_class(MODEL_PATH)
+        except Exception as e:
+            print(f"⚠ {backend_class.name} : {e}")
+            continue
+        results.append(inference_backends.benchmark(backend, frames))
+
+    print("\n" + "=" * 50)
+    print(f"{'Backend':10} {'FPS':>8} {'Latence (ms)':>14} {'Détections':>12}")
+    for r in results:
+        print(f"{r['backend']:10} {r['fps']:8.1f} {r['latency_ms']:14.1f} {r['detections']:12}")
+    return 0
+
+
+def benchmark_pool():
+    """Refaire le choix du nombre de processus d'inférence (cache mis à jour)."""
+    from config import (
+        MODEL_PATH, INFERENCE_BACKEND, INFERENCE_PRECISION, FRAME_HEIGHT, FRAME_WIDTH,
+    )
+    import inference_backends
+    import inference_pool
+
+    print("Smart Bin SI - Benchmark pool d'inférence\n" + "=" * 50)
+    backend = inference_backends.create_backend(INFERENCE_BACKEND, MODEL_PATH, INFERENCE_PRECISION)
+    inference_pool.select_workers(
+        backend, INFERENCE_BACKEND, MODEL_PATH, INFERENCE_PRECISION, (FRAME_HEIGHT, FRAME_WIDTH)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
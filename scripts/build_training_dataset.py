@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Smart Bin SI - Construction du dataset YOLO depuis data/training_images/
+Incrémental : seuls les dossiers de classe modifiés depuis le dernier build sont relus.
+Usage : python3 scripts/build_training_dataset.py [--rebuild] [--val 0.2] [--img-size 640] [--workers 4]
+Puis : yolo train model=models/best.pt data=src/data/dataset/data.yaml epochs=50 imgsz=640
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def main():
+    from config import (
+        MODEL_PATH, TRAINING_DIR, DATASET_DIR, DATASET_VAL_RATIO, DATASET_IMG_SIZE,
+        DATASET_WORKERS,
+    )
+    import dataset_builder
+
+    parser = argparse.ArgumentParser(description="Construit le dataset YOLO (train/val + data.yaml)")
+    parser.add_argument("--source", default=str(TRAINING_DIR), help="Images d'apprentissage")
+    parser.add_argument("--out", default=str(DATASET_DIR), help="Dossier du dataset")
+    parser.add_argument("--model", default=MODEL_PATH, help="Modèle dont on garde les index de classes")
+    parser.add_argument("--val", type=float, default=DATASET_VAL_RATIO, help="Part en validation")
+    parser.add_argument("--img-size", type=int, default=DATASET_IMG_SIZE,
+                        help="Côté max des images (0 = taille d'origine, lien en dur)")
+    parser.add_argument("--workers", type=int, default=DATASET_WORKERS, help="Processus (0 = auto)")
+    parser.add_argument("--rebuild", action="store_true", help="Tout reconstruire")
+    args = parser.parse_args()
+
+    print("Smart Bin SI - Construction du dataset\n" + "=" * 50)
+    model_names = dataset_builder.model_class_names(args.model)
+    if model_names is None:
+        print(f"⚠ {args.model} absent : classes numérotées dans l'ordre alphabétique")
+    else:
+        print(f"✓ {len(model_names)} classes du modèle ({Path(args.model).name})")
+
+    stats = dataset_builder.build_dataset(
+        source=args.source, out_dir=args.out, model_names=model_names,
+        val_ratio=args.val, img_size=args.img_size, workers=args.workers,
+        rebuild=args.rebuild,
+    )
+
+    print(f"\nDossiers relus : {stats['scanned_folders']} (inchangés : {stats['skipped_folders']})")
+    print(f"Images : +{stats['added']} ajoutées, {stats['updated']} mises à jour, "
+          f"-{stats['removed']} retirées, {stats['unchanged']} inchangées")
+    print(f"Ignorées : {stats['unlabeled']} sans label, {stats['invalid']} invalides")
+    print(f"Écriture : {stats['link']} liens, {stats['copy']} copies, {stats['resize']} redimensionnées")
+    print(f"\n✓ Dataset : {stats['train']} train / {stats['val']} val, {stats['classes']} classes "
+          f"en {stats['elapsed_s']:.2f} s")
+    print(f"   data.yaml : {Path(args.out) / 'data.yaml'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Smart Bin SI - Préparation du cache local des modèles (à lancer une fois, avec réseau)
+- Copie locale du dépôt YOLOv5 (torch.hub sans accès réseau au démarrage)
+- Poids YOLOv5s COCO (secours si best.pt absent)
+- Export ONNX de best.pt si le backend ONNX / OpenVINO est configuré
+Usage : python3 scripts/prepare_models.py [--force]
+"""
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+YOLOV5_REPO_URL = "https://github.com/ultralytics/yolov5"
+YOLOV5S_URL = "https://github.com/ultralytics/yolov5/releases/download/v7.0/yolov5s.pt"
+
+
+def ok(msg):
+    print("   ✓", msg)
+
+
+def warn(msg):
+    print("   ⚠", msg)
+
+
+def prepare_repo(repo_dir, force=False):
+    """Clone le dépôt YOLOv5 (ou copie le cache torch.hub si git absent)."""
+    if (repo_dir / "hubconf.py").exists() and not force:
+        ok(f"Dépôt YOLOv5 déjà présent : {repo_dir}")
+        return True
+    if repo_dir.exists():
+        shutil.rmtree(repo_dir)
+
+    result = subprocess.run(
+        ["git", "clone", "--depth", "1", YOLOV5_REPO_URL, str(repo_dir)],
+        capture_output=True, text=True
+    )
+    if result.returncode == 0:
+        ok(f"Dépôt YOLOv5 cloné : {repo_dir}")
+        return True
+
+    warn("git clone impossible - copie depuis le cache torch.hub")
+    import torch
+    torch.hub.load("ultralytics/yolov5", "yolov5s", pretrained=False)
+    hub_repo = Path(torch.hub.get_dir()) / "ultralytics_yolov5_master"
+    if not hub_repo.exists():
+        warn(f"Cache torch.hub introuvable : {hub_repo}")
+        return False
+    shutil.copytree(hub_repo, repo_dir)
+    ok(f"Dépôt YOLOv5 copié : {repo_dir}")
+    return True
+
+
+def prepare_fallback_weights(weights_path, force=False):
+    """Télécharge les poids YOLOv5s COCO."""
+    weights_path = Path(weights_path)
+    if weights_path.exists() and not force:
+        ok(f"Poids YOLOv5s déjà présents : {weights_path}")
+        return True
+    import torch
+    torch.hub.download_url_to_file(YOLOV5S_URL, str(weights_path))
+    ok(f"Poids YOLOv5s téléchargés : {weights_path}")
+    return True
+
+
+def main():
+    from config import (
+        MODEL_PATH, YOLOV5_REPO_DIR, FALLBACK_MODEL_PATH, INFERENCE_BACKEND,
+    )
+    import inference_backends
+
+    force = "--force" in sys.argv
+    print("Smart Bin SI - Préparation des modèles\n" + "=" * 50)
+
+    print("\n[1] Dépôt YOLOv5 local")
+    repo_ok = prepare_repo(YOLOV5_REPO_DIR, force)
+
+    print("\n[2] Poids de secours YOLOv5s")
+    prepare_fallback_weights(FALLBACK_MODEL_PATH, force)
+
+    print("\n[3] Export ONNX")
+    if INFERENCE_BACKEND == "torch":
+        ok("Backend torch : pas d'export nécessaire")
+    elif not Path(MODEL_PATH).exists():
+        warn(f"{MODEL_PATH} absent : export au premier best.pt")
+    else:
+        inference_backends.ensure_onnx(MODEL_PATH)
+        ok("Modèle ONNX à jour")
+
+    print("\n[4] Vérification du chargement hors ligne")
+    if not repo_ok:
+        warn("Dépôt YOLOv5 manquant : le chargement utilisera le réseau")
+        return 1
+    start = time.perf_counter()
+    backend = inference_backends.create_backend(INFERENCE_BACKEND, MODEL_PATH)
+    ok(f"Backend {backend.name} chargé en {time.perf_counter() - start:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Smart Bin SI - Rapport de quantification (INT8 / FP16 contre FP32)
+1. Calibre un modèle INT8 ONNX sur la moitié des images de TRAINING_DIR
+2. Compare INT8 (et FP16 si GPU) au FP32 sur l'autre moitié : accord, mAP@0.5, latence
+3. Autorise l'INT8 si l'accord atteint QUANT_MIN_AGREEMENT
+   (à activer ensuite avec INFERENCE_PRECISION = "int8" et INFERENCE_BACKEND = "onnx")
+Usage : python3 scripts/quantization_report.py [--images 200] [--min-agreement 0.95]
+        [--allow-lower-threshold] [--fp16] [--json rapport.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def print_row(label, report):
+    print(f"{label:14} {report['agreement']:>9.3f} {report['map50_vs_fp32']:>9.3f} "
+          f"{report['precision']:>9.3f} {report['recall']:>9.3f} "
+          f"{report['candidate_p50_ms']:>9.1f} {report['speedup']:>8.2f}x")
+
+
+def main():
+    from config import MODEL_PATH, QUANT_CALIBRATION_IMAGES, QUANT_MIN_AGREEMENT
+    import inference_backends
+    import quantization
+
+    parser = argparse.ArgumentParser(description="Compare INT8 / FP16 au FP32")
+    parser.add_argument("--images", type=int, default=QUANT_CALIBRATION_IMAGES,
+                        help="Images de TRAINING_DIR (moitié calibration, moitié évaluation)")
+    parser.add_argument("--min-agreement", type=float, default=QUANT_MIN_AGREEMENT,
+                        help="Accord minimum avec le FP32 pour autoriser l'INT8")
+    parser.add_argument("--allow-lower-threshold", action="store_true",
+                        help="Accepter --min-agreement sous QUANT_MIN_AGREEMENT "
+                             "(rapport seulement : le détecteur garde le seuil de config.py)")
+    parser.add_argument("--fp16", action="store_true", help="Comparer aussi torch FP16 (GPU)")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+    if args.min_agreement < QUANT_MIN_AGREEMENT and not args.allow_lower_threshold:
+        parser.error(f"--min-agreement {args.min_agreement} < QUANT_MIN_AGREEMENT "
+                     f"({QUANT_MIN_AGREEMENT}) : ajouter --allow-lower-threshold")
+
+    print("Smart Bin SI - Rapport de quantification\n" + "=" * 50)
+    if not Path(MODEL_PATH).exists():
+        print(f"✗ {MODEL_PATH} absent : entraîner le modèle d'abord")
+        return 1
+
+    paths = quantization.training_images(limit=args.images)
+    calibration, evaluation = quantization.split_images(paths)
+    frames = quantization.load_images(evaluation)
+    if len(calibration) < 10 or not frames:
+        print(f"✗ Pas assez d'images d'apprentissage ({len(paths)}) : en sauvegarder d'abord")
+        return 1
+    print(f"✓ {len(calibration)} images de calibration, {len(frames)} images d'évaluation\n")
+
+    quantization.quantize_onnx(MODEL_PATH, calibration)
+    fp32 = inference_backends.OnnxBackend(MODEL_PATH)
+    int8 = inference_backends.OnnxBackend(MODEL_PATH, precision="int8")
+    reports = {"int8": quantization.compare(fp32, int8, frames)}
+
+    if args.fp16:
+        torch_fp32 = inference_backends.TorchBackend(MODEL_PATH)
+        torch_fp16 = inference_backends.TorchBackend(MODEL_PATH, precision="fp16")
+        if torch_fp16.precision == "fp16":
+            reports["fp16"] = quantization.compare(torch_fp32, torch_fp16, frames)
+
+    approved = quantization.record_approval(MODEL_PATH, reports["int8"], args.min_agreement)
+
+    print("\n" + "=" * 50)
+    print(f"FP32 ONNX : {reports['int8']['reference_p50_ms']:.1f} ms (p50)\n")
+    print(f"{'Modèle':14} {'Accord':>9} {'mAP50':>9} {'Précision':>9} {'Rappel':>9} "
+          f"{'p50 (ms)':>9} {'Gain':>9}")
+    print_row("INT8 (ONNX)", reports["int8"])
+    if "fp16" in reports:
+        print_row("FP16 (torch)", reports["fp16"])
+
+    print()
+    if approved:
+        print(f"✓ INT8 autorisé (accord {reports['int8']['agreement']:.3f} ≥ {args.min_agreement})")
+        if reports["int8"]["agreement"] < QUANT_MIN_AGREEMENT:
+            print(f"   ⚠ Sous QUANT_MIN_AGREEMENT ({QUANT_MIN_AGREEMENT}) : "
+                  "le détecteur reste en FP32")
+        else:
+            print('   Activer : INFERENCE_BACKEND = "onnx" et INFERENCE_PRECISION = "int8"')
+    else:
+        print(f"✗ INT8 refusé (accord {reports['int8']['agreement']:.3f} < {args.min_agreement})")
+        print("   Le détecteur reste en FP32 même si INFERENCE_PRECISION = \"int8\"")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"approved": approved, "agreement": reports["int8"]["agreement"],
+                       "min_agreement": args.min_agreement, "reports": reports}, f, indent=2)
+        print(f"\n💾 Rapport écrit : {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Smart Bin SI - Worker d'actionneur (tri non bloquant)
+Un thread unique possède l'envoi des commandes de tri : la boucle caméra
+dépose un job et continue pendant que le mécanisme bouge.
+"""
+
+import threading
+from collections import deque
+
+# Résultats de submit()
+ACCEPTED = "accepted"      # Job ajouté à la file
+COALESCED = "coalesced"    # Même bac déjà en cours ou en attente : fusionné
+REJECTED = "rejected"      # File pleine : job refusé
+
+
+class ActuatorWorker:
+    """
+    Exécute les jobs de tri un par un dans un thread dédié.
+
+    Un job pour un bac déjà en cours de tri (ou en attente) est fusionné :
+    pendant que le mécanisme bouge, la caméra voit encore le même objet.
+    """
+
+    def __init__(self, job_fn, max_pending=1):
+        """
+        Args:
+            job_fn: Fonction bin_color -> None, bloquante pendant le tri
+            max_pending: Nombre de jobs en attente max derrière le tri en cours
+        """
+        self.job_fn = job_fn
+        self.max_pending = max_pending
+        self.current = None
+        self.completed = 0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """Démarre le thread de l'actionneur."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="actuator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Arrête le thread après le tri en cours (les jobs en attente sont abandonnés).
+
+        Args:
+            timeout: Attente max en secondes (None = jusqu'à la fin du tri)
+        """
+        with self._cond:
+            self._stopping = True
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def busy(self):
+        """True si un tri est en cours ou en attente."""
+        with self._cond:
+            return self.current is not None or bool(self._pending)
+
+    def can_accept(self, bin_color):
+        """True si submit(bin_color) ne serait pas refusé."""
+        with self._cond:
+            return self._decide(bin_color) != REJECTED
+
+    def submit(self, bin_color):
+        """
+        Dépose un job de tri sans bloquer.
+
+        Retourne:
+            str: ACCEPTED, COALESCED ou REJECTED
+        """
+        with self._cond:
+            decision = self._decide(bin_color)
+            if decision == ACCEPTED:
+                self._pending.append(bin_color)
+                self._cond.notify()
+            return decision
+
+    def _decide(self, bin_color):
+        if self._stopping:
+            return REJECTED
+        if bin_color == self.current or bin_color in self._pending:
+            return COALESCED
+        in_flight = len(self._pending) + (self.current is not None)
+        if in_flight < 1 + self.max_pending:
+            return ACCEPTED
+        return REJECTED
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                self.current = self._pending.popleft()
+            try:
+                self.job_fn(self.current)
+            except Exception as e:
+                print(f"⚠ Erreur actionneur : {e}")
+            finally:
+                with self._cond:
+                    self.current = None
+                    self.completed += 1
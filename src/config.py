@@ -12,19 +12,50 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 TRAINING_DIR = DATA_DIR / "training_images"
 DB_PATH = DATA_DIR / "waste_items.db"
+LABELING_DIR = DATA_DIR / "labeling"                 # Images en attente d'étiquetage (admin)
+DATASET_DIR = DATA_DIR / "dataset"                   # Dataset YOLO généré (images/, labels/, data.yaml)
 MODELS_DIR = BASE_DIR / "models"
+TRAINING_MANIFEST = TRAINING_DIR / "manifest.jsonl"  # Index des images sauvegardées
+METRICS_PATH = DATA_DIR / "detector_metrics.json"    # Métriques exportées par le détecteur
+METRICS_EXPORT_INTERVAL = 1.0                        # Période d'export des métriques (s)
 
 # Création automatique des dossiers nécessaires
 DATA_DIR.mkdir(exist_ok=True)
 TRAINING_DIR.mkdir(exist_ok=True)
+LABELING_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(exist_ok=True)
 
 # ============================================
 # CONFIGURATION DU MODÈLE YOLO
 # ============================================
 MODEL_PATH = str(MODELS_DIR / "best.pt")  # Chemin vers le modèle YOLO entraîné
+YOLOV5_REPO_DIR = MODELS_DIR / "yolov5"   # Copie locale du dépôt torch.hub (chargement hors ligne)
+FALLBACK_MODEL_PATH = str(MODELS_DIR / "yolov5s.pt")  # YOLOv5s COCO en cache si best.pt absent
+WARMUP_RUNS = 2                           # Inférences à blanc avant la boucle caméra
 CONFIDENCE_THRESHOLD = 0.6                # Seuil de confiance pour les détections
 IOU_THRESHOLD = 0.45                      # Seuil d'intersection sur union pour NMS
+CLASS_FILTER = None                       # Classes à garder (liste de noms), None = toutes
+INFERENCE_BACKEND = "torch"               # "torch", "onnx" (ONNX Runtime) ou "openvino" (CPU)
+ONNX_IMG_SIZE = 640                       # Taille d'entrée du modèle ONNX exporté (carré)
+ONNX_THREADS = 0                          # Threads CPU pour ONNX Runtime / OpenVINO (0 = auto)
+INFERENCE_PRECISION = "fp32"              # "fp32", "fp16" (torch + GPU) ou "int8" (ONNX quantifié validé)
+QUANT_CALIBRATION_IMAGES = 200            # Images de TRAINING_DIR pour calibrer / évaluer l'INT8
+QUANT_MIN_AGREEMENT = 0.95                # Accord min. avec le FP32 pour autoriser l'INT8
+INFERENCE_WORKERS = 1                     # Processus d'inférence (1 = dans le détecteur, 0 = choix auto par benchmark)
+INFERENCE_POOL_CACHE = MODELS_DIR / "inference_pool.json"  # Choix du benchmark par machine / modèle
+INFERENCE_POOL_BENCHMARK_FRAMES = 40      # Images du benchmark de choix automatique
+MODEL_RELOAD_ENABLED = True               # Recharger best.pt à chaud (fichier modifié ou commande)
+MODEL_RELOAD_INTERVAL = 5.0               # Période de contrôle de best.pt et du fichier commande (s)
+MODEL_RELOAD_COMMAND = DATA_DIR / "reload_model"  # Fichier commande (contenu optionnel : chemin du modèle)
+MODEL_RELOAD_MAX_SLOWDOWN = 1.5           # Latence max du nouveau modèle / ancien (au-delà : refusé)
+
+# ============================================
+# ÉVALUATION D'UN MODÈLE CANDIDAT (SHADOW)
+# ============================================
+SHADOW_MODEL_PATH = None                  # Modèle candidat évalué sur le trafic réel (ex. MODELS_DIR / "candidate.pt"), None = désactivé
+SHADOW_SAMPLE_EVERY = 10                  # Une inférence sur N est aussi passée au candidat
+SHADOW_LOG_PATH = DATA_DIR / "shadow_eval.jsonl"  # Comparaisons image par image (JSONL compact)
+SHADOW_LOG_MAX_BYTES = 5_000_000          # Au-delà, le journal est renommé en .1
 
 # ============================================
 # CONFIGURATION DE LA CAMÉRA
@@ -35,25 +66,113 @@ FRAME_WIDTH = 640        # Largeur de l'image capturée
 FRAME_HEIGHT = 480       # Hauteur de l'image capturée
 SHOW_DISPLAY = True      # Afficher la fenêtre de visualisation OpenCV
 
+# ============================================
+# APERÇU MJPEG (MODE SANS ÉCRAN)
+# ============================================
+HEADLESS = False            # Pas de fenêtre OpenCV (pas de session X) : aperçu via le flux MJPEG
+STREAM_ENABLED = True       # Publier les images annotées en MJPEG (encodées seulement si quelqu'un regarde)
+STREAM_HOST = "127.0.0.1"   # Adresse d'écoute ("0.0.0.0" = tout le réseau, flux sans authentification)
+STREAM_PORT = 5001          # Port du flux (l'interface admin est sur 5000)
+STREAM_MAX_FPS = 10         # Cadence max du flux, indépendante des FPS d'inférence
+STREAM_JPEG_QUALITY = 70    # Qualité JPEG du flux (0-100)
+
+# ============================================
+# CONFIGURATION DU PIPELINE
+# ============================================
+PIPELINE_MODE = True              # Capture / inférence / affichage dans des threads séparés
+PIPELINE_QUEUE_SIZE = 1           # Taille des files entre les étages du pipeline
+PIPELINE_DROP_POLICY = "latest"   # "latest" = garder l'image la plus récente, "block" = attendre
+FRAME_RING_ENABLED = True         # Publier images + détections en mémoire partagée (admin, enregistreur, ...)
+FRAME_RING_NAME = "smartbin_frames"  # Nom du segment de mémoire partagée
+FRAME_RING_SLOTS = 4              # Cases de l'anneau (un lecteur a N-1 images pour finir sa lecture)
+FRAME_RING_MAX_DETECTIONS = 32    # Détections gardées par image
+
+# ============================================
+# CONFIGURATION DU FILTRE DE MOUVEMENT
+# ============================================
+MOTION_GATING = True          # N'exécuter YOLO que si la scène change ou qu'un objet est suivi
+MOTION_FRAME_WIDTH = 160      # Largeur de la copie réduite utilisée pour le mouvement
+MOTION_PIXEL_THRESHOLD = 25   # Écart de niveau de gris pour qu'un pixel compte comme changé
+MOTION_MIN_AREA = 0.01        # Fraction de pixels changés pour lancer l'inférence
+MOTION_KEEPALIVE = 2.0        # Inférence forcée au moins toutes les N secondes
+
+# ============================================
+# RÉGULATEUR DE CADENCE (ACTIVITÉ / TEMPÉRATURE)
+# ============================================
+GOVERNOR_ENABLED = True           # Adapter cadence et taille d'entrée à l'activité et à la température
+GOVERNOR_ACTIVE_FPS = 0           # Inférences/s max quand un objet est suivi (0 = sans limite)
+GOVERNOR_IDLE_FPS = 4             # Inférences/s max quand la scène est vide
+GOVERNOR_ACTIVE_IMG_SIZE = 640    # Taille d'entrée YOLO en activité (backend torch uniquement)
+GOVERNOR_IDLE_IMG_SIZE = 320      # Taille d'entrée YOLO au repos et en surchauffe
+GOVERNOR_ACTIVE_HOLD = 3.0        # Secondes en mode actif après la dernière détection
+GOVERNOR_TEMP_LIMIT = 75.0        # °C : au-delà, la cadence est réduite
+GOVERNOR_CPU_LIMIT = 90.0         # % CPU : au-delà, la cadence est réduite
+GOVERNOR_HYSTERESIS = 5.0         # Marge (°C / %) sous les seuils pour rétablir la cadence
+GOVERNOR_THROTTLE_FACTOR = 0.5    # Multiplicateur de cadence en surchauffe
+GOVERNOR_SENSOR_INTERVAL = 2.0    # Période de lecture des capteurs (s)
+
+# ============================================
+# TESTS DE CHARGE SANS MATÉRIEL (caméra synthétique + backend "stub")
+# ============================================
+SYNTHETIC_FPS = 30                    # Cadence nominale de la scène synthétique
+SYNTHETIC_CLASSES = ["plastic_bottle", "banana_peel", "paper", "tissue"]  # Classes des objets simulés
+SYNTHETIC_OBJECTS_PER_MINUTE = 30     # Objets qui traversent l'image par minute
+SYNTHETIC_CROSSING_SECONDS = 2.0      # Durée de traversée d'un objet
+SYNTHETIC_OBJECT_SIZE = 90            # Côté moyen d'un objet (pixels)
+STUB_LATENCY_MS = 15.0                # Durée simulée d'une inférence du backend "stub"
+STUB_MISS_RATE = 0.05                 # Part des objets non détectés sur une image (déterministe)
+
 # ============================================
 # CONFIGURATION ARDUINO
 # ============================================
 ARDUINO_PORT = '/dev/ttyACM0'  # Port série pour la communication Arduino
 BAUD_RATE = 9600               # Vitesse de communication en bauds
 SORTING_DURATION = 10          # Durée d'attente pour le tri en secondes
+ACTUATOR_MAX_PENDING = 1       # Tris en attente max pendant qu'un tri est en cours
 
 # ============================================
 # CONFIGURATION DE L'APPRENTISSAGE
 # ============================================
 LEARNING_MODE = True      # Mode apprentissage : validation manuelle des détections
 SAVE_IMAGES = True        # Sauvegarder les images de détection
+TRAINING_WRITER_THREADS = 1  # Threads d'écriture des images (hors boucle caméra)
+TRAINING_QUEUE_SIZE = 16     # Images en attente d'écriture max (au-delà : ignorées)
+TRAINING_FSYNC_BATCH = 8     # Images écrites avant un fsync groupé
+TRAINING_JPEG_QUALITY = 95   # Qualité JPEG des images sauvegardées
+DEDUP_ENABLED = True         # Ne pas sauvegarder deux fois la même image (hash perceptuel dHash)
+DEDUP_HAMMING_THRESHOLD = 6  # Bits différents max (sur 64) pour considérer deux images identiques
+DEDUP_MODE = "skip"          # "skip" = garder l'ancienne image, "replace" = garder la plus récente
+DATASET_VAL_RATIO = 0.2      # Part des images en validation (split déterministe)
+DATASET_IMG_SIZE = 0         # Côté max des images du dataset (0 = taille d'origine, lien en dur)
+DATASET_WORKERS = 0          # Processus pour vérifier / redimensionner (0 = nombre de CPU)
+LABELING_ASYNC = True        # Confirmations via l'interface admin (False = invite console input())
+LABELING_MAX_PENDING = 200   # Étiquetages en attente max (au-delà : détection non proposée)
+LABELING_QUEUE_SIZE = 32     # Demandes en attente d'écriture (image + ligne SQLite) max
 MIN_DETECTIONS = 3        # Nombre minimum de détections consécutives avant tri
 AUTO_SORT_DELAY = 2.0     # Délai entre deux opérations de tri en secondes
 
+# ============================================
+# CONFIGURATION DU SUIVI D'OBJETS
+# ============================================
+TRACKER_TYPE = "iou"          # "iou" (association IoU) ou "kalman" (prédiction type SORT)
+TRACK_IOU_THRESHOLD = 0.3     # IoU min pour associer une détection à une piste
+TRACK_MAX_MISSES = 5          # Images sans détection avant d'oublier une piste
+TRACK_VOTE_RATIO = 0.6        # Part min des votes (pondérés par la confiance) pour la classe
+
 # ============================================
 # CONFIGURATION DES BACS DE TRI
 # ============================================
 VALID_BINS = ["yellow", "green", "brown"]  # Bacs de tri valides
+BIN_CACHE_CHECK_INTERVAL = 1.0             # Contrôle de la version objet → bac en DB (s)
+
+# Base SQLite (storage.py) : partagée par le détecteur et l'interface admin
+DB_JOURNAL_MODE = "WAL"       # WAL : lectures et écriture simultanées
+DB_SYNCHRONOUS = "NORMAL"     # NORMAL : sûr en WAL, fsync au checkpoint (FULL = à chaque commit)
+DB_BUSY_TIMEOUT_MS = 5000     # Attente max d'un verrou tenu par un autre processus
+DB_POOL_SIZE = 4              # Connexions gardées ouvertes par processus
+DB_CACHED_STATEMENTS = 64     # Requêtes préparées gardées par connexion
+DB_FLUSH_EVENTS = 50          # Détections gardées en mémoire avant une écriture groupée
+DB_FLUSH_INTERVAL_MS = 500    # Attente max avant l'écriture d'une détection (ms)
 
 # Mapping par défaut des objets détectés vers les bacs
 # jaune=recyclable, vert=organique, marron=déchets généraux
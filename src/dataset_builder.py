@@ -0,0 +1,321 @@
+"""
+Smart Bin SI - Construction incrémentale du dataset YOLO depuis TRAINING_DIR
+- Seuls les dossiers de classe modifiés (mtime) sont relus ; un fichier
+  inchangé (mtime + taille) n'est pas retraité
+- Images sans label et dossier _errors/ exclus
+- Split train/val déterministe (hash du chemin) : une image ne change jamais de côté
+- Identifiants de classe alignés sur model.names (nouvelles classes ajoutées à la fin)
+- Images liées en dur (hardlink) quand c'est possible, sinon copiées / redimensionnées
+- Vérifications et redimensionnement dans un pool de processus
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+
+try:
+    from config import (
+        TRAINING_DIR, DATASET_DIR, DATASET_VAL_RATIO, DATASET_IMG_SIZE, DATASET_WORKERS,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        TRAINING_DIR, DATASET_DIR, DATASET_VAL_RATIO, DATASET_IMG_SIZE, DATASET_WORKERS,
+    )
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+STATE_NAME = ".build_state.json"
+STATE_VERSION = 1
+
+
+# ============================================
+# NOMS DE CLASSES
+# ============================================
+
+def model_class_names(model_path):
+    """
+    Noms des classes du modèle {id: nom}
+    Lus dans best.onnx.json s'il correspond au .pt, sinon en chargeant le modèle.
+
+    Retourne:
+        dict ou None si le modèle est introuvable
+    """
+    from inference_backends import file_sha256, load_torch_model
+
+    model_path = Path(model_path)
+    if not model_path.exists():
+        return None
+    meta_path = model_path.with_suffix(".onnx.json")
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("source_sha256") == file_sha256(model_path):
+            return {int(k): v for k, v in meta["names"].items()}
+    names = load_torch_model(model_path).names
+    return names if isinstance(names, dict) else dict(enumerate(names))
+
+
+def merge_names(model_names, previous, classes):
+    """
+    Liste des classes du dataset : celles du modèle (mêmes index), puis les
+    classes déjà ajoutées lors d'un build précédent, puis les nouvelles.
+    Les noms du modèle sont normalisés comme les dossiers écrits par
+    training_writer ("Plastic Bottle" → "plastic_bottle") pour garder leur index.
+    """
+    if model_names:
+        names = [model_names[i].strip().lower().replace(" ", "_") for i in sorted(model_names)]
+    else:
+        names = []
+    for name in list(previous) + sorted(classes):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+# ============================================
+# TRAITEMENT D'UNE IMAGE (processus du pool)
+# ============================================
+
+def split_for(key, val_ratio):
+    """Split déterministe : même chemin → même côté, d'un build à l'autre."""
+    value = int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return "val" if value < val_ratio else "train"
+
+
+def read_label(label_path):
+    """Boîtes d'un label YOLO [(x, y, w, h), ...] (None si invalide ou vide)."""
+    try:
+        lines = label_path.read_text().split("\n")
+    except OSError:
+        return None
+    boxes = []
+    for line in lines:
+        values = line.split()
+        if not values:
+            continue
+        if len(values) != 5:
+            return None
+        try:
+            box = [float(v) for v in values[1:]]
+        except ValueError:
+            return None
+        if not all(0.0 <= v <= 1.0 for v in box) or box[2] <= 0 or box[3] <= 0:
+            return None
+        boxes.append(box)
+    return boxes or None
+
+
+def link_or_copy(src, dst):
+    """Lien en dur (pas de copie) ; copie si autre système de fichiers."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "link"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def process_image(task):
+    """
+    Vérifier une image + son label et l'écrire dans le dataset
+
+    Args:
+        task: (image, label, image_out, label_out, class_id, img_size)
+
+    Retourne:
+        (str, str): ("ok" | "invalid", "link" | "copy" | "resize" | raison)
+    """
+    image_path, label_path, image_out, label_out, class_id, img_size = task
+    boxes = read_label(Path(label_path))
+    if boxes is None:
+        return "invalid", "label"
+    image = cv2.imread(image_path)
+    if image is None:
+        return "invalid", "image"
+
+    image_out, label_out = Path(image_out), Path(label_out)
+    h, w = image.shape[:2]
+    if img_size and max(h, w) > img_size:
+        # Labels normalisés : pas besoin de les modifier
+        scale = img_size / max(h, w)
+        small = cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+        image_out.unlink(missing_ok=True)
+        cv2.imwrite(str(image_out), small)
+        mode = "resize"
+    else:
+        mode = link_or_copy(image_path, image_out)
+
+    # Label réécrit avec l'index de classe du dataset (nom du dossier)
+    label_out.write_text(
+        "".join(f"{class_id} {x:.6f} {y:.6f} {bw:.6f} {bh:.6f}\n" for x, y, bw, bh in boxes)
+    )
+    return "ok", mode
+
+
+def run_tasks(tasks, workers=DATASET_WORKERS):
+    """process_image sur toutes les tâches (pool de processus si assez de travail)."""
+    max_workers = workers or os.cpu_count() or 1
+    if len(tasks) < 32 or max_workers == 1:
+        return [process_image(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(process_image, tasks, chunksize=16))
+
+
+# ============================================
+# BUILD INCRÉMENTAL
+# ============================================
+
+def _load_state(out_dir, settings):
+    path = out_dir / STATE_NAME
+    if path.exists():
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") == STATE_VERSION and state.get("settings") == settings:
+            return state
+    return None
+
+
+def _remove_outputs(out_dir, record):
+    for rel in (record["image"], record["label"]):
+        (out_dir / rel).unlink(missing_ok=True)
+
+
+def write_data_yaml(out_dir, names):
+    """data.yaml Ultralytics / YOLOv5 (chemins relatifs à out_dir)."""
+    lines = [
+        f"path: {out_dir.resolve().as_posix()}",
+        "train: images/train",
+        "val: images/val",
+        f"nc: {len(names)}",
+        "names:",
+    ]
+    lines += [f"  {i}: {json.dumps(name, ensure_ascii=False)}" for i, name in enumerate(names)]
+    (out_dir / "data.yaml").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def build_dataset(source=TRAINING_DIR, out_dir=DATASET_DIR, model_names=None,
+                  val_ratio=DATASET_VAL_RATIO, img_size=DATASET_IMG_SIZE,
+                  workers=DATASET_WORKERS, rebuild=False):
+    """
+    Mettre à jour le dataset YOLO (images/, labels/, data.yaml)
+
+    Args:
+        source: Dossier des images d'apprentissage (TRAINING_DIR)
+        out_dir: Dossier du dataset
+        model_names: Noms des classes du modèle {id: nom} (index conservés)
+        val_ratio: Part des images en validation
+        img_size: Côté max des images (0 = taille d'origine, lien en dur)
+        workers: Processus du pool (0 = nombre de CPU)
+        rebuild: Tout refaire (ignorer l'état du build précédent)
+
+    Retourne:
+        dict: Statistiques du build
+    """
+    start = time.perf_counter()
+    source, out_dir = Path(source), Path(out_dir)
+    settings = {"source": str(source.resolve()), "val_ratio": val_ratio, "img_size": img_size}
+    state = None if rebuild else _load_state(out_dir, settings)
+    if state is None:
+        if out_dir.exists():
+            for sub in ("images", "labels"):
+                shutil.rmtree(out_dir / sub, ignore_errors=True)
+        state = {"version": STATE_VERSION, "settings": settings,
+                 "names": [], "folders": {}, "files": {}}
+    for sub in ("images/train", "images/val", "labels/train", "labels/val"):
+        (out_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    stats = {"scanned_folders": 0, "skipped_folders": 0, "added": 0, "updated": 0,
+             "removed": 0, "unchanged": 0, "unlabeled": 0, "invalid": 0,
+             "link": 0, "copy": 0, "resize": 0}
+
+    # 1. Dossiers de classe (hors _errors) ; seuls ceux modifiés sont relus
+    folders = {}
+    for entry in os.scandir(source) if source.exists() else []:
+        if entry.is_dir() and not entry.name.startswith(("_", ".")):
+            folders[entry.name] = entry.stat().st_mtime_ns
+    names = merge_names(model_names, state["names"], folders)
+    class_ids = {}
+    for i, name in enumerate(names):
+        class_ids.setdefault(name, i)  # Deux noms du modèle identiques une fois normalisés
+    names_changed = names[:len(state["names"])] != state["names"]
+
+    files = state["files"]
+    seen = set()
+    tasks, pending = [], []
+    for folder, mtime in sorted(folders.items()):
+        known = {key for key in files if key.split("/", 1)[0] == folder}
+        if not names_changed and state["folders"].get(folder) == mtime:
+            stats["skipped_folders"] += 1
+            seen.update(known)
+            stats["unchanged"] += len(known)
+            continue
+        stats["scanned_folders"] += 1
+
+        for entry in os.scandir(source / folder):
+            if Path(entry.name).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            key = f"{folder}/{entry.name}"
+            label_path = (source / key).with_suffix(".txt")
+            if not label_path.exists():
+                stats["unlabeled"] += 1
+                continue
+            seen.add(key)
+            image_stat = entry.stat()
+            label_stat = label_path.stat()
+            signature = [image_stat.st_mtime_ns, image_stat.st_size, label_stat.st_mtime_ns]
+            record = files.get(key)
+            if (record and record["signature"] == signature
+                    and record["class_id"] == class_ids[folder] and not names_changed):
+                stats["unchanged"] += 1
+                continue
+
+            split = split_for(key, val_ratio)
+            stem = f"{folder}__{Path(entry.name).stem}"
+            image_rel = f"images/{split}/{stem}{Path(entry.name).suffix.lower()}"
+            label_rel = f"labels/{split}/{stem}.txt"
+            if record:
+                _remove_outputs(out_dir, record)
+            tasks.append((str(source / key), str(label_path), str(out_dir / image_rel),
+                          str(out_dir / label_rel), class_ids[folder], img_size))
+            pending.append((key, {"signature": signature, "class_id": class_ids[folder],
+                                  "split": split, "image": image_rel, "label": label_rel},
+                            record is not None))
+        state["folders"][folder] = mtime
+
+    # 2. Fichiers disparus (supprimés, remplacés par la déduplication, dossier retiré)
+    for key in list(files):
+        if key not in seen:
+            _remove_outputs(out_dir, files.pop(key))
+            stats["removed"] += 1
+    for folder in list(state["folders"]):
+        if folder not in folders:
+            del state["folders"][folder]
+
+    # 3. Vérification / lien / redimensionnement en parallèle
+    for (key, record, existed), (status, detail) in zip(pending, run_tasks(tasks, workers)):
+        if status == "ok":
+            files[key] = record
+            stats["updated" if existed else "added"] += 1
+            stats[detail] += 1
+        else:
+            files.pop(key, None)
+            stats["invalid"] += 1
+
+    # 4. data.yaml + état pour le prochain build
+    state["names"] = names
+    write_data_yaml(out_dir, names)
+    tmp_path = out_dir / (STATE_NAME + ".tmp")
+    tmp_path.write_text(json.dumps(state), encoding="utf-8")
+    tmp_path.replace(out_dir / STATE_NAME)
+
+    stats["train"] = sum(1 for r in files.values() if r["split"] == "train")
+    stats["val"] = sum(1 for r in files.values() if r["split"] == "val")
+    stats["classes"] = len(names)
+    stats["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return stats
@@ -0,0 +1,184 @@
+"""
+Smart Bin SI - Pipeline capture / inférence en threads
+- Thread de capture : lit la caméra en continu (le buffer V4L2 ne se remplit plus)
+- Thread d'inférence : exécute YOLO sur l'image la plus récente
+  (ou garde plusieurs images en vol dans un pool de processus, résultats dans l'ordre)
+- Le thread principal garde l'affichage, le clavier et la décision de tri
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from metrics import metrics
+
+
+class FrameQueue:
+    """
+    File bornée entre deux étages du pipeline.
+    - policy "latest" : si la file est pleine, l'élément le plus ancien est jeté
+    - policy "block"  : le producteur attend qu'une place se libère
+    """
+
+    def __init__(self, maxsize=1, policy="latest"):
+        self._queue = queue.Queue(maxsize=max(1, maxsize))
+        self.policy = policy
+        self.dropped = 0
+
+    def put(self, item, stop_event=None):
+        """Ajoute un élément selon la politique de la file."""
+        if self.policy == "latest":
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        while stop_event is None or not stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, timeout=None):
+        """Retourne le prochain élément ou None si rien n'arrive avant timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class DetectionPipeline:
+    """
+    Capture → inférence → rendu/décision reliés par des files bornées.
+
+    Les résultats sont des tuples (frame_id, t_capture, frame, detections)
+    où t_capture vient de time.monotonic() (pour mesurer la latence).
+    """
+
+    def __init__(self, cap, infer_fn, queue_size=1, drop_policy="latest", pace_fn=None,
+                 max_in_flight=1):
+        """
+        Args:
+            cap: Source d'images (cv2.VideoCapture ou équivalent avec read())
+            infer_fn: Fonction frame -> détections (exécutée dans le thread d'inférence),
+                ou frame -> Future de détections si max_in_flight > 1
+            queue_size: Taille des files entre étages
+            drop_policy: "latest" ou "block"
+            pace_fn: Fonction appelée avant de prendre une image (régulation de cadence)
+            max_in_flight: Images envoyées sans attendre leur résultat (pool de processus)
+        """
+        self.cap = cap
+        self.infer_fn = infer_fn
+        self.pace_fn = pace_fn
+        self.max_in_flight = max(1, max_in_flight)
+        self.frames = FrameQueue(queue_size, drop_policy)
+        self.results = FrameQueue(queue_size, drop_policy)
+        self.stop_event = threading.Event()
+        self.error = None
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self._threads = []
+
+    def start(self):
+        """Démarre les threads de capture et d'inférence."""
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(
+                target=self._inference_loop if self.max_in_flight == 1 else self._pooled_inference_loop,
+                name="inference", daemon=True,
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Arrête les threads et attend leur fin."""
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    @property
+    def dropped(self):
+        """Nombre d'images jetées (capture + résultats)."""
+        return self.frames.dropped + self.results.dropped
+
+    def get_result(self, timeout=0.1):
+        """Retourne le dernier résultat d'inférence, ou None."""
+        return self.results.get(timeout=timeout)
+
+    def _capture_loop(self):
+        frame_id = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            metrics.observe("capture", time.perf_counter() - start)
+            if not ret:
+                self.error = "✗ Échec de lecture de l'image"
+                self.stop_event.set()
+                break
+            frame_id += 1
+            self.frames_captured += 1
+            self.frames.put((frame_id, time.monotonic(), frame), self.stop_event)
+
+    def _inference_loop(self):
+        while not self.stop_event.is_set():
+            # Attendre avant de prendre l'image : on infère sur la plus récente
+            if self.pace_fn is not None:
+                self.pace_fn()
+            item = self.frames.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, t_capture, frame = item
+            try:
+                detections = self.infer_fn(frame)
+            except Exception as e:
+                self.error = f"✗ Erreur d'inférence : {e}"
+                self.stop_event.set()
+                break
+            self.frames_inferred += 1
+            self.results.put((frame_id, t_capture, frame, detections), self.stop_event)
+
+    def _pooled_inference_loop(self):
+        # File des images en vol (ordre de capture) : le résultat de tête sort en premier
+        pending = deque()
+        while not self.stop_event.is_set():
+            if len(pending) < self.max_in_flight:
+                if self.pace_fn is not None:
+                    self.pace_fn()
+                item = self.frames.get(timeout=0.01 if pending else 0.1)
+                if item is not None:
+                    try:
+                        pending.append((item, self.infer_fn(item[2])))
+                    except Exception as e:
+                        self.error = f"✗ Erreur d'inférence : {e}"
+                        self.stop_event.set()
+                        break
+                    continue
+                if not pending or not pending[0][1].done():
+                    continue
+
+            (frame_id, t_capture, frame), future = pending[0]
+            try:
+                detections = future.result(timeout=0.1)
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                self.error = f"✗ Erreur d'inférence : {e}"
+                self.stop_event.set()
+                break
+            pending.popleft()
+            self.frames_inferred += 1
+            self.results.put((frame_id, t_capture, frame, detections), self.stop_event)
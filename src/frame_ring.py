@@ -0,0 +1,254 @@
+"""
+Smart Bin SI - Anneau d'images en mémoire partagée (multiprocessing.shared_memory)
+- Le détecteur publie chaque image + ses détections dans un anneau de N cases
+- Les autres processus (interface admin, enregistreur, classifieur secondaire)
+  lisent la dernière image sans rouvrir la caméra ni sérialiser (vue NumPy)
+- Chaque case est protégée par un numéro de séquence (seqlock) : impair pendant
+  l'écriture, la lecture est valide si le numéro n'a pas changé entre-temps
+
+Disposition : en-tête global, puis pour chaque case un en-tête + détections + image.
+"""
+
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    from config import FRAME_RING_NAME, FRAME_RING_SLOTS, FRAME_RING_MAX_DETECTIONS
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import FRAME_RING_NAME, FRAME_RING_SLOTS, FRAME_RING_MAX_DETECTIONS
+
+MAGIC = 0x53424652  # "SBFR"
+VERSION = 1
+
+# En-tête global : magic, version, cases, hauteur, largeur, canaux, détections max,
+# pid écrivain, dernière séquence, images publiées, démarrage, FPS, source (64 octets)
+HEADER = struct.Struct("<IIIIIIIIQQdd64s")
+HEADER_SIZE = 192
+# En-tête de case : séquence (seqlock), id image, horodatage (time.time()), nb détections
+SLOT_HEADER = struct.Struct("<QQdI")
+SLOT_HEADER_SIZE = 32
+_LATEST_OFFSET = struct.calcsize("<IIIIIIII")
+
+
+def _attach(name):
+    """Ouvrir un segment existant sans que ce processus le supprime à sa sortie."""
+    shm = shared_memory.SharedMemory(name=name, create=False)
+    try:
+        # Python < 3.13 : le resource_tracker supprimerait le segment de l'écrivain
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class _Layout:
+    """Calcul des offsets d'un anneau (identique côté écrivain et lecteurs)."""
+
+    def __init__(self, slots, shape, max_detections):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.max_detections = max_detections
+        self.frame_bytes = int(np.prod(self.shape))
+        self.dets_bytes = max_detections * 6 * 4
+        self.slot_bytes = SLOT_HEADER_SIZE + self.dets_bytes + self.frame_bytes
+        self.slot_bytes += -self.slot_bytes % 64  # Aligné sur 64 octets
+        self.size = HEADER_SIZE + slots * self.slot_bytes
+
+    def slot_offset(self, i):
+        return HEADER_SIZE + (i % self.slots) * self.slot_bytes
+
+    def views(self, buf, i):
+        """(détections (M, 6) float32, image (H, W, C) uint8) de la case i, sans copie."""
+        offset = self.slot_offset(i) + SLOT_HEADER_SIZE
+        dets = np.ndarray((self.max_detections, 6), dtype=np.float32, buffer=buf, offset=offset)
+        frame = np.ndarray(self.shape, dtype=np.uint8, buffer=buf, offset=offset + self.dets_bytes)
+        return dets, frame
+
+
+class FrameRingWriter:
+    """Côté détecteur : publie images et détections."""
+
+    def __init__(self, name=FRAME_RING_NAME, slots=FRAME_RING_SLOTS,
+                 max_detections=FRAME_RING_MAX_DETECTIONS, source=""):
+        """
+        Args:
+            name: Nom du segment de mémoire partagée
+            slots: Nombre de cases de l'anneau
+            max_detections: Détections gardées par image
+            source: Description de la caméra (affichée par l'interface admin)
+        """
+        self.name = name
+        self.slots = max(2, slots)
+        self.max_detections = max_detections
+        self.source = source
+        self.fps = 0.0
+        self.seq = 0
+        self.shm = None
+        self.layout = None
+        self.started_at = time.time()
+
+    def _create(self, shape):
+        self.layout = _Layout(self.slots, shape, self.max_detections)
+        try:
+            # Segment d'un détecteur précédent arrêté brutalement
+            stale = _attach(self.name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=self.layout.size)
+        self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self._write_header()
+
+    def _write_header(self):
+        h, w, c = self.layout.shape
+        HEADER.pack_into(
+            self.shm.buf, 0, MAGIC, VERSION, self.slots, h, w, c, self.max_detections,
+            os.getpid(), self.seq, self.seq, self.started_at, float(self.fps),
+            self.source.encode("utf-8")[:64],
+        )
+
+    def publish(self, frame, detections, frame_id=None):
+        """
+        Copier une image et ses détections dans la case suivante
+
+        Args:
+            frame: Image (H, W, 3) uint8
+            detections: Tableau (N, 6) [x1, y1, x2, y2, confiance, classe]
+            frame_id: Identifiant de l'image (par défaut : numéro de séquence)
+        """
+        shape = frame.shape if frame.ndim == 3 else frame.shape + (1,)
+        if self.shm is None or shape != self.layout.shape:
+            self.close()
+            self._create(shape)
+
+        seq = self.seq + 1
+        slot = self.layout.slot_offset(seq)
+        buf = self.shm.buf
+        dets, view = self.layout.views(buf, seq)
+        n = min(len(detections), self.max_detections)
+
+        # seqlock : impair pendant l'écriture
+        struct.pack_into("<Q", buf, slot, 2 * seq - 1)
+        view[...] = frame.reshape(shape)
+        if n:
+            dets[:n] = detections[:n]
+        SLOT_HEADER.pack_into(buf, slot, 2 * seq - 1,
+                              seq if frame_id is None else frame_id, time.time(), n)
+        struct.pack_into("<Q", buf, slot, 2 * seq)
+
+        self.seq = seq
+        struct.pack_into("<QQ", buf, _LATEST_OFFSET, seq, seq)
+        struct.pack_into("<d", buf, _LATEST_OFFSET + 24, float(self.fps))
+
+    def close(self):
+        """Supprimer le segment (les lecteurs voient le détecteur arrêté)."""
+        if self.shm is not None:
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class FrameView:
+    """Dernière image lue dans l'anneau (vue sans copie tant que la case n'est pas réécrite)."""
+
+    def __init__(self, reader, seq, frame_id, timestamp, frame, detections):
+        self._reader = reader
+        self.seq = seq
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.frame = frame
+        self.detections = detections
+
+    def still_valid(self):
+        """True si l'écrivain n'a pas réutilisé la case depuis la lecture."""
+        return self._reader._slot_seq(self.seq) == 2 * self.seq
+
+    def copy(self):
+        """Copie de l'image (None si la case a été réécrite pendant la copie)."""
+        frame = self.frame.copy()
+        return frame if self.still_valid() else None
+
+
+class FrameRingReader:
+    """Côté lecteur : accès à la dernière image publiée par le détecteur."""
+
+    def __init__(self, name=FRAME_RING_NAME):
+        """
+        Lève:
+            FileNotFoundError: Le détecteur ne publie pas (pas démarré)
+        """
+        self.shm = _attach(name)
+        header = HEADER.unpack_from(self.shm.buf, 0)
+        if header[0] != MAGIC or header[1] != VERSION:
+            self.shm.close()
+            raise FileNotFoundError(f"segment {name} invalide")
+        _, _, slots, h, w, c, max_dets = header[:7]
+        self.layout = _Layout(slots, (h, w, c), max_dets)
+
+    def status(self):
+        """
+        État publié par le détecteur
+
+        Retourne:
+            dict: pid, résolution, fps, images publiées, démarrage, source
+        """
+        header = HEADER.unpack_from(self.shm.buf, 0)
+        _, _, slots, h, w, c, _, pid, latest, published, started_at, fps, source = header
+        timestamp = None
+        if latest:
+            timestamp = SLOT_HEADER.unpack_from(self.shm.buf, self.layout.slot_offset(latest))[2]
+        return {
+            "pid": pid,
+            "width": w,
+            "height": h,
+            "channels": c,
+            "slots": slots,
+            "fps": fps,
+            "frames": published,
+            "started_at": started_at,
+            "last_frame_time": timestamp,
+            "source": source.rstrip(b"\0").decode("utf-8", "replace"),
+        }
+
+    def _slot_seq(self, seq):
+        return struct.unpack_from("<Q", self.shm.buf, self.layout.slot_offset(seq))[0]
+
+    def latest_seq(self):
+        return struct.unpack_from("<Q", self.shm.buf, _LATEST_OFFSET)[0]
+
+    def read_latest(self, retries=3):
+        """
+        Dernière image (vue NumPy sans copie) et ses détections
+
+        Retourne:
+            FrameView, ou None si rien n'est publié ou si l'écrivain va trop vite
+        """
+        for _ in range(retries):
+            seq = self.latest_seq()
+            if not seq:
+                return None
+            before = self._slot_seq(seq)
+            if before != 2 * seq:
+                continue
+            _, frame_id, timestamp, n = SLOT_HEADER.unpack_from(
+                self.shm.buf, self.layout.slot_offset(seq))
+            dets, frame = self.layout.views(self.shm.buf, seq)
+            detections = dets[:n].copy()
+            if self._slot_seq(seq) == before:
+                return FrameView(self, seq, frame_id, timestamp, frame, detections)
+        return None
+
+    def close(self):
+        self.shm.close()
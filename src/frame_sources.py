@@ -0,0 +1,269 @@
+"""
+Smart Bin SI - Sources d'images hors caméra
+Même interface que cv2.VideoCapture (read / isOpened / release) :
+- VideoFileSource : fichier vidéo
+- ImageDirSource  : dossier d'images (ordre alphabétique)
+- SyntheticCamera : formes en mouvement, sans caméra (tests de charge)
+
+En mode temps réel, la source suit l'horloge comme une caméra : si le
+traitement prend du retard, les images en retard sont sautées.
+"""
+
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    from config import (
+        FRAME_WIDTH, FRAME_HEIGHT, SYNTHETIC_FPS, SYNTHETIC_CLASSES,
+        SYNTHETIC_OBJECTS_PER_MINUTE, SYNTHETIC_CROSSING_SECONDS, SYNTHETIC_OBJECT_SIZE,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        FRAME_WIDTH, FRAME_HEIGHT, SYNTHETIC_FPS, SYNTHETIC_CLASSES,
+        SYNTHETIC_OBJECTS_PER_MINUTE, SYNTHETIC_CROSSING_SECONDS, SYNTHETIC_OBJECT_SIZE,
+    )
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+class _PacedSource:
+    """Base commune : index d'image et cadence temps réel."""
+
+    def __init__(self, fps, realtime):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.index = 0      # Index de la prochaine image
+        self.skipped = 0    # Images sautées (retard en temps réel)
+        self._start = None
+
+    def _pace(self):
+        """Temps réel : sauter les images en retard, attendre si en avance."""
+        if not self.realtime:
+            return
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+            return
+        expected = int((now - self._start) * self.fps)
+        while self.index < expected and self._skip():
+            self.index += 1
+            self.skipped += 1
+        wait = self._start + self.index / self.fps - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _skip(self):
+        return False
+
+    @property
+    def position(self):
+        """Temps dans la source (s) de la dernière image lue."""
+        return max(0, self.index - 1) / self.fps
+
+    def isOpened(self):
+        return True
+
+
+class VideoFileSource(_PacedSource):
+    """Fichier vidéo lu image par image."""
+
+    def __init__(self, path, realtime=False):
+        self.cap = cv2.VideoCapture(str(path))
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), realtime)
+
+    def _skip(self):
+        return self.cap.grab()
+
+    def read(self):
+        self._pace()
+        ret, frame = self.cap.read()
+        if ret:
+            self.index += 1
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource(_PacedSource):
+    """Dossier d'images, lues dans l'ordre alphabétique."""
+
+    def __init__(self, path, fps=10.0, realtime=False):
+        super().__init__(fps, realtime)
+        self.files = sorted(
+            p for p in Path(path).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+
+    def _skip(self):
+        return self.index < len(self.files)
+
+    def read(self):
+        self._pace()
+        while self.index < len(self.files):
+            frame = cv2.imread(str(self.files[self.index]))
+            self.index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def release(self):
+        pass
+
+
+def open_source(path, realtime=False, fps=10.0):
+    """
+    Ouvrir un fichier vidéo ou un dossier d'images
+
+    Args:
+        path: Fichier vidéo ou dossier
+        realtime: Respecter la cadence de la source (sinon aussi vite que possible)
+        fps: Cadence d'un dossier d'images
+    """
+    if Path(path).is_dir():
+        return ImageDirSource(path, fps=fps, realtime=realtime)
+    return VideoFileSource(path, realtime=realtime)
+
+
+# ============================================
+# CAMÉRA SYNTHÉTIQUE (TESTS DE CHARGE SANS MATÉRIEL)
+# ============================================
+
+_SYNTHETIC_MAGIC = b"SYNT"  # Marqueur des images synthétiques (ligne 0, canal 1)
+
+
+def write_frame_index(frame, index):
+    """Inscrire le numéro d'image dans les 4 premiers pixels (lu par le backend stub)."""
+    frame[0, :4, 0] = np.frombuffer(int(index).to_bytes(4, "little"), dtype=np.uint8)
+    frame[0, :4, 1] = np.frombuffer(_SYNTHETIC_MAGIC, dtype=np.uint8)
+
+
+def read_frame_index(frame):
+    """Numéro d'une image synthétique, ou None pour une vraie image."""
+    if frame.ndim != 3 or frame.shape[1] < 4 or frame[0, :4, 1].tobytes() != _SYNTHETIC_MAGIC:
+        return None
+    return int.from_bytes(frame[0, :4, 0].tobytes(), "little")
+
+
+class SyntheticScene:
+    """
+    Objets qui traversent l'image de gauche à droite, fonction pure du numéro d'image :
+    la caméra dessine la scène, le backend stub retrouve les mêmes boîtes.
+    """
+
+    def __init__(self, width=FRAME_WIDTH, height=FRAME_HEIGHT, fps=SYNTHETIC_FPS,
+                 class_names=SYNTHETIC_CLASSES, objects_per_minute=SYNTHETIC_OBJECTS_PER_MINUTE,
+                 crossing_seconds=SYNTHETIC_CROSSING_SECONDS, object_size=SYNTHETIC_OBJECT_SIZE,
+                 seed=0):
+        """
+        Args:
+            width, height: Taille des images
+            fps: Cadence nominale de la scène (vitesse des objets par image)
+            class_names: Classes des objets (dans l'ordre des index)
+            objects_per_minute: Objets qui entrent dans l'image par minute
+            crossing_seconds: Durée de traversée d'un objet
+            object_size: Côté moyen d'un objet (pixels)
+            seed: Graine (même graine → même scène)
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.class_names = list(class_names)
+        self.interval = max(1, int(round(fps * 60.0 / objects_per_minute)))
+        self.crossing = max(2, int(round(fps * crossing_seconds)))
+        self.object_size = object_size
+        self.seed = seed
+
+    def _object(self, j):
+        """Classe, taille et hauteur de l'objet j (tirage déterministe)."""
+        rng = np.random.default_rng((self.seed, j))
+        cls = int(rng.integers(len(self.class_names)))
+        size = int(self.object_size * rng.uniform(0.7, 1.3))
+        y = int(rng.integers(0, max(1, self.height - size)))
+        return cls, size, y
+
+    def objects_until(self, index):
+        """Nombre d'objets entrés dans l'image avant l'image index."""
+        return index // self.interval + 1
+
+    def boxes(self, index):
+        """
+        Objets visibles sur l'image index
+
+        Retourne:
+            list: (j, x1, y1, x2, y2, classe) ; j = numéro de l'objet
+        """
+        visible = []
+        first = max(0, (index - self.crossing) // self.interval)
+        for j in range(first, index // self.interval + 1):
+            age = index - j * self.interval
+            if not 0 <= age < self.crossing:
+                continue
+            cls, size, y = self._object(j)
+            x = int(-size + (self.width + size) * age / self.crossing)
+            x1, x2 = max(0, x), min(self.width, x + size)
+            if x2 - x1 >= size // 4:
+                visible.append((j, x1, y, x2, y + size, cls))
+        return visible
+
+
+class SyntheticCamera(_PacedSource):
+    """
+    Caméra sans matériel : formes colorées en mouvement sur un fond fixe
+    (même interface que cv2.VideoCapture)
+    """
+
+    # Couleur BGR par classe (cycle)
+    COLORS = ((0, 200, 255), (40, 180, 40), (230, 230, 230), (60, 90, 160), (200, 60, 200))
+
+    def __init__(self, scene=None, fps=SYNTHETIC_FPS, frames=0, realtime=True):
+        """
+        Args:
+            scene: SyntheticScene (par défaut : paramètres de config)
+            fps: Cadence de la caméra en temps réel
+            frames: Nombre d'images avant la fin (0 = sans fin)
+            realtime: Respecter fps (sinon images produites au plus vite)
+        """
+        super().__init__(fps, realtime)
+        self.scene = scene or SyntheticScene()
+        self.frames = frames
+        rng = np.random.default_rng(self.scene.seed)
+        noise = rng.integers(0, 24, (self.scene.height, self.scene.width, 1), dtype=np.uint8)
+        self.background = np.repeat(noise + 80, 3, axis=2)
+
+    def _skip(self):
+        return not self.frames or self.index < self.frames
+
+    def render(self, index):
+        """Image index de la scène (numéro inscrit pour le backend stub)."""
+        frame = self.background.copy()
+        for _, x1, y1, x2, y2, cls in self.scene.boxes(index):
+            color = self.COLORS[cls % len(self.COLORS)]
+            if cls % 2:
+                center = ((x1 + x2) // 2, (y1 + y2) // 2)
+                cv2.ellipse(frame, center, ((x2 - x1) // 2, (y2 - y1) // 2), 0, 0, 360, color, -1)
+            else:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, -1)
+        write_frame_index(frame, index)
+        return frame
+
+    def read(self):
+        self._pace()
+        if self.frames and self.index >= self.frames:
+            return False, None
+        frame = self.render(self.index)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        pass
@@ -0,0 +1,161 @@
+"""
+Smart Bin SI - Déduplication des images d'apprentissage (hash perceptuel dHash)
+- dHash 64 bits calculé en NumPy sur l'image ou le recadrage de la bbox
+- Index par dossier de classe sur disque (.dhash.jsonl, ajout seulement)
+- Distance de Hamming vectorisée contre tout l'index de la classe
+"""
+
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+INDEX_NAME = ".dhash.jsonl"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def dhash(image, bbox=None, hash_size=8):
+    """
+    Hash de différence (dHash) d'une image
+
+    Args:
+        image: Image OpenCV (BGR ou niveaux de gris)
+        bbox: [x1, y1, x2, y2] optionnel : hash du recadrage seulement
+        hash_size: Côté de la grille (8 → 64 bits)
+
+    Retourne:
+        np.ndarray: hash_size² bits empaquetés (uint8)
+    """
+    if bbox is not None and len(bbox) == 4:
+        h, w = image.shape[:2]
+        x1, y1, x2, y2 = [int(round(float(v))) for v in bbox]
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x2 - x1 >= 2 and y2 - y1 >= 2:
+            image = image[y1:y2, x1:x2]
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def hamming(hashes, h):
+    """Distance de Hamming entre un tableau de hash (N, B) et un hash (B,)."""
+    if not len(hashes):
+        return np.zeros(0, dtype=np.int32)
+    return np.unpackbits(np.bitwise_xor(hashes, h), axis=1).sum(axis=1)
+
+
+def label_bbox(label_path, shape):
+    """bbox [x1, y1, x2, y2] en pixels depuis un label YOLO, ou None."""
+    try:
+        values = label_path.read_text().split()
+        xc, yc, bw, bh = [float(v) for v in values[1:5]]
+    except (OSError, ValueError):
+        return None
+    h, w = shape[:2]
+    return [(xc - bw / 2) * w, (yc - bh / 2) * h, (xc + bw / 2) * w, (yc + bh / 2) * h]
+
+
+class _FolderIndex:
+    """Hash des images d'un dossier de classe (nom de fichier → hash)."""
+
+    def __init__(self, folder, hash_size):
+        self.folder = Path(folder)
+        self.path = self.folder / INDEX_NAME
+        self.names = []
+        self.hashes = np.zeros((0, hash_size * hash_size // 8), dtype=np.uint8)
+        self._load(hash_size)
+
+    def _load(self, hash_size):
+        entries = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    name, _, value = line.strip().partition(" ")
+                    if value == "-":
+                        entries.pop(name, None)
+                    elif name:
+                        entries[name] = bytes.fromhex(value)
+        elif self.folder.exists():
+            # Dossier existant sans index : hasher les images une fois
+            for image_path in sorted(self.folder.iterdir()):
+                if image_path.suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                image = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+                if image is not None:
+                    bbox = label_bbox(image_path.with_suffix(".txt"), image.shape)
+                    entries[image_path.name] = dhash(image, bbox, hash_size).tobytes()
+            if entries:
+                self.folder.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    for name, value in entries.items():
+                        f.write(f"{name} {value.hex()}\n")
+        self.names = list(entries)
+        if entries:
+            self.hashes = np.frombuffer(b"".join(entries.values()), dtype=np.uint8).reshape(
+                len(entries), -1).copy()
+
+    def nearest(self, h):
+        """(nom, distance) de l'image la plus proche, ou (None, None)."""
+        distances = hamming(self.hashes, h)
+        if not len(distances):
+            return None, None
+        i = int(distances.argmin())
+        return self.names[i], int(distances[i])
+
+    def add(self, name, h):
+        self.names.append(name)
+        self.hashes = np.vstack([self.hashes, h[None, :]])
+        self._append(f"{name} {h.tobytes().hex()}\n")
+
+    def remove(self, name):
+        if name not in self.names:
+            return
+        i = self.names.index(name)
+        del self.names[i]
+        self.hashes = np.delete(self.hashes, i, axis=0)
+        self._append(f"{name} -\n")
+
+    def _append(self, line):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class HashIndex:
+    """Index dHash par dossier de classe, partagé par les threads d'écriture."""
+
+    def __init__(self, threshold, hash_size=8):
+        """
+        Args:
+            threshold: Distance de Hamming max pour considérer deux images identiques
+            hash_size: Côté de la grille dHash (8 → 64 bits)
+        """
+        self.threshold = threshold
+        self.hash_size = hash_size
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    def _folder(self, folder):
+        index = self._folders.get(folder)
+        if index is None:
+            index = self._folders[folder] = _FolderIndex(folder, self.hash_size)
+        return index
+
+    def find_duplicate(self, folder, h):
+        """Nom de l'image quasi identique dans le dossier, ou None."""
+        with self._lock:
+            name, distance = self._folder(folder).nearest(h)
+        if name is not None and distance <= self.threshold:
+            return name
+        return None
+
+    def add(self, folder, name, h):
+        with self._lock:
+            self._folder(folder).add(name, h)
+
+    def remove(self, folder, name):
+        with self._lock:
+            self._folder(folder).remove(name)
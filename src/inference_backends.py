@@ -0,0 +1,545 @@
+"""
+Smart Bin SI - Backends d'inférence YOLO
+- torch    : modèle YOLOv5 via torch.hub (GPU si disponible)
+- onnx     : graphe ONNX exporté, exécuté par ONNX Runtime (CPU)
+- openvino : même graphe ONNX, exécuté par OpenVINO (CPU Intel)
+- stub     : détections scriptées de la caméra synthétique (tests de charge sans modèle)
+
+Tous les backends s'appellent comme le modèle (backend(frame)) et retournent
+un tableau (N, 6) float32 : [x1, y1, x2, y2, confiance, classe].
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    from config import (
+        CONFIDENCE_THRESHOLD, IOU_THRESHOLD, ONNX_IMG_SIZE, ONNX_THREADS,
+        YOLOV5_REPO_DIR, FALLBACK_MODEL_PATH, STUB_LATENCY_MS, STUB_MISS_RATE,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        CONFIDENCE_THRESHOLD, IOU_THRESHOLD, ONNX_IMG_SIZE, ONNX_THREADS,
+        YOLOV5_REPO_DIR, FALLBACK_MODEL_PATH, STUB_LATENCY_MS, STUB_MISS_RATE,
+    )
+
+BACKENDS = ("torch", "onnx", "openvino", "stub")
+PRECISIONS = ("fp32", "fp16", "int8")
+MAX_DETECTIONS = 300
+_MAX_WH = 7680  # Décalage par classe pour la NMS (comme YOLOv5)
+
+
+# ============================================
+# BACKEND TORCH (torch.hub YOLOv5)
+# ============================================
+
+def import_runtime(name):
+    """Importer la bibliothèque d'inférence du backend (mesuré à part au démarrage)."""
+    try:
+        if name == "onnx":
+            import onnxruntime  # noqa: F401
+        elif name == "openvino":
+            import openvino  # noqa: F401
+        else:
+            import torch  # noqa: F401
+    except ImportError:
+        pass  # create_backend() gère le repli
+
+
+def hub_load(model, **kwargs):
+    """
+    torch.hub.load sur la copie locale du dépôt YOLOv5 si elle existe
+    (aucun accès réseau), sinon sur GitHub.
+
+    Args:
+        model: Point d'entrée hubconf ('custom', 'yolov5s', ...)
+    """
+    import torch
+
+    if (YOLOV5_REPO_DIR / "hubconf.py").exists():
+        return torch.hub.load(str(YOLOV5_REPO_DIR), model, source="local", **kwargs)
+    print(f"⚠ Dépôt YOLOv5 local absent ({YOLOV5_REPO_DIR}) - accès réseau torch.hub")
+    print("   Pour démarrer hors ligne : python3 scripts/prepare_models.py")
+    return torch.hub.load('ultralytics/yolov5', model, **kwargs)
+
+
+def load_fallback_model():
+    """YOLOv5s COCO : depuis le cache local si préparé, sinon téléchargé."""
+    if Path(FALLBACK_MODEL_PATH).exists():
+        return hub_load('custom', path=FALLBACK_MODEL_PATH)
+    return hub_load('yolov5s', pretrained=True)
+
+
+def load_torch_model(model_path):
+    """
+    Charger le modèle YOLOv5 via torch.hub (modèle custom ou YOLOv5s COCO)
+
+    Args:
+        model_path: Chemin vers les poids (.pt)
+
+    Retourne:
+        Modèle AutoShape YOLOv5
+    """
+    if not Path(model_path).exists():
+        print(f"⚠ Fichier du modèle introuvable : {model_path}")
+        print("   Utilisation du YOLOv5s par défaut (pré-entraîné sur COCO)")
+        print("   Pour utiliser un modèle custom, entraîne-le d'abord !")
+
+        # Charger YOLOv5s pré-entraîné comme solution de secours
+        return load_fallback_model()
+
+    # Charger le modèle custom entraîné
+    try:
+        model = hub_load('custom', path=str(model_path))
+        print("✓ Modèle custom chargé avec succès")
+        return model
+    except Exception as e:
+        print(f"✗ Erreur lors du chargement du modèle custom : {e}")
+        print("   Retour au YOLOv5s pré-entraîné")
+        return load_fallback_model()
+
+
+class TorchBackend:
+    """Modèle YOLOv5 torch.hub (AutoShape : letterbox + NMS inclus)."""
+
+    name = "torch"
+    resizable = True  # AutoShape accepte une taille d'entrée par appel
+
+    def __init__(self, model_path, precision="fp32"):
+        import torch
+
+        model = load_torch_model(model_path)
+
+        # Définir les paramètres du modèle
+        model.conf = CONFIDENCE_THRESHOLD
+        model.iou = IOU_THRESHOLD
+
+        # Utiliser le GPU si disponible (important pour Jetson)
+        if torch.cuda.is_available():
+            model = model.cuda()
+            print("✓ Accélération GPU activée")
+            if precision == "fp16":
+                # AutoShape convertit l'entrée au type des poids
+                model = model.half()
+                print("✓ Inférence FP16")
+        else:
+            print("⚠ Exécution sur CPU (plus lent)")
+            if precision == "fp16":
+                print("⚠ FP16 demandé sans GPU - inférence FP32")
+                precision = "fp32"
+
+        self.model = model
+        self.precision = precision
+        self.names = model.names
+
+    def __call__(self, frame, size=None):
+        pred = (self.model(frame, size=size) if size else self.model(frame)).xyxy[0]
+        return pred.cpu().numpy().astype(np.float32).reshape(-1, 6)
+
+
+# ============================================
+# EXPORT ONNX (avec cache par checksum)
+# ============================================
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Checksum SHA-256 d'un fichier (lecture par blocs)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_version(model_path):
+    """
+    Version du modèle pour le manifeste : début du SHA-256 des poids
+    ("yolov5s" si best.pt absent)
+    """
+    if not Path(model_path).exists():
+        return "yolov5s"
+    return file_sha256(model_path)[:12]
+
+
+def export_onnx(model_path, onnx_path, img_size=ONNX_IMG_SIZE):
+    """
+    Exporter best.pt en ONNX (sortie brute (1, N, 5 + nc), NMS faite en NumPy)
+
+    Args:
+        model_path: Poids YOLOv5 (.pt)
+        onnx_path: Fichier ONNX à écrire
+        img_size: Taille d'entrée carrée du graphe
+
+    Retourne:
+        dict: Noms des classes {id: nom}
+    """
+    import torch
+
+    print(f"🔄 Export ONNX de {Path(model_path).name} ({img_size}x{img_size})...")
+    model = hub_load('custom', path=str(model_path), autoshape=False)
+    model = model.cpu().eval()
+    # Sortie unique (sans les feature maps) pour le graphe exporté
+    for module in model.modules():
+        if module.__class__.__name__ == "Detect":
+            module.export = True
+
+    dummy = torch.zeros(1, 3, img_size, img_size)
+    tmp_path = Path(str(onnx_path) + ".tmp")
+    with torch.no_grad():
+        torch.onnx.export(
+            model, dummy, str(tmp_path),
+            opset_version=12,
+            input_names=["images"],
+            output_names=["output0"],
+        )
+    tmp_path.replace(onnx_path)
+
+    names = model.names
+    if not isinstance(names, dict):
+        names = dict(enumerate(names))
+    print(f"✓ Modèle ONNX exporté : {onnx_path}")
+    return names
+
+
+def ensure_onnx(model_path, img_size=ONNX_IMG_SIZE):
+    """
+    Retourner le modèle ONNX en cache à côté de best.pt, ré-exporté
+    seulement si le checksum du .pt a changé.
+
+    Args:
+        model_path: Poids YOLOv5 (.pt)
+        img_size: Taille d'entrée du graphe
+
+    Retourne:
+        (Path, dict): Chemin du .onnx et noms des classes
+    """
+    model_path = Path(model_path)
+    onnx_path = model_path.with_suffix(".onnx")
+    meta_path = model_path.with_suffix(".onnx.json")
+    checksum = file_sha256(model_path)
+
+    if onnx_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("source_sha256") == checksum and meta.get("img_size") == img_size:
+            names = {int(k): v for k, v in meta["names"].items()}
+            return onnx_path, names
+
+    names = export_onnx(model_path, onnx_path, img_size)
+    meta_path.write_text(json.dumps({
+        "source": model_path.name,
+        "source_sha256": checksum,
+        "img_size": img_size,
+        "names": {str(k): v for k, v in names.items()},
+    }, indent=2), encoding="utf-8")
+    return onnx_path, names
+
+
+# ============================================
+# PRÉ / POST-TRAITEMENT (NumPy)
+# ============================================
+
+def letterbox(frame, size):
+    """
+    Redimensionner en gardant les proportions puis compléter en carré (gris 114)
+
+    Retourne:
+        (np.ndarray, float, (int, int)): Image carrée, gain, (pad_x, pad_y)
+    """
+    h, w = frame.shape[:2]
+    gain = min(size / h, size / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+    return canvas, gain, (pad_x, pad_y)
+
+
+def preprocess(frame, size):
+    """
+    Image BGR → tenseur (1, 3, size, size) float32 normalisé 0-1.
+    Les canaux ne sont pas inversés : même entrée que le chemin torch.hub
+    (AutoShape ne convertit pas les tableaux NumPy).
+    """
+    image, gain, pad = letterbox(frame, size)
+    blob = image.transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+    return np.ascontiguousarray(blob), gain, pad
+
+
+def box_iou(box, boxes):
+    """IoU entre une boîte (4,) et un tableau de boîtes (M, 4)."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (area + areas - inter + 1e-9)
+
+
+def nms(boxes, scores, iou_threshold, max_det=MAX_DETECTIONS):
+    """NMS glouton (IoU vectorisée). Retourne les indices gardés."""
+    order = np.argsort(-scores)
+    keep = []
+    while order.size and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        ious = box_iou(boxes[i], boxes[order[1:]])
+        order = order[1:][ious <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def postprocess(output, gain, pad, frame_shape, conf_threshold, iou_threshold):
+    """
+    Sortie brute YOLOv5 (N, 5 + nc) → détections (M, 6) dans le repère de l'image
+
+    Args:
+        output: Prédictions [cx, cy, w, h, objectness, scores classes...]
+        gain, pad: Paramètres du letterbox
+        frame_shape: Forme de l'image d'origine
+    """
+    output = output[output[:, 4] > conf_threshold]
+    if not len(output):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    class_scores = output[:, 5:] * output[:, 4:5]
+    class_ids = class_scores.argmax(axis=1)
+    confidences = class_scores[np.arange(len(class_scores)), class_ids]
+    mask = confidences > conf_threshold
+    output, class_ids, confidences = output[mask], class_ids[mask], confidences[mask]
+    if not len(output):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    boxes = np.empty((len(output), 4), dtype=np.float32)
+    boxes[:, 0] = output[:, 0] - output[:, 2] / 2
+    boxes[:, 1] = output[:, 1] - output[:, 3] / 2
+    boxes[:, 2] = output[:, 0] + output[:, 2] / 2
+    boxes[:, 3] = output[:, 1] + output[:, 3] / 2
+
+    # NMS par classe : décaler les boîtes de chaque classe
+    keep = nms(boxes + class_ids[:, None] * _MAX_WH, confidences, iou_threshold)
+    boxes, confidences, class_ids = boxes[keep], confidences[keep], class_ids[keep]
+
+    # Retour au repère de l'image d'origine
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= gain
+    h, w = frame_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+    return np.concatenate(
+        [boxes, confidences[:, None], class_ids[:, None]], axis=1
+    ).astype(np.float32)
+
+
+# ============================================
+# BACKENDS ONNX RUNTIME / OPENVINO
+# ============================================
+
+class OnnxBackend:
+    """Graphe ONNX exécuté par ONNX Runtime sur CPU."""
+
+    name = "onnx"
+    resizable = False  # Graphe exporté à taille fixe (ONNX_IMG_SIZE)
+
+    def __init__(self, model_path, img_size=ONNX_IMG_SIZE, precision="fp32"):
+        import onnxruntime as ort
+
+        if precision == "int8":
+            from quantization import int8_model
+            onnx_path, self.names = int8_model(model_path, img_size)
+        else:
+            onnx_path, self.names = ensure_onnx(model_path, img_size)
+        self.precision = precision
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(
+            str(onnx_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.img_size = img_size
+        self.conf = CONFIDENCE_THRESHOLD
+        self.iou = IOU_THRESHOLD
+        print(f"✓ Backend ONNX Runtime prêt ({onnx_path.name})")
+
+    def run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+    def __call__(self, frame, size=None):
+        # size ignoré : l'entrée du graphe est fixe
+        blob, gain, pad = preprocess(frame, self.img_size)
+        output = self.run(blob)[0]
+        return postprocess(output, gain, pad, frame.shape, self.conf, self.iou)
+
+
+class OpenVinoBackend(OnnxBackend):
+    """Même graphe ONNX, compilé et exécuté par OpenVINO sur CPU."""
+
+    name = "openvino"
+
+    def __init__(self, model_path, img_size=ONNX_IMG_SIZE, precision="fp32"):
+        try:
+            from openvino import Core
+        except ImportError:
+            from openvino.runtime import Core
+
+        if precision == "int8":
+            from quantization import int8_model
+            onnx_path, self.names = int8_model(model_path, img_size)
+        else:
+            onnx_path, self.names = ensure_onnx(model_path, img_size)
+        self.precision = precision
+        core = Core()
+        config = {"INFERENCE_NUM_THREADS": ONNX_THREADS} if ONNX_THREADS else {}
+        self.compiled = core.compile_model(core.read_model(str(onnx_path)), "CPU", config)
+        self.output = self.compiled.output(0)
+        self.img_size = img_size
+        self.conf = CONFIDENCE_THRESHOLD
+        self.iou = IOU_THRESHOLD
+        print(f"✓ Backend OpenVINO prêt ({onnx_path.name})")
+
+    def run(self, blob):
+        return self.compiled([blob])[self.output]
+
+
+class StubBackend:
+    """
+    Backend sans modèle pour SyntheticCamera : relit le numéro inscrit dans l'image
+    et retourne les boîtes de la scène, après une latence simulée.
+    Déterministe : même image → mêmes détections (confiances et oublis compris).
+    """
+
+    name = "stub"
+    resizable = True  # Taille d'entrée sans effet
+    precision = "fp32"
+
+    def __init__(self, scene=None, latency_ms=STUB_LATENCY_MS, miss_rate=STUB_MISS_RATE):
+        """
+        Args:
+            scene: SyntheticScene dessinée par la caméra (par défaut : paramètres de config)
+            latency_ms: Durée simulée d'une inférence
+            miss_rate: Part des objets non détectés sur une image
+        """
+        from frame_sources import SyntheticScene
+
+        self.scene = scene or SyntheticScene()
+        self.names = dict(enumerate(self.scene.class_names))
+        self.latency = latency_ms / 1000.0
+        self.miss_rate = miss_rate
+        self.conf = CONFIDENCE_THRESHOLD
+
+    def __call__(self, frame, size=None):
+        from frame_sources import read_frame_index
+
+        if self.latency:
+            time.sleep(self.latency)  # Libère le GIL, comme une vraie inférence
+        index = read_frame_index(frame)
+        if index is None:
+            return np.zeros((0, 6), dtype=np.float32)
+        rows = []
+        for j, x1, y1, x2, y2, cls in self.scene.boxes(index):
+            draw = np.random.default_rng((self.scene.seed, j, index)).random(2)
+            if draw[0] < self.miss_rate:
+                continue
+            confidence = self.conf + (1.0 - self.conf) * (0.3 + 0.6 * draw[1])
+            rows.append((x1, y1, x2, y2, confidence, cls))
+        return np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def create_backend(name, model_path, precision="fp32"):
+    """
+    Créer le backend d'inférence demandé.
+    Les backends ONNX / OpenVINO demandent un best.pt : sinon retour à torch.
+
+    Args:
+        name: "torch", "onnx", "openvino" ou "stub" (model_path ignoré)
+        model_path: Chemin vers best.pt
+        precision: "fp32", "fp16" (torch + GPU) ou "int8" (ONNX validé par
+            scripts/quantization_report.py, sinon retour au FP32)
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Backend inconnu : {name} (choix : {', '.join(BACKENDS)})")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue : {precision} (choix : {', '.join(PRECISIONS)})")
+    if name == "stub":
+        return StubBackend()
+
+    if precision == "fp16" and name != "torch":
+        print(f"⚠ FP16 disponible seulement avec le backend torch - {name} en FP32")
+        precision = "fp32"
+    if precision == "int8":
+        if name == "torch":
+            print("⚠ INT8 disponible seulement via ONNX (INFERENCE_BACKEND = \"onnx\") - FP32")
+            precision = "fp32"
+        else:
+            from quantization import is_approved
+            if not Path(model_path).exists() or not is_approved(model_path):
+                print("⚠ Modèle INT8 absent ou non validé - FP32")
+                print("   Pour le créer : python3 scripts/quantization_report.py")
+                precision = "fp32"
+
+    if name != "torch":
+        if not Path(model_path).exists():
+            print(f"⚠ Backend {name} impossible sans {model_path} - retour à torch")
+        else:
+            try:
+                backend_class = OnnxBackend if name == "onnx" else OpenVinoBackend
+                return backend_class(model_path, precision=precision)
+            except ImportError as e:
+                print(f"⚠ Backend {name} non disponible ({e}) - retour à torch")
+                precision = "fp32"
+
+    return TorchBackend(model_path, precision=precision)
+
+
+def warm_up(backend, shape, runs=1):
+    """
+    Inférences à blanc sur une image noire (allocation mémoire, autotuning, JIT)
+
+    Args:
+        backend: Backend d'inférence
+        shape: (hauteur, largeur) des images de la caméra
+        runs: Nombre d'inférences
+    """
+    dummy = np.zeros((shape[0], shape[1], 3), dtype=np.uint8)
+    for _ in range(runs):
+        backend(dummy)
+
+
+def benchmark(backend, frames, warmup=3):
+    """
+    Mesurer le débit d'un backend sur une liste d'images
+
+    Retourne:
+        dict: fps, latence moyenne (ms) et nombre total de détections
+    """
+    for frame in frames[:warmup]:
+        backend(frame)
+
+    detections = 0
+    start = time.perf_counter()
+    for frame in frames:
+        detections += len(backend(frame))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": backend.name,
+        "frames": len(frames),
+        "fps": len(frames) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": 1000 * elapsed / max(1, len(frames)),
+        "detections": detections,
+    }
@@ -0,0 +1,406 @@
+"""
+Smart Bin SI - Pool de processus d'inférence (CPU multi-cœurs)
+- N processus chargent chacun le modèle une fois, avec un nombre de threads fixé
+  et des cœurs réservés (sched_setaffinity) : pas de concurrence entre workers
+- Les images passent par une file commune (le premier worker libre la prend)
+- submit() retourne un Future ; le pipeline garde plusieurs images en vol
+  et lit les résultats dans l'ordre des images
+- Le nombre de workers peut être choisi par benchmark (comparé au processus
+  unique) et mis en cache par machine / modèle
+
+Le pool augmente le débit (images/s), pas la latence d'une image.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import inference_backends
+
+try:
+    from config import INFERENCE_POOL_CACHE, INFERENCE_POOL_BENCHMARK_FRAMES, TRAINING_DIR
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import INFERENCE_POOL_CACHE, INFERENCE_POOL_BENCHMARK_FRAMES, TRAINING_DIR
+
+MIN_GAIN = 1.10          # Gain de débit min. sur le processus unique pour utiliser un pool
+READY_TIMEOUT = 300.0    # Chargement + warm-up max d'un worker (s)
+
+
+def available_cpus():
+    """Cœurs utilisables par ce processus."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_workers(workers, cpus=None):
+    """
+    Répartir les cœurs entre les workers (tranches contiguës)
+
+    Retourne:
+        list[list[int]]: Cœurs de chaque worker
+    """
+    cpus = available_cpus() if cpus is None else cpus
+    per_worker = max(1, len(cpus) // workers)
+    return [
+        cpus[(i * per_worker) % len(cpus):(i * per_worker) % len(cpus) + per_worker]
+        for i in range(workers)
+    ]
+
+
+# ============================================
+# PROCESSUS WORKER
+# ============================================
+
+def _worker_main(index, backend_name, model_path, precision, cores, warmup_shape, tasks, results):
+    """Boucle d'un worker : charger le modèle, puis traiter les images de la file."""
+    threads = len(cores)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            pass
+    cv2.setNumThreads(1)
+    inference_backends.ONNX_THREADS = threads
+
+    try:
+        if backend_name == "torch":
+            import torch
+            torch.set_num_threads(threads)
+        backend = inference_backends.create_backend(backend_name, model_path, precision)
+        inference_backends.warm_up(backend, warmup_shape)
+    except Exception as e:
+        results.put(("error", index, repr(e)))
+        return
+    results.put(("ready", index, (backend.names, backend.name, backend.resizable, backend.precision)))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        seq, frame, size = task
+        try:
+            detections = backend(frame, size=size) if size else backend(frame)
+            results.put(("result", seq, detections))
+        except Exception as e:
+            results.put(("failed", seq, repr(e)))
+
+
+# ============================================
+# POOL
+# ============================================
+
+class InferencePool:
+    """
+    N processus d'inférence derrière l'interface d'un backend :
+    pool(frame) est synchrone, pool.submit(frame) retourne un Future.
+    """
+
+    def __init__(self, backend_name, model_path, precision="fp32", workers=2,
+                 warmup_shape=(480, 640)):
+        """
+        Args:
+            backend_name: "torch", "onnx" ou "openvino" (chargé dans chaque worker)
+            model_path: Chemin vers best.pt
+            precision: "fp32", "fp16" ou "int8"
+            workers: Nombre de processus
+            warmup_shape: (hauteur, largeur) des images pour le warm-up
+        """
+        self.backend_name = backend_name
+        self.model_path = str(model_path)
+        self.requested_precision = precision
+        self.workers = workers
+        self.warmup_shape = tuple(warmup_shape)
+        self.cores = plan_workers(workers)
+
+        # Renseignés par les workers au démarrage (comme un backend)
+        self.name = backend_name
+        self.names = {}
+        self.resizable = False
+        self.precision = precision
+
+        self._context = multiprocessing.get_context("spawn")  # torch n'aime pas fork
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._processes = []
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._collector = None
+        self._closed = False
+        self._draining = False  # close(drain=True) : le collecteur attend les images en vol
+
+    def start(self, timeout=READY_TIMEOUT):
+        """
+        Lancer les workers et attendre qu'ils aient chargé le modèle
+
+        Retourne:
+            InferencePool: self
+
+        Lève:
+            RuntimeError: Un worker n'a pas pu charger le modèle
+        """
+        for i, cores in enumerate(self.cores):
+            process = self._context.Process(
+                target=_worker_main, name=f"inference-{i}", daemon=True,
+                args=(i, self.backend_name, self.model_path, self.requested_precision,
+                      cores, self.warmup_shape, self._tasks, self._results),
+            )
+            process.start()
+            self._processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        ready = 0
+        while ready < self.workers:
+            try:
+                kind, index, payload = self._results.get(timeout=1.0)
+            except queue.Empty:
+                if time.monotonic() > deadline or not all(p.is_alive() for p in self._processes):
+                    self.close()
+                    raise RuntimeError("worker d'inférence arrêté pendant le chargement")
+                continue
+            if kind == "error":
+                self.close()
+                raise RuntimeError(f"worker {index} : {payload}")
+            names, self.name, self.resizable, self.precision = payload
+            self.names = names
+            ready += 1
+
+        self._collector = threading.Thread(target=self._collect, name="inference-pool", daemon=True)
+        self._collector.start()
+        print(f"✓ Pool d'inférence prêt : {self.workers} processus "
+              f"({', '.join(str(len(c)) for c in self.cores)} threads)")
+        return self
+
+    def submit(self, frame, size=None):
+        """
+        Envoyer une image au premier worker libre
+
+        Args:
+            frame: Image OpenCV (BGR)
+            size: Taille d'entrée (backends à taille variable)
+
+        Retourne:
+            concurrent.futures.Future: Détections (N, 6)
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("pool d'inférence fermé")
+            self._seq += 1
+            seq = self._seq
+            self._futures[seq] = future
+        self._tasks.put((seq, frame, size))
+        return future
+
+    def __call__(self, frame, size=None):
+        return self.submit(frame, size).result()
+
+    def map(self, frames, in_flight=None):
+        """Détections de chaque image, dans l'ordre (au plus in_flight images en vol)."""
+        in_flight = in_flight or 2 * self.workers
+        pending = deque()
+        results = []
+        for frame in frames:
+            if len(pending) >= in_flight:
+                results.append(pending.popleft().result())
+            pending.append(self.submit(frame))
+        results.extend(future.result() for future in pending)
+        return results
+
+    def _collect(self):
+        """Thread : résultats des workers → Futures (échec de tous si un worker meurt)."""
+        while True:
+            try:
+                kind, seq, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._closed and not self._draining:
+                    return
+                if not all(p.is_alive() for p in self._processes):
+                    self._fail_pending(RuntimeError("worker d'inférence arrêté"))
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                future = self._futures.pop(seq, None)
+            if future is None:
+                continue
+            if kind == "result":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _fail_pending(self, error):
+        with self._lock:
+            self._closed = True
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.set_exception(error)
+
+    def close(self, drain=False, timeout=10.0):
+        """
+        Arrêter les workers
+
+        Args:
+            drain: Attendre les résultats des images en vol (sinon elles échouent)
+            timeout: Attente max des images en vol (s)
+        """
+        with self._lock:
+            self._closed = True
+            self._draining = drain
+        deadline = time.monotonic() + timeout
+        while drain and self._futures and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self._draining = False
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._fail_pending(RuntimeError("pool d'inférence fermé"))
+        if self._collector is not None:
+            self._collector.join(timeout=1.0)
+            self._collector = None
+
+
+# ============================================
+# CHOIX AUTOMATIQUE DU NOMBRE DE WORKERS
+# ============================================
+
+def _cache_key(backend_name, model_path, precision):
+    version = "yolov5s"
+    if Path(model_path).exists():
+        version = inference_backends.file_sha256(model_path)[:12]
+    return f"{platform.node()}|{len(available_cpus())}cpu|{backend_name}|{precision}|{version}"
+
+
+def _read_cache(path=INFERENCE_POOL_CACHE):
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_workers(backend_name, model_path, precision, path=INFERENCE_POOL_CACHE):
+    """Nombre de workers choisi lors d'un benchmark précédent (ou None)."""
+    entry = _read_cache(path).get(_cache_key(backend_name, model_path, precision))
+    return entry["workers"] if entry else None
+
+
+def benchmark_frames(shape, count=INFERENCE_POOL_BENCHMARK_FRAMES):
+    """Images du benchmark : images d'apprentissage si présentes, sinon bruit."""
+    frames = []
+    paths = sorted(p for p in Path(TRAINING_DIR).rglob("*.jpg") if "_errors" not in p.parts)
+    for p in paths[:count]:
+        frame = cv2.imread(str(p))
+        if frame is not None:
+            frames.append(cv2.resize(frame, (shape[1], shape[0])))
+    rng = np.random.default_rng(0)
+    while len(frames) < count:
+        frames.append(rng.integers(0, 256, (shape[0], shape[1], 3), dtype=np.uint8))
+    return frames
+
+
+def select_workers(baseline, backend_name, model_path, precision, shape,
+                   count=INFERENCE_POOL_BENCHMARK_FRAMES, path=INFERENCE_POOL_CACHE):
+    """
+    Comparer le processus unique à des pools de 2..N workers et garder le
+    plus rapide (pool retenu seulement s'il gagne au moins MIN_GAIN)
+
+    Args:
+        baseline: Backend déjà chargé dans ce processus (référence)
+        backend_name, model_path, precision: Backend chargé par les workers
+        shape: (hauteur, largeur) des images de la caméra
+        count: Images du benchmark
+        path: Fichier cache (clé : machine, nb de cœurs, backend, modèle)
+
+    Retourne:
+        int: Nombre de workers (1 = pas de pool)
+    """
+    frames = benchmark_frames(shape, count)
+    print(f"⏱ Choix du nombre de processus d'inférence ({len(frames)} images)...")
+    single = inference_backends.benchmark(baseline, frames)["fps"]
+    results = [{"workers": 1, "fps": round(single, 2)}]
+    print(f"   1 processus : {single:.1f} FPS")
+
+    best_workers, best_fps = 1, single
+    for workers in range(2, len(available_cpus()) + 1):
+        try:
+            pool = InferencePool(backend_name, model_path, precision, workers, shape).start()
+        except RuntimeError as e:
+            print(f"⚠ Pool de {workers} processus impossible : {e}")
+            break
+        try:
+            pool.map(frames[:3])  # Warm-up des files et de chaque worker
+            start = time.perf_counter()
+            pool.map(frames)
+            fps = len(frames) / (time.perf_counter() - start)
+        finally:
+            pool.close()
+        results.append({"workers": workers, "fps": round(fps, 2)})
+        print(f"   {workers} processus : {fps:.1f} FPS")
+        if fps > best_fps:
+            best_fps = fps
+            if fps >= MIN_GAIN * single:
+                best_workers = workers
+        elif fps < 0.95 * best_fps:
+            break  # Au-delà, les workers se gênent (mémoire, cœurs)
+
+    cache = _read_cache(path)
+    cache[_cache_key(backend_name, model_path, precision)] = {
+        "workers": best_workers,
+        "results": results,
+        "date": datetime.now().isoformat(timespec="seconds"),
+    }
+    Path(path).write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    print(f"✓ {best_workers} processus d'inférence retenu(s) (cache : {Path(path).name})")
+    return best_workers
+
+
+def create_inference(backend_name, model_path, precision="fp32", workers=1, shape=(480, 640)):
+    """
+    Backend dans ce processus, ou pool de processus
+
+    Args:
+        workers: 1 = dans ce processus, N > 1 = pool de N processus,
+            0 = choix automatique (cache, sinon benchmark)
+        shape: (hauteur, largeur) des images de la caméra
+
+    Retourne:
+        Backend ou InferencePool
+    """
+    backend = None
+    if workers == 0:
+        workers = cached_workers(backend_name, model_path, precision)
+        if workers is None:
+            backend = inference_backends.create_backend(backend_name, model_path, precision)
+            workers = select_workers(backend, backend_name, model_path, precision, shape)
+    if workers <= 1:
+        if backend is None:
+            backend = inference_backends.create_backend(backend_name, model_path, precision)
+        return backend
+
+    backend = None  # Libérer le modèle de ce processus avant de lancer les workers
+    try:
+        return InferencePool(backend_name, model_path, precision, workers, shape).start()
+    except RuntimeError as e:
+        print(f"⚠ Pool d'inférence impossible ({e}) - un seul processus")
+        return inference_backends.create_backend(backend_name, model_path, precision)
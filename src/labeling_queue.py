@@ -0,0 +1,290 @@
+"""
+Smart Bin SI - File d'étiquetage persistante (remplace les input() du mode apprentissage)
+- Le détecteur ajoute une demande (image, détection, piste) et continue de tourner :
+  JPEG et requêtes SQLite dans un thread dédié (LabelingWriter)
+- Les opérateurs répondent depuis l'interface admin (/api/labeling/...)
+- Les réponses alimentent la base objet → bac et les images d'apprentissage
+
+Utilise les connexions de waste_classifier (appeler init_database() avant).
+"""
+
+import json
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+import waste_classifier
+from training_writer import TrainingImageWriter
+
+try:
+    from config import (
+        LABELING_DIR, LABELING_MAX_PENDING, LABELING_QUEUE_SIZE, VALID_BINS, SAVE_IMAGES,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        LABELING_DIR, LABELING_MAX_PENDING, LABELING_QUEUE_SIZE, VALID_BINS, SAVE_IMAGES,
+    )
+
+# Motifs d'une demande
+REASON_CONFIRM = "confirm"   # La détection est-elle correcte ?
+REASON_UNKNOWN = "unknown"   # Objet sans bac connu : quel bac ?
+
+# Les identifiants de piste repartent de 1 à chaque démarrage du détecteur
+_session_start = datetime.now().isoformat()
+
+_STOP = object()
+
+_COLUMNS = ("id", "created_at", "reason", "detected_class", "class_id", "confidence",
+            "bbox", "track_id", "frame_path", "status", "label", "bin_color", "resolved_at")
+
+
+def _row_to_dict(row):
+    entry = dict(zip(_COLUMNS, row))
+    entry["bbox"] = json.loads(entry["bbox"]) if entry["bbox"] else None
+    return entry
+
+
+def pending_count():
+    """Nombre de demandes en attente."""
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return 0
+        return conn.execute(
+            "SELECT COUNT(*) FROM labeling_queue WHERE status = 'pending'"
+        ).fetchone()[0]
+
+
+def enqueue(frame, detection, reason=REASON_CONFIRM, class_id=None):
+    """
+    Ajouter une demande d'étiquetage tout de suite (JPEG + SQLite : depuis la boucle
+    caméra, passer par LabelingWriter.submit)
+
+    Args:
+        frame: Image de la détection (sauvegardée en JPEG dans LABELING_DIR)
+        detection: dict avec 'class', 'confidence', 'bbox' et 'track_id'
+        reason: REASON_CONFIRM ou REASON_UNKNOWN
+        class_id: Index de la classe dans le modèle (pour le label YOLO)
+
+    Retourne:
+        int: Identifiant de la demande, ou None si non ajoutée
+    """
+    detected_class = detection["class"].strip().lower()
+    track_id = detection.get("track_id")
+
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return None
+        # Une seule demande par piste et motif, et par objet inconnu tant qu'elle n'est pas traitée
+        if track_id is not None and conn.execute(
+                "SELECT 1 FROM labeling_queue WHERE status = 'pending' AND track_id = ? "
+                "AND reason = ? AND created_at >= ?", (track_id, reason, _session_start)).fetchone():
+            return None
+        if reason == REASON_UNKNOWN and conn.execute(
+                "SELECT 1 FROM labeling_queue WHERE status = 'pending' AND reason = ? "
+                "AND detected_class = ?", (reason, detected_class)).fetchone():
+            return None
+    if pending_count() >= LABELING_MAX_PENDING:
+        print(f"⚠ File d'étiquetage pleine ({LABELING_MAX_PENDING}) - '{detected_class}' non proposé")
+        return None
+
+    now = datetime.now()
+    frame_path = None
+    if frame is not None:
+        LABELING_DIR.mkdir(parents=True, exist_ok=True)
+        frame_path = LABELING_DIR / f"{now.strftime('%Y%m%d_%H%M%S_%f')}.jpg"
+        if not cv2.imwrite(str(frame_path), frame):
+            frame_path = None
+
+    bbox = detection.get("bbox")
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return None
+        cursor = conn.execute("""
+            INSERT INTO labeling_queue
+                (created_at, reason, detected_class, class_id, confidence, bbox, track_id, frame_path)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            now.isoformat(), reason, detected_class, class_id,
+            float(detection.get("confidence", 1.0)),
+            json.dumps([round(float(v), 1) for v in bbox]) if bbox is not None else None,
+            track_id,
+            frame_path.name if frame_path else None,
+        ))
+        conn.commit()
+        return cursor.lastrowid
+
+
+class LabelingWriter:
+    """Thread qui écrit les demandes d'étiquetage (JPEG + ligne SQLite) hors boucle caméra."""
+
+    def __init__(self, queue_size=LABELING_QUEUE_SIZE):
+        """
+        Args:
+            queue_size: Demandes en attente max (au-delà : demande ignorée)
+        """
+        self.queued = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="labeling-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Écrire les demandes en attente puis arrêter le thread (avant de fermer la base)."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, frame, detection, reason=REASON_CONFIRM, class_id=None):
+        """
+        Programmer une demande (sans bloquer). L'image ne doit plus être modifiée
+        par l'appelant.
+
+        Retourne:
+            bool: False si la file est pleine (demande ignorée)
+        """
+        try:
+            self._queue.put_nowait((frame, dict(detection), reason, class_id))
+        except queue.Full:
+            self.dropped += 1
+            print(f"⚠ File d'étiquetage occupée - '{detection['class']}' non proposé")
+            return False
+        return True
+
+    def _run(self):
+        # Un seul thread : les doublons (même piste, même objet inconnu) sont vus
+        # par la demande suivante
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            frame, detection, reason, class_id = job
+            try:
+                entry_id = enqueue(frame, detection, reason=reason, class_id=class_id)
+            except Exception as e:
+                print(f"⚠ Erreur file d'étiquetage : {e}")
+                continue
+            if entry_id is not None:
+                self.queued += 1
+                print(f"📝 Étiquetage #{entry_id} en attente : {detection['class']}")
+
+
+def list_pending(limit=50):
+    """Demandes en attente, les plus anciennes d'abord."""
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return []
+        rows = conn.execute(f"""
+            SELECT {', '.join(_COLUMNS)} FROM labeling_queue
+            WHERE status = 'pending' ORDER BY id LIMIT ?
+        """, (limit,)).fetchall()
+    return [_row_to_dict(row) for row in rows]
+
+
+def get_entry(entry_id):
+    """Demande par identifiant (ou None)."""
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return None
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM labeling_queue WHERE id = ?", (entry_id,)
+        ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def frame_file(entry):
+    """Chemin de l'image d'une demande (ou None si absente)."""
+    if not entry or not entry["frame_path"]:
+        return None
+    path = LABELING_DIR / entry["frame_path"]
+    return path if path.exists() else None
+
+
+def _close(entry_id, status, label=None, bin_color=None):
+    """Clore une demande en attente (False si base fermée ou demande déjà traitée)."""
+    with waste_classifier.connection() as conn:
+        if conn is None:
+            return False
+        cursor = conn.execute("""
+            UPDATE labeling_queue SET status = ?, label = ?, bin_color = ?, resolved_at = ?
+            WHERE id = ? AND status = 'pending'
+        """, (status, label, bin_color, datetime.now().isoformat(), entry_id))
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def resolve(entry_id, label, bin_color=None):
+    """
+    Répondre à une demande
+
+    - label == classe détectée : détection confirmée, image + label YOLO sauvegardés
+    - autre label : correction, image sauvegardée sous le bon nom et dans _errors/
+    - bin_color : association objet → bac enregistrée (save_to_database)
+
+    Args:
+        entry_id: Identifiant de la demande
+        label: Vrai nom de l'objet
+        bin_color: Bac de l'objet (obligatoire pour un objet inconnu)
+
+    Retourne:
+        (bool, str): Succès et message
+    """
+    entry = get_entry(entry_id)
+    if entry is None:
+        return False, f"Demande {entry_id} introuvable"
+    if entry["status"] != "pending":
+        return False, f"Demande {entry_id} déjà traitée ({entry['status']})"
+    label = (label or "").strip().lower().replace(" ", "_")
+    if not label:
+        return False, "Nom d'objet manquant"
+    if bin_color is not None and bin_color not in VALID_BINS:
+        return False, f"Bac invalide : {bin_color} (choix : {', '.join(VALID_BINS)})"
+    if entry["reason"] == REASON_UNKNOWN and bin_color is None:
+        return False, "Bac obligatoire pour un objet inconnu"
+
+    if bin_color is not None:
+        waste_classifier.save_to_database(label, bin_color)
+
+    detected = entry["detected_class"]
+    confirmed = label == detected
+    path = frame_file(entry)
+    frame = cv2.imread(str(path)) if path else None
+    if frame is not None and SAVE_IMAGES:
+        writer = TrainingImageWriter()
+        if confirmed:
+            writer.write(frame, label, bbox=entry["bbox"], class_id=entry["class_id"])
+        else:
+            writer.write(frame, label)
+            writer.write(frame, detected, correct=False)
+
+    if not _close(entry_id, "confirmed" if confirmed else "corrected", label, bin_color):
+        return False, f"Demande {entry_id} non enregistrée (base fermée ou déjà traitée)"
+    if path:
+        path.unlink(missing_ok=True)
+    if confirmed:
+        return True, f"Détection confirmée : {label}"
+    return True, f"Correction enregistrée : {detected} → {label}"
+
+
+def skip(entry_id):
+    """Ignorer une demande (image supprimée)."""
+    entry = get_entry(entry_id)
+    if entry is None:
+        return False, f"Demande {entry_id} introuvable"
+    if entry["status"] != "pending":
+        return False, f"Demande {entry_id} déjà traitée ({entry['status']})"
+    if not _close(entry_id, "skipped"):
+        return False, f"Demande {entry_id} non enregistrée (base fermée ou déjà traitée)"
+    path = frame_file(entry)
+    if path:
+        path.unlink(missing_ok=True)
+    return True, "Demande ignorée"
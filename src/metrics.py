@@ -0,0 +1,169 @@
+"""
+Smart Bin SI - Métriques du détecteur (latence par étape)
+- Histogrammes à seaux fixes (coût constant par mesure, pas de liste qui grossit)
+- Compteurs et jauges (FPS, images ignorées, ...)
+- Export périodique en JSON (écriture atomique) lu par l'interface admin
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+try:
+    from config import METRICS_PATH, METRICS_EXPORT_INTERVAL
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import METRICS_PATH, METRICS_EXPORT_INTERVAL
+
+# Bornes hautes des seaux en millisecondes (le dernier seau prend le reste)
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """Histogramme de latences à seaux fixes."""
+
+    def __init__(self, buckets_ms=BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q):
+        """
+        Estimation du percentile q (0-100) : interpolation linéaire dans le seau
+        concerné, jamais au-delà du maximum observé
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets_ms[i - 1] if i > 0 else 0.0
+                upper = self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+                upper = min(upper, self.max_ms)
+                lower = min(lower, upper)
+                return round(lower + (upper - lower) * max(0.0, rank - seen) / n, 3)
+            seen += n
+        return round(self.max_ms, 3)
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": list(self.buckets_ms),
+            "counts": list(self.counts),
+        }
+
+
+class Metrics:
+    """Registre des histogrammes, compteurs et jauges d'un processus."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Ajouter une durée (secondes) à l'histogramme d'une étape."""
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        histogram.observe(seconds)
+
+    def incr(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: h.snapshot() for name, h in self.histograms.items()}
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "stages": stages,
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+
+# Registre global du processus (détecteur, waste_classifier, ...)
+metrics = Metrics()
+
+
+def write_snapshot(path=METRICS_PATH):
+    """Écrire le snapshot JSON de façon atomique (fichier temporaire + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=METRICS_PATH):
+    """Lire le dernier snapshot exporté (None si le détecteur n'a rien exporté)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class MetricsExporter:
+    """Thread qui exporte les métriques toutes les METRICS_EXPORT_INTERVAL secondes."""
+
+    def __init__(self, path=METRICS_PATH, interval=METRICS_EXPORT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._export()
+
+    def _export(self):
+        try:
+            write_snapshot(self.path)
+        except OSError as e:
+            print(f"⚠ Export des métriques impossible : {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._export()
@@ -0,0 +1,287 @@
+"""
+Smart Bin SI - Rechargement du modèle à chaud (sans arrêter la caméra)
+- Surveille best.pt (date de modification) et un fichier commande
+  (admin : POST /api/detector/reload, ou `touch data/reload_model`)
+- Charge et chauffe le nouveau modèle dans un thread, puis compare sa latence
+  à celle du modèle en service mesurée par la boucle caméra (histogramme
+  "inference" des métriques : le modèle en service n'est jamais appelé ici)
+- Le détecteur l'échange entre deux images (take()) ; l'ancien modèle reste
+  en place si le chargement échoue, si les classes ne correspondent pas
+  ou s'il est trop lent
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import inference_backends
+from inference_pool import benchmark_frames
+from metrics import metrics
+
+try:
+    from config import (
+        MODEL_PATH, MODEL_RELOAD_INTERVAL, MODEL_RELOAD_COMMAND, MODEL_RELOAD_MAX_SLOWDOWN,
+        FRAME_HEIGHT, FRAME_WIDTH, MODELS_DIR,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        MODEL_PATH, MODEL_RELOAD_INTERVAL, MODEL_RELOAD_COMMAND, MODEL_RELOAD_MAX_SLOWDOWN,
+        FRAME_HEIGHT, FRAME_WIDTH, MODELS_DIR,
+    )
+
+LATENCY_FRAMES = 5  # Images pour mesurer la latence du nouveau modèle
+
+
+def model_file(model_path, models_dir=MODELS_DIR):
+    """
+    Poids .pt autorisés au rechargement : fichier existant sous MODELS_DIR
+    (un .pt est dépicklé au chargement : pas de chemin arbitraire)
+
+    Args:
+        model_path: Nom dans MODELS_DIR ("candidate.pt") ou chemin
+
+    Retourne:
+        Path: Chemin résolu
+
+    Lève:
+        ValueError: Chemin hors de MODELS_DIR, pas un .pt ou introuvable
+    """
+    models_dir = Path(models_dir).resolve()
+    path = (models_dir / model_path).resolve()  # Un chemin absolu remplace models_dir
+    if not path.is_relative_to(models_dir):
+        raise ValueError(f"modèle hors de {models_dir} : {model_path}")
+    if path.suffix != ".pt":
+        raise ValueError(f"poids .pt attendus : {model_path}")
+    if not path.is_file():
+        raise ValueError(f"modèle introuvable : {model_path}")
+    return path
+
+
+def request_reload(model_path=None, command_path=MODEL_RELOAD_COMMAND):
+    """
+    Demander au détecteur de recharger le modèle (depuis un autre processus)
+
+    Args:
+        model_path: Poids à charger (par défaut : MODEL_PATH)
+    """
+    command_path = Path(command_path)
+    tmp_path = command_path.with_suffix(".tmp")
+    tmp_path.write_text(str(model_path or ""), encoding="utf-8")
+    tmp_path.replace(command_path)
+
+
+def _file_stamp(path):
+    try:
+        stat = Path(path).stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _class_names(model):
+    names = model.names
+    if isinstance(names, dict):
+        names = [names[i] for i in sorted(names)]
+    return list(names)
+
+
+class CandidateModel:
+    """Modèle chargé et chauffé, prêt à remplacer le modèle courant."""
+
+    def __init__(self, model, model_path, latency_ms, version):
+        self.model = model
+        self.model_path = model_path
+        self.latency_ms = latency_ms
+        self.version = version  # Pour le manifeste (SHA-256 calculé hors boucle caméra)
+
+
+class ModelReloader:
+    """Thread de surveillance et de chargement ; l'échange est fait par le détecteur."""
+
+    def __init__(self, load_fn, model_path=MODEL_PATH, command_path=MODEL_RELOAD_COMMAND,
+                 interval=MODEL_RELOAD_INTERVAL, max_slowdown=MODEL_RELOAD_MAX_SLOWDOWN,
+                 shape=(FRAME_HEIGHT, FRAME_WIDTH)):
+        """
+        Args:
+            load_fn: Fonction chemin -> backend (même chargement qu'au démarrage)
+            model_path: Poids surveillés
+            command_path: Fichier commande de rechargement
+            interval: Période de contrôle (s)
+            max_slowdown: Latence max du nouveau modèle par rapport à l'ancien
+            shape: (hauteur, largeur) des images pour le warm-up et la mesure
+        """
+        self.load_fn = load_fn
+        self.model_path = str(model_path)
+        self.command_path = Path(command_path)
+        self.interval = interval
+        self.max_slowdown = max_slowdown
+        self.shape = shape
+        self.current_model = None
+        self.current_names = []
+        self.current_is_fallback = False
+        self.reloads = 0
+        self.failures = 0
+        self._candidate = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stamp = None
+        self._frames = None
+
+    @property
+    def ready(self):
+        """True si un nouveau modèle attend d'être échangé (lecture sans verrou)."""
+        return self._candidate is not None
+
+    def measure_latency(self, model):
+        """Latence moyenne (ms) d'un modèle pas encore en service, sur quelques images."""
+        if self._frames is None:
+            self._frames = benchmark_frames(self.shape, LATENCY_FRAMES)
+        return inference_backends.benchmark(model, self._frames, warmup=1)["latency_ms"]
+
+    def current_latency(self):
+        """
+        Latence p50 (ms) du modèle en service, mesurée par la boucle caméra
+        (None tant qu'il n'y a pas assez d'inférences)
+        """
+        histogram = metrics.histograms.get("inference")
+        if histogram is None or histogram.count < LATENCY_FRAMES:
+            return None
+        return histogram.percentile(50)
+
+    def start(self, current_model):
+        """
+        Lancer la surveillance
+
+        Args:
+            current_model: Modèle en service (référence pour les classes)
+        """
+        self.current_model = current_model
+        self.current_names = _class_names(current_model)
+        # Sans best.pt, le modèle courant est le YOLOv5s COCO : classes sans rapport
+        self.current_is_fallback = not Path(self.model_path).exists()
+        self._stamp = _file_stamp(self.model_path)
+        self.command_path.unlink(missing_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrêter la surveillance (un modèle chargé mais non échangé est libéré)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        candidate = self.take()
+        if candidate is not None:
+            _close_model(candidate.model)
+
+    def take(self):
+        """
+        Nouveau modèle prêt, ou None (appelé par le détecteur entre deux images)
+
+        Retourne:
+            CandidateModel ou None
+        """
+        with self._lock:
+            candidate, self._candidate = self._candidate, None
+        if candidate is not None:
+            self.current_model = candidate.model
+            self.current_names = _class_names(candidate.model)
+            self.current_is_fallback = False
+            self.reloads += 1
+            metrics.incr("model_reloads")
+        return candidate
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            path = self._poll()
+            if path is not None:
+                self._reload(path)
+
+    def _poll(self):
+        """Chemin à charger si une commande est arrivée ou si best.pt a changé."""
+        if self.command_path.exists():
+            try:
+                path = self.command_path.read_text(encoding="utf-8").strip()
+            except OSError:
+                path = ""
+            self.command_path.unlink(missing_ok=True)
+            print(f"\n🔄 Rechargement du modèle demandé ({path or self.model_path})")
+            if not path:
+                return self.model_path
+            try:
+                return str(model_file(path))
+            except ValueError as e:
+                self._reject(str(e))
+                return None
+
+        stamp = _file_stamp(self.model_path)
+        if stamp is None or stamp == self._stamp:
+            return None
+        # Fichier en cours de copie : attendre qu'il ne change plus
+        time.sleep(1.0)
+        if _file_stamp(self.model_path) != stamp:
+            return None
+        self._stamp = stamp
+        print(f"\n🔄 Nouveau modèle détecté : {self.model_path}")
+        return self.model_path
+
+    def _reload(self, model_path):
+        """Charger, chauffer et vérifier un modèle (l'ancien continue de tourner)."""
+        start = time.perf_counter()
+        try:
+            model = self.load_fn(model_path)
+            inference_backends.warm_up(model, self.shape)
+        except Exception as e:
+            self._reject(f"chargement impossible : {e}")
+            return
+
+        # Index de classes conservés (dataset_builder ajoute les nouvelles classes à la fin)
+        names = _class_names(model)
+        if not self.current_is_fallback and names[:len(self.current_names)] != self.current_names:
+            _close_model(model)
+            self._reject("classes différentes du modèle en service")
+            return
+
+        # Seul le nouveau modèle est appelé ici : le modèle en service appartient
+        # à la boucle caméra, sa latence vient de ses propres mesures
+        try:
+            latency_ms = self.measure_latency(model)
+        except Exception as e:
+            _close_model(model)
+            self._reject(f"inférence impossible : {e}")
+            return
+        current_ms = self.current_latency()
+        if current_ms is not None and latency_ms > self.max_slowdown * current_ms:
+            _close_model(model)
+            self._reject(f"trop lent ({latency_ms:.0f} ms contre {current_ms:.0f} ms)")
+            return
+
+        try:
+            version = inference_backends.model_version(model_path)
+        except OSError as e:
+            _close_model(model)
+            self._reject(f"poids illisibles : {e}")
+            return
+
+        with self._lock:
+            if self._candidate is not None:
+                _close_model(self._candidate.model)
+            self._candidate = CandidateModel(model, model_path, latency_ms, version)
+        current = f"{current_ms:.0f} ms" if current_ms is not None else "non mesuré"
+        print(f"✓ Nouveau modèle prêt en {time.perf_counter() - start:.1f} s "
+              f"({latency_ms:.0f} ms/image, ancien {current})")
+
+    def _reject(self, reason):
+        self.failures += 1
+        metrics.incr("model_reload_failures")
+        print(f"⚠ Nouveau modèle refusé, l'ancien reste en service : {reason}")
+
+
+def _close_model(model):
+    """Libérer un modèle (arrête les processus d'un pool)."""
+    if hasattr(model, "close"):
+        model.close(drain=True)
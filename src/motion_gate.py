@@ -0,0 +1,88 @@
+"""
+Smart Bin SI - Filtre de mouvement avant YOLO
+Compare une petite copie en niveaux de gris de chaque image à un fond moyen :
+YOLO n'est exécuté que si la scène change, si un objet est suivi,
+ou au moins toutes les MOTION_KEEPALIVE secondes.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+try:
+    from config import (
+        MOTION_FRAME_WIDTH, MOTION_PIXEL_THRESHOLD, MOTION_MIN_AREA, MOTION_KEEPALIVE,
+    )
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        MOTION_FRAME_WIDTH, MOTION_PIXEL_THRESHOLD, MOTION_MIN_AREA, MOTION_KEEPALIVE,
+    )
+
+
+class MotionGate:
+    """Pré-filtre peu coûteux : différence avec un fond moyen sur image réduite."""
+
+    def __init__(self, width=MOTION_FRAME_WIDTH, pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                 min_area=MOTION_MIN_AREA, keepalive=MOTION_KEEPALIVE, learning_rate=0.05):
+        """
+        Args:
+            width: Largeur de l'image réduite (la hauteur suit les proportions)
+            pixel_threshold: Écart de niveau de gris pour qu'un pixel soit "changé"
+            min_area: Fraction de pixels changés pour considérer que la scène bouge
+            keepalive: Délai max en secondes entre deux inférences
+            learning_rate: Vitesse d'adaptation du fond (changements de lumière)
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_area = min_area
+        self.keepalive = keepalive
+        self.learning_rate = learning_rate
+        self.background = None
+        self.last_inference = 0.0
+        self.inferred = 0
+        self.skipped = 0
+
+    def _small_gray(self, frame):
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.width / w))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def changed(self, frame):
+        """True si la part de pixels changés dépasse min_area (met le fond à jour)."""
+        gray = self._small_gray(frame)
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            return True
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed_ratio = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        return changed_ratio >= self.min_area
+
+    def should_infer(self, frame, tracking=False):
+        """
+        Décider si YOLO doit tourner sur cette image
+
+        Args:
+            frame: Image BGR
+            tracking: True si un objet est en cours de suivi
+        """
+        changed = self.changed(frame)
+        now = time.monotonic()
+        if changed or tracking or now - self.last_inference >= self.keepalive:
+            self.last_inference = now
+            self.inferred += 1
+            return True
+        self.skipped += 1
+        return False
+
+    @property
+    def skip_ratio(self):
+        total = self.inferred + self.skipped
+        return self.skipped / total if total else 0.0
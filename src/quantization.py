@@ -0,0 +1,336 @@
+"""
+Smart Bin SI - Modèle INT8 (ONNX Runtime) et comparaison avec le FP32
+- Calibration statique sur des images de TRAINING_DIR (manifeste ou dossiers)
+- Mesure de l'accord INT8 / FP32 (F1 et mAP@0.5, le FP32 servant de référence)
+- L'INT8 n'est utilisé que si l'accord a passé QUANT_MIN_AGREEMENT (validé
+  par scripts/quantization_report.py, noté dans best.int8.onnx.json)
+"""
+
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from inference_backends import ensure_onnx, file_sha256, preprocess
+from tracker import iou_matrix
+from training_writer import read_manifest
+
+try:
+    from config import (
+        TRAINING_DIR, TRAINING_MANIFEST, ONNX_IMG_SIZE,
+        QUANT_CALIBRATION_IMAGES, QUANT_MIN_AGREEMENT,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        TRAINING_DIR, TRAINING_MANIFEST, ONNX_IMG_SIZE,
+        QUANT_CALIBRATION_IMAGES, QUANT_MIN_AGREEMENT,
+    )
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def int8_paths(model_path):
+    """(best.int8.onnx, best.int8.onnx.json) à côté de best.pt."""
+    model_path = Path(model_path)
+    return model_path.with_suffix(".int8.onnx"), model_path.with_suffix(".int8.onnx.json")
+
+
+# ============================================
+# IMAGES DE CALIBRATION
+# ============================================
+
+def training_images(root=TRAINING_DIR, manifest_path=TRAINING_MANIFEST,
+                    limit=QUANT_CALIBRATION_IMAGES):
+    """
+    Images d'apprentissage correctes (hors _errors), réparties sur tout le jeu
+
+    Args:
+        root: Dossier des images d'apprentissage
+        manifest_path: Manifeste JSONL (utilisé s'il existe)
+        limit: Nombre maximum d'images
+
+    Retourne:
+        list[Path]: Images triées, échantillonnage régulier si plus que limit
+    """
+    paths = [
+        Path(root) / entry["path"] for entry in read_manifest(manifest_path)
+        if entry.get("correct", True)
+    ]
+    paths = [p for p in paths if p.exists()]
+    if not paths:
+        paths = [
+            p for p in Path(root).rglob("*")
+            if p.suffix.lower() in IMAGE_EXTENSIONS and "_errors" not in p.parts
+        ]
+    paths = sorted(set(paths))
+    if limit and len(paths) > limit:
+        step = len(paths) / limit
+        paths = [paths[int(i * step)] for i in range(limit)]
+    return paths
+
+
+def split_images(paths):
+    """Moitié pour la calibration, moitié pour l'évaluation (images différentes)."""
+    return paths[::2], paths[1::2]
+
+
+def load_images(paths):
+    """Lire les images (les fichiers illisibles sont ignorés)."""
+    frames = [cv2.imread(str(p)) for p in paths]
+    return [f for f in frames if f is not None]
+
+
+# ============================================
+# QUANTIFICATION STATIQUE ONNX RUNTIME
+# ============================================
+
+def quantize_onnx(model_path, calibration_paths, img_size=ONNX_IMG_SIZE):
+    """
+    Créer best.int8.onnx par quantification statique (QDQ, poids par canal)
+
+    Args:
+        model_path: Poids YOLOv5 (.pt)
+        calibration_paths: Images de calibration
+        img_size: Taille d'entrée du graphe
+
+    Retourne:
+        Path: Chemin du modèle INT8 (non validé tant que compare n'a pas été fait)
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static,
+    )
+
+    class ImageReader(CalibrationDataReader):
+        def __init__(self, paths, input_name):
+            self.paths = iter(paths)
+            self.input_name = input_name
+
+        def get_next(self):
+            for path in self.paths:
+                frame = cv2.imread(str(path))
+                if frame is not None:
+                    return {self.input_name: preprocess(frame, img_size)[0]}
+            return None
+
+    fp32_path, names = ensure_onnx(model_path, img_size)
+    int8_path, meta_path = int8_paths(model_path)
+    tmp_path = Path(str(int8_path) + ".tmp")
+
+    print(f"🔄 Quantification INT8 ({len(calibration_paths)} images de calibration)...")
+    quantize_static(
+        str(fp32_path), str(tmp_path),
+        ImageReader(calibration_paths, "images"),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    tmp_path.replace(int8_path)
+
+    meta_path.write_text(json.dumps({
+        "source": Path(model_path).name,
+        "source_sha256": file_sha256(model_path),
+        "img_size": img_size,
+        "names": {str(k): v for k, v in names.items()},
+        "calibration_images": len(calibration_paths),
+        "approved": False,
+    }, indent=2), encoding="utf-8")
+    print(f"✓ Modèle INT8 écrit : {int8_path}")
+    return int8_path
+
+
+def _read_meta(model_path):
+    meta_path = int8_paths(model_path)[1]
+    if not meta_path.exists():
+        return None
+    return json.loads(meta_path.read_text(encoding="utf-8"))
+
+
+def int8_model(model_path, img_size=ONNX_IMG_SIZE):
+    """
+    Modèle INT8 en cache pour ce best.pt
+
+    Retourne:
+        (Path, dict): Chemin du .int8.onnx et noms des classes
+
+    Lève:
+        FileNotFoundError: Modèle absent ou créé pour d'autres poids / une autre taille
+    """
+    int8_path = int8_paths(model_path)[0]
+    meta = _read_meta(model_path)
+    if (meta is None or not int8_path.exists()
+            or meta.get("source_sha256") != file_sha256(model_path)
+            or meta.get("img_size") != img_size):
+        raise FileNotFoundError(
+            f"modèle INT8 absent ou périmé ({int8_path.name}) : "
+            "lancer python3 scripts/quantization_report.py"
+        )
+    return int8_path, {int(k): v for k, v in meta["names"].items()}
+
+
+def is_approved(model_path, img_size=ONNX_IMG_SIZE, min_agreement=QUANT_MIN_AGREEMENT):
+    """
+    True si l'INT8 de ce best.pt existe et que son accord mesuré atteint le seuil
+    actuel (un rapport validé avec un seuil plus bas ne suffit pas)
+    """
+    try:
+        int8_model(model_path, img_size)
+    except FileNotFoundError:
+        return False
+    meta = _read_meta(model_path)
+    agreement = meta.get("agreement")
+    if not meta.get("approved") or agreement is None:
+        return False
+    return agreement >= min_agreement
+
+
+def record_approval(model_path, report, min_agreement=QUANT_MIN_AGREEMENT):
+    """
+    Noter le résultat de la comparaison dans best.int8.onnx.json
+
+    Retourne:
+        bool: True si l'INT8 est autorisé
+    """
+    meta_path = int8_paths(model_path)[1]
+    meta = _read_meta(model_path) or {}
+    approved = report["agreement"] >= min_agreement
+    meta.update({
+        "approved": approved,
+        "agreement": report["agreement"],
+        "map50_vs_fp32": report["map50_vs_fp32"],
+        "speedup": report["speedup"],
+        "min_agreement": min_agreement,
+        "evaluated_images": report["images"],
+        "evaluated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return approved
+
+
+# ============================================
+# COMPARAISON AVEC LE FP32
+# ============================================
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """
+    Appariement glouton (même classe, IoU >= seuil) par confiance décroissante
+
+    Retourne:
+        (np.ndarray, np.ndarray): Ordre des candidates, et index de la référence
+        appariée (-1 sinon) pour chacune (dans cet ordre)
+    """
+    order = np.argsort(-candidate[:, 4]) if len(candidate) else np.zeros(0, dtype=int)
+    matched = np.full(len(order), -1, dtype=np.int64)
+    if not len(reference) or not len(candidate):
+        return order, matched
+    ious = iou_matrix(candidate[order, :4], reference[:, :4])
+    ious[candidate[order, 5][:, None] != reference[:, 5][None, :]] = 0.0
+    used = np.zeros(len(reference), dtype=bool)
+    for i in range(len(order)):
+        row = np.where(used, 0.0, ious[i])
+        j = int(row.argmax())
+        if row[j] >= iou_threshold:
+            used[j] = True
+            matched[i] = j
+    return order, matched
+
+
+def average_precision(recall, precision):
+    """AP par interpolation sur tous les points (comme YOLOv5)."""
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    idx = np.where(mrec[1:] != mrec[:-1])[0]
+    return float(np.sum((mrec[idx + 1] - mrec[idx]) * mpre[idx + 1]))
+
+
+def agreement_stats(references, candidates, iou_threshold=0.5):
+    """
+    Accord entre deux modèles sur les mêmes images, le premier servant de vérité
+
+    Args:
+        references: Détections (N, 6) du FP32, une entrée par image
+        candidates: Détections (N, 6) du modèle testé, une entrée par image
+
+    Retourne:
+        dict: precision, recall, agreement (F1) et map50_vs_fp32
+    """
+    n_ref = sum(len(r) for r in references)
+    n_cand = sum(len(c) for c in candidates)
+    per_class = {}
+    tp = 0
+    for reference, candidate in zip(references, candidates):
+        order, matched = match_detections(reference, candidate, iou_threshold)
+        tp += int((matched >= 0).sum())
+        for k, i in enumerate(order):
+            cls = int(candidate[i, 5])
+            per_class.setdefault(cls, []).append((float(candidate[i, 4]), bool(matched[k] >= 0)))
+
+    if n_ref == 0 and n_cand == 0:
+        return {"precision": 1.0, "recall": 1.0, "agreement": 1.0, "map50_vs_fp32": 1.0}
+
+    ref_counts = {}
+    for reference in references:
+        for cls in reference[:, 5].astype(int):
+            ref_counts[int(cls)] = ref_counts.get(int(cls), 0) + 1
+    aps = []
+    for cls, n in ref_counts.items():
+        hits = sorted(per_class.get(cls, []), key=lambda h: -h[0])
+        flags = np.array([m for _, m in hits], dtype=float)
+        tpc = np.cumsum(flags)
+        fpc = np.cumsum(1.0 - flags)
+        recall = tpc / n if len(flags) else np.zeros(0)
+        precision = tpc / np.maximum(tpc + fpc, 1e-9) if len(flags) else np.zeros(0)
+        aps.append(average_precision(recall, precision))
+
+    precision = tp / n_cand if n_cand else 0.0
+    recall = tp / n_ref if n_ref else 0.0
+    f1 = 2 * tp / (n_ref + n_cand)
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "agreement": round(f1, 4),
+        "map50_vs_fp32": round(float(np.mean(aps)) if aps else 0.0, 4),
+    }
+
+
+def _run(backend, frames):
+    """Détections et latences (ms) d'un backend, après deux inférences de chauffe."""
+    for frame in frames[:2]:
+        backend(frame)
+    outputs, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        outputs.append(backend(frame))
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return outputs, latencies
+
+
+def compare(reference, candidate, frames):
+    """
+    Comparer un modèle quantifié au FP32 sur les mêmes images
+
+    Args:
+        reference: Backend FP32
+        candidate: Backend INT8 / FP16
+        frames: Images d'évaluation (hors calibration)
+
+    Retourne:
+        dict: Accord, mAP@0.5 vs FP32, latences p50 et accélération
+    """
+    ref_out, ref_ms = _run(reference, frames)
+    cand_out, cand_ms = _run(candidate, frames)
+    report = agreement_stats(ref_out, cand_out)
+    ref_p50 = float(np.percentile(ref_ms, 50)) if ref_ms else 0.0
+    cand_p50 = float(np.percentile(cand_ms, 50)) if cand_ms else 0.0
+    report.update({
+        "images": len(frames),
+        "reference_p50_ms": round(ref_p50, 2),
+        "candidate_p50_ms": round(cand_p50, 2),
+        "speedup": round(ref_p50 / cand_p50, 2) if cand_p50 else 0.0,
+    })
+    return report
@@ -0,0 +1,177 @@
+"""
+Smart Bin SI - Régulateur de cadence d'inférence
+- Cadence et taille d'entrée élevées quand un objet est suivi, basses au repos
+- Recul automatique si la température CPU/SoC ou la charge CPU dépasse un seuil
+  (évite le throttling thermique des Jetson / Raspberry Pi en bac fermé)
+- Décisions publiées dans les métriques du détecteur (jauges governor_*)
+"""
+
+import time
+
+from metrics import metrics
+
+try:
+    from config import (
+        GOVERNOR_ACTIVE_FPS, GOVERNOR_IDLE_FPS, GOVERNOR_ACTIVE_IMG_SIZE,
+        GOVERNOR_IDLE_IMG_SIZE, GOVERNOR_ACTIVE_HOLD, GOVERNOR_TEMP_LIMIT,
+        GOVERNOR_CPU_LIMIT, GOVERNOR_HYSTERESIS, GOVERNOR_THROTTLE_FACTOR,
+        GOVERNOR_SENSOR_INTERVAL,
+    )
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        GOVERNOR_ACTIVE_FPS, GOVERNOR_IDLE_FPS, GOVERNOR_ACTIVE_IMG_SIZE,
+        GOVERNOR_IDLE_IMG_SIZE, GOVERNOR_ACTIVE_HOLD, GOVERNOR_TEMP_LIMIT,
+        GOVERNOR_CPU_LIMIT, GOVERNOR_HYSTERESIS, GOVERNOR_THROTTLE_FACTOR,
+        GOVERNOR_SENSOR_INTERVAL,
+    )
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def read_temperature():
+    """
+    Température la plus haute parmi les capteurs (°C)
+
+    Retourne:
+        float ou None si aucun capteur n'est lisible (Windows, psutil absent, ...)
+    """
+    if psutil is None or not hasattr(psutil, "sensors_temperatures"):
+        return None
+    try:
+        sensors = psutil.sensors_temperatures()
+    except Exception:
+        return None
+    readings = [t.current for entries in sensors.values() for t in entries if t.current]
+    return max(readings) if readings else None
+
+
+def read_cpu_percent():
+    """Charge CPU (%) depuis le dernier appel, sans bloquer (None sans psutil)."""
+    if psutil is None:
+        return None
+    return psutil.cpu_percent(interval=None)
+
+
+class RateGovernor:
+    """Choisit la cadence d'inférence et la taille d'entrée à chaque image."""
+
+    def __init__(self, active_fps=GOVERNOR_ACTIVE_FPS, idle_fps=GOVERNOR_IDLE_FPS,
+                 active_size=GOVERNOR_ACTIVE_IMG_SIZE, idle_size=GOVERNOR_IDLE_IMG_SIZE,
+                 active_hold=GOVERNOR_ACTIVE_HOLD, temp_limit=GOVERNOR_TEMP_LIMIT,
+                 cpu_limit=GOVERNOR_CPU_LIMIT, hysteresis=GOVERNOR_HYSTERESIS,
+                 throttle_factor=GOVERNOR_THROTTLE_FACTOR,
+                 sensor_interval=GOVERNOR_SENSOR_INTERVAL):
+        """
+        Args:
+            active_fps: Inférences/s max quand un objet est suivi (0 = sans limite)
+            idle_fps: Inférences/s max quand la scène est vide
+            active_size: Taille d'entrée YOLO en activité
+            idle_size: Taille d'entrée YOLO au repos et en surchauffe
+            active_hold: Durée (s) en mode actif après la dernière activité
+            temp_limit: Température (°C) au-delà de laquelle on recule
+            cpu_limit: Charge CPU (%) au-delà de laquelle on recule
+            hysteresis: Marge (°C et %) sous les seuils pour sortir du recul
+            throttle_factor: Multiplicateur de cadence en surchauffe (0-1)
+            sensor_interval: Période de lecture des capteurs (s)
+        """
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.active_size = active_size
+        self.idle_size = idle_size
+        self.active_hold = active_hold
+        self.temp_limit = temp_limit
+        self.cpu_limit = cpu_limit
+        self.hysteresis = hysteresis
+        self.throttle_factor = throttle_factor
+        self.sensor_interval = sensor_interval
+
+        self.state = "idle"
+        self.throttled = False
+        self.temperature = None
+        self.cpu_percent = None
+        self.target_fps = idle_fps
+        self.img_size = idle_size
+        self._last_active = None
+        self._last_sensors = None
+        self._next_slot = 0.0
+        read_cpu_percent()  # Le premier appel sert de référence
+
+    def _read_sensors(self, now):
+        """Lire température et charge au plus toutes les sensor_interval secondes."""
+        if self._last_sensors is not None and now - self._last_sensors < self.sensor_interval:
+            return
+        self._last_sensors = now
+        self.temperature = read_temperature()
+        self.cpu_percent = read_cpu_percent()
+
+        temp, cpu = self.temperature, self.cpu_percent
+        if not self.throttled:
+            self.throttled = ((temp is not None and temp >= self.temp_limit) or
+                              (cpu is not None and cpu >= self.cpu_limit))
+            if self.throttled:
+                print(f"🌡 Surchauffe / surcharge (temp {temp} °C, CPU {cpu} %) - cadence réduite")
+        else:
+            cool = temp is None or temp < self.temp_limit - self.hysteresis
+            idle = cpu is None or cpu < self.cpu_limit - self.hysteresis
+            if cool and idle:
+                self.throttled = False
+                print("✓ Température / charge revenues à la normale - cadence rétablie")
+
+    def update(self, tracking, now=None):
+        """
+        Recalculer la cadence et la taille d'entrée
+
+        Args:
+            tracking: True si un objet est suivi (ou vient d'être détecté)
+            now: Horloge monotonic (par défaut : maintenant)
+        """
+        now = time.monotonic() if now is None else now
+        if tracking:
+            self._last_active = now
+        active = self._last_active is not None and now - self._last_active < self.active_hold
+        self._read_sensors(now)
+
+        state = "active" if active else "idle"
+        if state != self.state:
+            metrics.incr("governor_changes")
+        self.state = state
+
+        fps = self.active_fps if active else self.idle_fps
+        size = self.active_size if active else self.idle_size
+        if self.throttled:
+            fps = (fps or self.active_fps or self.idle_fps) * self.throttle_factor
+            size = min(size, self.idle_size)
+        self.target_fps = fps
+        self.img_size = size
+
+        metrics.set_gauge("governor_state", "throttled" if self.throttled else state)
+        metrics.set_gauge("governor_fps_target", round(fps, 2) if fps else 0)
+        metrics.set_gauge("governor_img_size", size)
+        metrics.set_gauge("cpu_temperature_c", self.temperature)
+        metrics.set_gauge("cpu_percent", self.cpu_percent)
+
+    def pace(self, tracking):
+        """
+        Attendre le prochain créneau d'inférence selon la cadence cible
+
+        Retourne:
+            float: Durée d'attente (s)
+        """
+        now = time.monotonic()
+        self.update(tracking, now)
+        interval = 1.0 / self.target_fps if self.target_fps else 0.0
+        # Passage au mode actif : ne pas attendre la fin d'un long créneau de repos
+        self._next_slot = min(self._next_slot, now + interval)
+        wait = self._next_slot - now
+        if wait > 0:
+            time.sleep(wait)
+        else:
+            wait = 0.0
+        self._next_slot = max(now, self._next_slot) + interval
+        return wait
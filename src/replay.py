@@ -0,0 +1,145 @@
+"""
+Smart Bin SI - Rejeu d'une vidéo ou d'un dossier d'images (sans caméra ni Arduino)
+Benchmark reproductible : latence par étape (percentiles), FPS et décisions de tri.
+
+Usage :
+    python3 src/replay.py <video|dossier> [--realtime] [--fps 10] [--sort] [--json rapport.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from config import MODEL_PATH
+from frame_sources import open_source
+from yolo_detector import WasteDetector
+import waste_classifier
+
+STAGES = ("capture", "motion", "inference", "postprocess", "decision")
+
+
+def percentiles(samples):
+    """Percentiles p50 / p90 / p99 / max en millisecondes."""
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ms = np.asarray(samples) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {
+        "count": len(samples),
+        "p50": round(float(p50), 2),
+        "p90": round(float(p90), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(ms.max()), 2),
+    }
+
+
+def replay(detector, source):
+    """
+    Rejouer une source d'images dans le détecteur (sans affichage)
+
+    Args:
+        detector: WasteDetector (modèle chargé en arrière-plan)
+        source: Source d'images (frame_sources)
+
+    Retourne:
+        dict: Rapport (latences, FPS, décisions de tri)
+    """
+    detector.wait_for_model()
+    timings = {stage: [] for stage in STAGES}
+    decisions = []
+    frames = 0
+
+    start = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        ret, frame = source.read()
+        if not ret:
+            break
+        timings["capture"].append(time.perf_counter() - t0)
+
+        detections = detector.infer(frame, timings)
+
+        t0 = time.perf_counter()
+        already = len(detector.sort_decisions)
+        detector.update_tracks(detections)
+        timings["decision"].append(time.perf_counter() - t0)
+
+        for _, waste_class, track_id in detector.sort_decisions[already:]:
+            decisions.append({
+                "frame": source.index - 1,
+                "time": round(source.position, 3),
+                "class": waste_class,
+                "track_id": track_id,
+            })
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "inferences": len(timings["inference"]),
+        "skipped_realtime": source.skipped,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "stages_ms": {stage: percentiles(timings[stage]) for stage in STAGES},
+        "sort_decisions": decisions,
+    }
+
+
+def print_report(report):
+    """Afficher le rapport de rejeu."""
+    print("\n" + "="*50)
+    print("📊 RAPPORT DE REJEU")
+    print("="*50)
+    print(f"Images : {report['frames']} (inférences : {report['inferences']}, "
+          f"sautées temps réel : {report['skipped_realtime']})")
+    print(f"Durée : {report['elapsed_s']:.2f} s | FPS : {report['fps']:.1f}")
+    print(f"\n{'Étape':12} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}   (ms)")
+    for stage, p in report["stages_ms"].items():
+        print(f"{stage:12} {p['p50']:8.2f} {p['p90']:8.2f} {p['p99']:8.2f} {p['max']:8.2f}")
+    print(f"\nDécisions de tri : {len(report['sort_decisions'])}")
+    for d in report["sort_decisions"]:
+        print(f"  • t={d['time']:.2f} s (image {d['frame']}) : {d['class']} (piste #{d['track_id']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu / benchmark du détecteur")
+    parser.add_argument("source", help="Fichier vidéo ou dossier d'images")
+    parser.add_argument("--realtime", action="store_true", help="Cadence de la source (sinon au plus vite)")
+    parser.add_argument("--fps", type=float, default=10.0, help="Cadence d'un dossier d'images")
+    parser.add_argument("--model", default=MODEL_PATH, help="Poids YOLO (.pt)")
+    parser.add_argument("--sort", action="store_true", help="Exécuter le tri (simulation, écrit en DB)")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    source = open_source(args.source, realtime=args.realtime, fps=args.fps)
+    if not source.isOpened():
+        print(f"✗ Source illisible : {args.source}")
+        return 1
+
+    detector = WasteDetector(args.model, hardware=False)
+    detector.show_display = False
+    detector.learning_mode = False
+    detector.dry_run = not args.sort
+    detector.governor = None  # Benchmark reproductible : cadence non régulée
+
+    try:
+        report = replay(detector, source)
+    finally:
+        source.release()
+        if detector.training_writer is not None:
+            detector.training_writer.close()
+        waste_classifier.cleanup()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Rapport écrit : {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Smart Bin SI - Évaluation d'un modèle candidat sur le trafic réel (mode shadow)
+- Une inférence sur SHADOW_SAMPLE_EVERY est aussi passée au modèle candidat,
+  dans un thread de basse priorité : la boucle caméra n'attend jamais
+  (image ignorée si le candidat est encore occupé)
+- Chaque comparaison est ajoutée à SHADOW_LOG_PATH (une ligne JSON compacte) :
+  détections des deux modèles, appariements, écarts de confiance par classe, latences
+- Nouvelle session dans le journal quand le modèle en service change (rechargement
+  à chaud) ; journal renommé en .jsonl.1 au-delà de SHADOW_LOG_MAX_BYTES
+- summarize() agrège le journal pour décider d'une promotion (/api/detector/shadow)
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import inference_backends
+from metrics import metrics
+from quantization import match_detections
+
+try:
+    from config import (
+        SHADOW_SAMPLE_EVERY, SHADOW_LOG_PATH, SHADOW_LOG_MAX_BYTES,
+        INFERENCE_BACKEND, INFERENCE_PRECISION,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        SHADOW_SAMPLE_EVERY, SHADOW_LOG_PATH, SHADOW_LOG_MAX_BYTES,
+        INFERENCE_BACKEND, INFERENCE_PRECISION,
+    )
+
+LOW_PRIORITY = 19   # nice du thread candidat (Linux : priorité par thread)
+FLUSH_EVERY = 20    # Lignes écrites avant un flush du journal
+
+
+def _names_list(names):
+    if isinstance(names, dict):
+        names = [names[i] for i in sorted(names)]
+    return list(names)
+
+
+def compare(primary, shadow, primary_names, shadow_names, iou_threshold=0.5):
+    """
+    Comparer les détections des deux modèles sur une image
+
+    Args:
+        primary: Détections (N, 6) du modèle en service (référence)
+        shadow: Détections (M, 6) du candidat
+        primary_names, shadow_names: Noms des classes de chaque modèle
+
+    Retourne:
+        dict: m (appariées), d [[classe, écart de confiance]], miss et extra (classes)
+    """
+    # Classes du candidat ramenées aux index du modèle en service (par nom)
+    index = {name: i for i, name in enumerate(primary_names)}
+    shadow = shadow.copy()
+    shadow_classes = [shadow_names[int(c)] for c in shadow[:, 5]]
+    shadow[:, 5] = [index.get(name, -1) for name in shadow_classes]
+
+    order, matched = match_detections(primary, shadow, iou_threshold)
+    deltas, extra = [], []
+    for k, i in enumerate(order):
+        j = matched[k]
+        if j >= 0:
+            deltas.append([primary_names[int(primary[j, 5])],
+                           round(float(shadow[i, 4] - primary[j, 4]), 3)])
+        else:
+            extra.append(shadow_classes[i])
+    used = set(int(j) for j in matched if j >= 0)
+    miss = [primary_names[int(primary[j, 5])] for j in range(len(primary)) if j not in used]
+    record = {"m": len(deltas), "d": deltas, "miss": miss, "extra": extra}
+    return {key: value for key, value in record.items() if value != []}  # Lignes courtes
+
+
+class ShadowEvaluator:
+    """Modèle candidat exécuté à côté du modèle en service, sur un échantillon d'images."""
+
+    def __init__(self, model_path, sample_every=SHADOW_SAMPLE_EVERY, log_path=SHADOW_LOG_PATH,
+                 primary_version=""):
+        """
+        Args:
+            model_path: Poids du modèle candidat
+            sample_every: Une inférence sur N est comparée
+            log_path: Journal JSONL des comparaisons
+            primary_version: Version du modèle en service (notée dans le journal,
+                à mettre à jour quand le modèle est remplacé à chaud)
+        """
+        self.model_path = str(model_path)
+        self.sample_every = max(1, sample_every)
+        self.log_path = Path(log_path)
+        self.primary_version = primary_version
+        self.model = None
+        self.names = []
+        self.compared = 0
+        self.dropped = 0
+        self.error = None
+        self._shadow_version = None
+        self._logged_primary = None  # Version du modèle en service de la session en cours
+        self._offered = 0
+        self._queue = queue.Queue(maxsize=1)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Charger le candidat et démarrer le thread (le chargement ne bloque pas la caméra)."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shadow-model", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def offer(self, frame, detections, latency, primary_names):
+        """
+        Proposer une inférence du modèle en service (appelé par l'étage d'inférence)
+
+        Args:
+            frame: Image inférée (copiée seulement si elle est échantillonnée)
+            detections: Détections (N, 6) du modèle en service
+            latency: Durée d'inférence du modèle en service (s)
+            primary_names: Noms des classes du modèle en service
+        """
+        self._offered += 1
+        if self.model is None or self._offered % self.sample_every:
+            return
+        try:
+            self._queue.put_nowait(
+                (frame.copy(), detections, latency, primary_names, self.primary_version))
+        except queue.Full:
+            self.dropped += 1  # Candidat encore occupé : la boucle caméra n'attend pas
+
+    def _run(self):
+        if not Path(self.model_path).exists():
+            print(f"⚠ Modèle candidat (shadow) introuvable : {self.model_path}")
+            return
+        if hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), LOW_PRIORITY)
+            except OSError:
+                pass
+        try:
+            model = inference_backends.create_backend(
+                INFERENCE_BACKEND, self.model_path, INFERENCE_PRECISION)
+            self.names = _names_list(model.names)
+            self.model = model
+        except Exception as e:
+            self.error = e
+            print(f"⚠ Modèle candidat (shadow) non chargé : {e}")
+            return
+        print(f"✓ Modèle candidat en évaluation : {Path(self.model_path).name} "
+              f"(1 inférence sur {self.sample_every})")
+
+        self._shadow_version = inference_backends.file_sha256(self.model_path)[:12]
+        log = self._open_log(self.primary_version)
+        try:
+            while not self._stop.is_set():
+                try:
+                    frame, detections, latency, primary_names, primary_version = \
+                        self._queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                start = time.perf_counter()
+                try:
+                    raw = self.model(frame)
+                except Exception as e:
+                    self.error = e
+                    print(f"⚠ Erreur du modèle candidat (shadow) : {e}")
+                    break
+                shadow_latency = time.perf_counter() - start
+                metrics.observe("shadow_inference", shadow_latency)
+
+                shadow = np.asarray(raw, dtype=np.float32).reshape(-1, 6)
+                record = compare(detections, shadow, primary_names, self.names)
+                record.update({
+                    "t": round(time.time(), 2),
+                    "p": len(detections),
+                    "s": len(shadow),
+                    "lp": round(latency * 1000, 1),
+                    "ls": round(shadow_latency * 1000, 1),
+                })
+                if primary_version != self._logged_primary:
+                    self._write_session(log, primary_version)  # Modèle remplacé à chaud
+                log.write(json.dumps(record, separators=(",", ":")) + "\n")
+                self.compared += 1
+                if self.compared % FLUSH_EVERY == 0:
+                    log.flush()
+                    if log.tell() > SHADOW_LOG_MAX_BYTES:
+                        log.close()
+                        log = self._open_log(primary_version)
+        finally:
+            log.close()
+
+    def _open_log(self, primary_version):
+        """Ouvrir le journal (renommé s'il est trop gros) et y commencer une session."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.log_path.exists() and self.log_path.stat().st_size > SHADOW_LOG_MAX_BYTES:
+            self.log_path.replace(self.log_path.with_suffix(".jsonl.1"))
+        log = open(self.log_path, "a", encoding="utf-8")
+        self._write_session(log, primary_version)
+        return log
+
+    def _write_session(self, log, primary_version):
+        log.write(json.dumps({
+            "session": datetime.now().isoformat(timespec="seconds"),
+            "primary": primary_version,
+            "shadow": self._shadow_version,
+            "shadow_path": self.model_path,
+        }) + "\n")
+        self._logged_primary = primary_version
+
+
+# ============================================
+# RÉSUMÉ (INTERFACE ADMIN)
+# ============================================
+
+def summarize(log_path=SHADOW_LOG_PATH, all_sessions=False):
+    """
+    Agréger le journal des comparaisons
+
+    Args:
+        log_path: Journal JSONL
+        all_sessions: False = seulement la dernière session du détecteur
+
+    Retourne:
+        dict ou None si aucun journal : accord (F1), précision / rappel par rapport
+        au modèle en service, latences des deux modèles, détail par classe
+    """
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return None
+    session = None
+    records = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Ligne en cours d'écriture
+            if "session" in entry:
+                session = entry
+                if not all_sessions:
+                    records = []
+            else:
+                records.append(entry)
+
+    n_primary = sum(r["p"] for r in records)
+    n_shadow = sum(r["s"] for r in records)
+    n_matched = sum(r["m"] for r in records)
+    classes = {}
+    for r in records:
+        for name, delta in r.get("d", []):
+            c = classes.setdefault(name, {"matched": 0, "delta_sum": 0.0, "missed": 0, "extra": 0})
+            c["matched"] += 1
+            c["delta_sum"] += delta
+        for key, field in (("miss", "missed"), ("extra", "extra")):
+            for name in r.get(key, []):
+                c = classes.setdefault(name, {"matched": 0, "delta_sum": 0.0, "missed": 0, "extra": 0})
+                c[field] += 1
+    for c in classes.values():
+        delta_sum = c.pop("delta_sum")
+        c["confidence_delta"] = round(delta_sum / c["matched"], 4) if c["matched"] else None
+
+    primary_ms = [r["lp"] for r in records]
+    shadow_ms = [r["ls"] for r in records]
+    both_empty = n_primary == 0 and n_shadow == 0
+    return {
+        "session": session,
+        "frames": len(records),
+        "detections_primary": n_primary,
+        "detections_shadow": n_shadow,
+        "agreement": 1.0 if both_empty else round(2 * n_matched / (n_primary + n_shadow), 4),
+        "precision": round(n_matched / n_shadow, 4) if n_shadow else None,
+        "recall": round(n_matched / n_primary, 4) if n_primary else None,
+        "latency_primary_ms": _latency_stats(primary_ms),
+        "latency_shadow_ms": _latency_stats(shadow_ms),
+        "classes": classes,
+    }
+
+
+def _latency_stats(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p90": round(float(np.percentile(values, 90)), 1),
+    }
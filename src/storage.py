@@ -0,0 +1,225 @@
+"""
+Smart Bin SI - Couche de stockage SQLite (base objet → bac, historique, bacs, étiquetage)
+- Journal WAL + synchronous=NORMAL : les lectures de l'interface admin ne bloquent
+  pas les écritures du détecteur (et inversement), un fsync par checkpoint
+  au lieu d'un par commit
+- busy_timeout : deux écrivains (détecteur, admin) s'attendent au lieu d'échouer
+  avec "database is locked"
+- Connexions réutilisées (pool) avec leur cache de requêtes préparées
+- Schéma versionné (PRAGMA user_version) : création et migrations une seule fois
+"""
+
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from config import (
+        DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_BUSY_TIMEOUT_MS, DB_POOL_SIZE,
+        DB_CACHED_STATEMENTS,
+    )
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_BUSY_TIMEOUT_MS, DB_POOL_SIZE,
+        DB_CACHED_STATEMENTS,
+    )
+
+# Migrations : (version, requêtes). Ne jamais modifier une migration publiée,
+# en ajouter une nouvelle (les bases existantes sont à la dernière version atteinte).
+MIGRATIONS = (
+    (1, (
+        # Table 1 : Classification (objet → bac)
+        """
+        CREATE TABLE IF NOT EXISTS waste_classification (
+            item_name TEXT PRIMARY KEY,
+            bin_color TEXT NOT NULL,
+            created_at TEXT,
+            usage_count INTEGER DEFAULT 1
+        )
+        """,
+        # Table 2 : Historique de tri (pour tracking remplissage)
+        """
+        CREATE TABLE IF NOT EXISTS sorting_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bin_color TEXT NOT NULL,
+            item_name TEXT,
+            timestamp TEXT NOT NULL,
+            confidence REAL DEFAULT 1.0
+        )
+        """,
+        # Table 3 : État des bacs (remplissage, dernière vidange)
+        """
+        CREATE TABLE IF NOT EXISTS bin_status (
+            bin_color TEXT PRIMARY KEY,
+            fill_level REAL DEFAULT 0.0,
+            item_count INTEGER DEFAULT 0,
+            last_emptied TEXT,
+            capacity_liters REAL DEFAULT 10.0
+        )
+        """,
+        # Table 4 : File d'étiquetage (confirmations traitées depuis l'interface admin)
+        """
+        CREATE TABLE IF NOT EXISTS labeling_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            detected_class TEXT NOT NULL,
+            class_id INTEGER,
+            confidence REAL,
+            bbox TEXT,
+            track_id INTEGER,
+            frame_path TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            label TEXT,
+            bin_color TEXT,
+            resolved_at TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_labeling_status ON labeling_queue (status, id)",
+    )),
+    # Historique de l'interface admin (ORDER BY timestamp DESC LIMIT n) sans tri complet
+    (2, (
+        "CREATE INDEX IF NOT EXISTS idx_history_timestamp ON sorting_history (timestamp)",
+    )),
+    # Version des associations objet → bac, incrémentée par tout processus qui les
+    # modifie (les usage_count ne comptent pas) : cache objet → bac du détecteur
+    (3, (
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "INSERT OR IGNORE INTO data_version (name, version) VALUES ('waste_classification', 0)",
+        """
+        CREATE TRIGGER IF NOT EXISTS waste_classification_insert
+        AFTER INSERT ON waste_classification BEGIN
+            UPDATE data_version SET version = version + 1 WHERE name = 'waste_classification';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS waste_classification_update
+        AFTER UPDATE OF item_name, bin_color ON waste_classification BEGIN
+            UPDATE data_version SET version = version + 1 WHERE name = 'waste_classification';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS waste_classification_delete
+        AFTER DELETE ON waste_classification BEGIN
+            UPDATE data_version SET version = version + 1 WHERE name = 'waste_classification';
+        END
+        """,
+    )),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_migrated = set()  # Bases déjà à jour dans ce processus
+
+
+def connect(db_path):
+    """
+    Ouvrir une connexion réglée (WAL, synchronous, busy_timeout, cache de requêtes)
+
+    Args:
+        db_path: Fichier SQLite
+
+    Retourne:
+        sqlite3.Connection utilisable depuis n'importe quel thread (une à la fois)
+    """
+    conn = sqlite3.connect(
+        str(db_path), timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS,
+    )
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+    return conn
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Appliquer les migrations manquantes (une transaction par migration)
+
+    Retourne:
+        int: Version du schéma après migration
+    """
+    version = schema_version(conn)
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre processus a pu migrer pendant l'attente du verrou
+            if schema_version(conn) >= target:
+                conn.rollback()
+                version = schema_version(conn)
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        version = target
+    return version
+
+
+class Database:
+    """Base SQLite d'un processus : pool de connexions réglées, schéma à jour."""
+
+    def __init__(self, db_path, pool_size=DB_POOL_SIZE):
+        """
+        Args:
+            db_path: Fichier SQLite (créé si besoin)
+            pool_size: Connexions gardées ouvertes entre deux utilisations
+        """
+        self.path = Path(db_path)
+        self.pool_size = max(1, pool_size)
+        self._pool = queue.LifoQueue()
+        self.closed = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = connect(self.path)
+        key = str(self.path.resolve())
+        if key not in _migrated:
+            migrate(conn)
+            _migrated.add(key)
+        self._pool.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Connexion empruntée au pool pour la durée du with
+        (transaction annulée si une exception sort du with)
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = connect(self.path)
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if not self.closed and self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                conn.close()  # Base fermée entre-temps, ou pool plein
+
+    def close(self):
+        """Fermer les connexions du pool (celles encore empruntées à leur retour)."""
+        self.closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,186 @@
+"""
+Smart Bin SI - Aperçu MJPEG sans écran (remplace cv2.imshow en mode HEADLESS)
+- Serveur HTTP léger à côté de l'interface admin : /stream.mjpg et /snapshot.jpg
+- Chaque image est encodée une seule fois puis envoyée à tous les clients
+- Aucun dessin ni encodage quand personne ne regarde (un /snapshot.jpg compte
+  comme un client le temps de recevoir une image fraîche)
+- Cadence du flux plafonnée indépendamment des FPS d'inférence
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+try:
+    from config import STREAM_HOST, STREAM_PORT, STREAM_MAX_FPS, STREAM_JPEG_QUALITY
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import STREAM_HOST, STREAM_PORT, STREAM_MAX_FPS, STREAM_JPEG_QUALITY
+
+BOUNDARY = "frame"
+
+
+class MjpegStreamer:
+    """Diffuse la dernière image annotée du détecteur en MJPEG."""
+
+    def __init__(self, host=STREAM_HOST, port=STREAM_PORT,
+                 max_fps=STREAM_MAX_FPS, quality=STREAM_JPEG_QUALITY):
+        """
+        Args:
+            host: Adresse d'écoute
+            port: Port HTTP du flux
+            max_fps: Cadence maximale du flux (images/s)
+            quality: Qualité JPEG (0-100)
+        """
+        self.host = host
+        self.port = port
+        self.min_interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.quality = quality
+        self.viewers = 0
+        self.published = 0
+        self._jpeg = None
+        self._seq = 0
+        self._last_publish = 0.0
+        self._cond = threading.Condition()
+        self._running = False
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Démarre le serveur HTTP dans un thread (False si le port est pris)."""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        except OSError as e:
+            print(f"⚠ Flux MJPEG indisponible (port {self.port}) : {e}")
+            return False
+        self._server.daemon_threads = True
+        self._running = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="mjpeg-stream", daemon=True)
+        self._thread.start()
+        print(f"📺 Flux MJPEG : http://{self.host}:{self.port}/stream.mjpg")
+        return True
+
+    def stop(self):
+        """Arrête le serveur et libère les clients en attente."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def wants_frame(self):
+        """
+        Faut-il dessiner et encoder cette image ?
+        Non si aucun client n'est connecté ou si la cadence max est atteinte.
+        """
+        if not self.viewers:
+            return False
+        return time.monotonic() - self._last_publish >= self.min_interval
+
+    def publish(self, frame):
+        """Encode l'image une fois et la met à disposition de tous les clients."""
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        with self._cond:
+            self._jpeg = encoded.tobytes()
+            self._seq += 1
+            self._last_publish = time.monotonic()
+            self.published += 1
+            self._cond.notify_all()
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """
+        Attendre une image plus récente que last_seq
+
+        Retourne:
+            tuple: (seq, jpeg) - jpeg None si rien de nouveau ou serveur arrêté
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != last_seq or not self._running, timeout)
+            if not self._running or self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._jpeg
+
+    def snapshot(self, timeout=2.0):
+        """
+        Image fraîche pour /snapshot.jpg : compte comme un client jusqu'à ce que
+        le détecteur publie la suivante
+
+        Retourne:
+            bytes: JPEG, ou None si aucune image publiée avant timeout
+        """
+        with self._cond:
+            self.viewers += 1
+            last_seq = self._seq
+        try:
+            return self.wait_frame(last_seq, timeout)[1]
+        finally:
+            self._add_viewer(-1)
+
+    def _add_viewer(self, n):
+        with self._cond:
+            self.viewers += n
+
+
+def _make_handler(streamer):
+    """Handler HTTP lié à un MjpegStreamer."""
+
+    class StreamHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path in ("/", "/stream.mjpg"):
+                self._stream()
+            elif path == "/snapshot.jpg":
+                self._snapshot()
+            else:
+                self.send_error(404)
+
+        def _snapshot(self):
+            jpeg = streamer.snapshot()
+            if jpeg is None:
+                self.send_error(503, "Aucune image disponible")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(jpeg)
+
+        def _stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            streamer._add_viewer(1)
+            seq = 0
+            try:
+                while streamer._running:
+                    seq, jpeg = streamer.wait_frame(seq)
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                    )
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                streamer._add_viewer(-1)
+
+    return StreamHandler
@@ -0,0 +1,174 @@
+"""
+Smart Bin SI - Test de charge sans caméra, sans modèle ni Arduino
+Caméra synthétique (formes en mouvement) + backend "stub" (détections scriptées)
+dans la vraie boucle run_camera_detection → classify_and_sort : pipeline,
+suivi, base SQLite et série (pyserial "loop://") sous une cadence élevée.
+
+Usage :
+    python3 src/stress_test.py [--seconds 30] [--fps 120] [--latency-ms 5] [--objects-per-minute 600]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config import (
+    FRAME_WIDTH, FRAME_HEIGHT, SYNTHETIC_FPS, SYNTHETIC_OBJECTS_PER_MINUTE,
+    SYNTHETIC_CROSSING_SECONDS, STUB_LATENCY_MS, STUB_MISS_RATE,
+)
+from frame_sources import SyntheticCamera, SyntheticScene
+from inference_backends import StubBackend
+from metrics import metrics
+from yolo_detector import WasteDetector
+import waste_classifier
+
+
+class SerialSink(threading.Thread):
+    """Côté Arduino simulé : lit les commandes envoyées sur la série loop://, par bac."""
+
+    def __init__(self, port):
+        super().__init__(name="serial-sink", daemon=True)
+        self.port = port
+        self.commands = {}
+
+    def run(self):
+        while True:
+            try:
+                line = self.port.readline()
+            except Exception:
+                break  # Port fermé par waste_classifier.cleanup()
+            command = line.decode(errors="replace").strip()
+            if command:
+                self.commands[command] = self.commands.get(command, 0) + 1
+            elif not self.port.is_open:
+                break
+
+
+def db_counts(db_path):
+    """Lignes de sorting_history par bac dans la base du test."""
+    with sqlite3.connect(str(db_path)) as conn:
+        return dict(conn.execute(
+            "SELECT bin_color, COUNT(*) FROM sorting_history GROUP BY bin_color"
+        ).fetchall())
+
+
+def run(args, db_path, metrics_path):
+    """
+    Lancer le détecteur sur la caméra synthétique
+    (base et métriques à part : la base et /api/detector/metrics du service ne changent pas)
+
+    Retourne:
+        dict: Rapport (images, objets, décisions, base, série, métriques)
+    """
+    scene = SyntheticScene(
+        args.width, args.height, fps=SYNTHETIC_FPS,
+        objects_per_minute=args.objects_per_minute,
+        crossing_seconds=args.crossing_seconds, seed=args.seed,
+    )
+    realtime = args.fps > 0
+    frames = int(args.seconds * (args.fps if realtime else SYNTHETIC_FPS))
+    cap = SyntheticCamera(scene, fps=args.fps, frames=frames, realtime=realtime)
+    backend = StubBackend(scene, latency_ms=args.latency_ms, miss_rate=args.miss_rate)
+
+    detector = WasteDetector(hardware=False, backend=backend,
+                             db_path=db_path, metrics_path=metrics_path)
+    detector.show_display = False
+    detector.learning_mode = False
+    detector.governor = None  # Charge maximale : cadence non régulée
+    detector.sort_delay = args.sort_delay
+    # Au plus vite : chaque image est inférée (sinon la capture remplace les images en attente)
+    detector.drop_policy = "latest" if realtime else "block"
+    # Pas de serveur MJPEG, d'anneau partagé ni de rechargement : seulement la chaîne de tri
+    detector.stream_enabled = False
+    detector.frame_ring_enabled = False
+    detector.reload_enabled = False
+    waste_classifier.init_serial_connection(args.serial)
+    waste_classifier.start_actuator(sorting_duration=args.sort_duration)
+    sink = None
+    port = waste_classifier.get_service().serial
+    if args.serial.startswith("loop://") and port is not None:
+        sink = SerialSink(port)
+        sink.start()
+
+    # run_camera_detection ferme la base et la série en sortant
+    start = time.perf_counter()
+    detector.run_camera_detection(cap)
+    elapsed = time.perf_counter() - start
+    if sink is not None:
+        sink.join(timeout=2.0)
+
+    snapshot = metrics.snapshot()
+    return {
+        "frames": cap.index - cap.skipped,
+        "skipped_realtime": cap.skipped,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round((cap.index - cap.skipped) / elapsed, 2) if elapsed > 0 else 0.0,
+        "objects": scene.objects_until(cap.index),
+        "sort_decisions": len(detector.sort_decisions),
+        "db_rows": db_counts(db_path),
+        "serial_commands": sink.commands if sink is not None else {},
+        "stages_ms": {name: {key: h[key] for key in ("count", "p50_ms", "p99_ms", "max_ms")}
+                      for name, h in snapshot["stages"].items()},
+        "counters": snapshot["counters"],
+    }
+
+
+def print_report(report):
+    """Afficher le rapport du test de charge."""
+    print("\n" + "="*50)
+    print("📊 RAPPORT DU TEST DE CHARGE")
+    print("="*50)
+    print(f"Images : {report['frames']} en {report['elapsed_s']:.2f} s ({report['fps']:.1f} FPS, "
+          f"sautées temps réel : {report['skipped_realtime']})")
+    print(f"Objets entrés dans l'image : {report['objects']} | "
+          f"décisions de tri : {report['sort_decisions']}")
+    print(f"Base (sorting_history) : {report['db_rows']}")
+    print(f"Série (commandes reçues) : {report['serial_commands']}")
+    print(f"\n{'Étape':20} {'n':>7} {'p50':>8} {'p99':>8} {'max':>8}   (ms)")
+    for stage, h in sorted(report["stages_ms"].items()):
+        print(f"{stage:20} {h['count']:7d} {h['p50_ms']:8.2f} {h['p99_ms']:8.2f} {h['max_ms']:8.2f}")
+    if report["counters"]:
+        print(f"\nCompteurs : {report['counters']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge sans matériel")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Durée de la scène (s)")
+    parser.add_argument("--fps", type=float, default=SYNTHETIC_FPS,
+                        help="Cadence de la caméra (0 = au plus vite)")
+    parser.add_argument("--width", type=int, default=FRAME_WIDTH)
+    parser.add_argument("--height", type=int, default=FRAME_HEIGHT)
+    parser.add_argument("--objects-per-minute", type=float, default=SYNTHETIC_OBJECTS_PER_MINUTE)
+    parser.add_argument("--crossing-seconds", type=float, default=SYNTHETIC_CROSSING_SECONDS)
+    parser.add_argument("--latency-ms", type=float, default=STUB_LATENCY_MS,
+                        help="Durée simulée d'une inférence")
+    parser.add_argument("--miss-rate", type=float, default=STUB_MISS_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--serial", default="loop://", help="Port ou URL pyserial")
+    parser.add_argument("--sort-duration", type=float, default=0.05,
+                        help="Durée simulée d'un mouvement de tri (s)")
+    parser.add_argument("--sort-delay", type=float, default=0.0,
+                        help="Délai min. entre deux tris (s, AUTO_SORT_DELAY en service)")
+    parser.add_argument("--db", help="Base SQLite (par défaut : fichier temporaire)")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "stress.db"
+        report = run(args, db_path, Path(tmp) / "metrics.json")
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Rapport écrit : {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
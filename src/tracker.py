@@ -0,0 +1,219 @@
+"""
+Smart Bin SI - Suivi multi-objets léger
+- Association détections ↔ pistes par IoU (matrice vectorisée NumPy)
+- Option : filtre de Kalman à vitesse constante (style SORT) pour prédire les boîtes
+- Vote de classe pondéré par la confiance : un tri par objet physique
+"""
+
+import itertools
+
+import numpy as np
+
+try:
+    from config import (
+        TRACKER_TYPE, TRACK_IOU_THRESHOLD, TRACK_MAX_MISSES, TRACK_VOTE_RATIO,
+    )
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        TRACKER_TYPE, TRACK_IOU_THRESHOLD, TRACK_MAX_MISSES, TRACK_VOTE_RATIO,
+    )
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    IoU entre deux ensembles de boîtes
+
+    Args:
+        boxes_a: Tableau (N, 4) [x1, y1, x2, y2]
+        boxes_b: Tableau (M, 4) [x1, y1, x2, y2]
+
+    Retourne:
+        np.ndarray: Matrice (N, M)
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-9)
+
+
+# ============================================
+# FILTRE DE KALMAN (SORT)
+# ============================================
+
+class KalmanBoxFilter:
+    """
+    Filtre de Kalman à vitesse constante sur [cx, cy, surface, ratio]
+    (état : cx, cy, s, r, vcx, vcy, vs), comme dans SORT.
+    """
+
+    def __init__(self, bbox):
+        self.F = np.eye(7)
+        self.F[0, 4] = self.F[1, 5] = self.F[2, 6] = 1.0
+        self.H = np.eye(4, 7)
+        self.R = np.diag([1.0, 1.0, 10.0, 10.0])
+        self.Q = np.eye(7)
+        self.Q[4:, 4:] *= 0.01
+        self.Q[-1, -1] *= 0.01
+        self.P = np.eye(7) * 10.0
+        self.P[4:, 4:] *= 1000.0  # Vitesse initiale inconnue
+        self.x = np.zeros(7)
+        self.x[:4] = self._to_z(bbox)
+
+    @staticmethod
+    def _to_z(bbox):
+        x1, y1, x2, y2 = bbox
+        w, h = x2 - x1, y2 - y1
+        return np.array([x1 + w / 2, y1 + h / 2, w * h, w / max(h, 1e-6)])
+
+    def bbox(self):
+        """Boîte [x1, y1, x2, y2] de l'état courant."""
+        cx, cy, s, r = self.x[:4]
+        w = np.sqrt(max(s * r, 0.0))
+        h = s / w if w > 0 else 0.0
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.bbox()
+
+    def update(self, bbox):
+        y = self._to_z(bbox) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+
+
+# ============================================
+# PISTES ET TRACKER
+# ============================================
+
+class Track:
+    """Un objet physique suivi d'image en image."""
+
+    def __init__(self, track_id, detection, use_kalman=False):
+        self.id = track_id
+        self.bbox = detection[:4].astype(np.float32)
+        self.confidence = float(detection[4])
+        self.hits = 1
+        self.misses = 0
+        self.sorted = False  # Tri déjà déclenché pour cet objet
+        self.votes = {}
+        self.kalman = KalmanBoxFilter(self.bbox) if use_kalman else None
+        self._vote(detection)
+
+    def _vote(self, detection):
+        class_id = int(detection[5])
+        self.votes[class_id] = self.votes.get(class_id, 0.0) + float(detection[4])
+
+    def predict(self):
+        """Boîte attendue sur l'image courante (avant association)."""
+        if self.kalman is not None:
+            return self.kalman.predict()
+        return self.bbox
+
+    def update(self, detection):
+        if self.kalman is not None:
+            self.kalman.update(detection[:4])
+        self.bbox = detection[:4].astype(np.float32)
+        self.confidence = float(detection[4])
+        self.hits += 1
+        self.misses = 0
+        self._vote(detection)
+
+    @property
+    def class_id(self):
+        """Classe gagnante du vote pondéré par la confiance."""
+        return max(self.votes, key=self.votes.get)
+
+    @property
+    def vote_ratio(self):
+        """Part des votes de la classe gagnante (0-1)."""
+        return self.votes[self.class_id] / sum(self.votes.values())
+
+    @property
+    def mean_confidence(self):
+        """Confiance moyenne de la classe gagnante."""
+        return self.votes[self.class_id] / self.hits
+
+
+class IoUTracker:
+    """
+    Suivi par association IoU gloutonne (option Kalman).
+    Les pistes sans détection pendant max_misses images sont supprimées.
+    """
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_misses=TRACK_MAX_MISSES,
+                 use_kalman=(TRACKER_TYPE == "kalman")):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.use_kalman = use_kalman
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    @property
+    def active_count(self):
+        """Nombre de pistes pas encore triées."""
+        return sum(1 for track in self.tracks if not track.sorted)
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, detections):
+        """
+        Associer les détections de l'image aux pistes existantes
+
+        Args:
+            detections: Tableau (N, 6) [x1, y1, x2, y2, confiance, classe]
+
+        Retourne:
+            list: Pistes vues sur cette image
+        """
+        predicted = np.array([t.predict() for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+        matched_tracks, matched_dets = set(), set()
+
+        if len(self.tracks) and len(detections):
+            ious = iou_matrix(predicted, detections[:, :4])
+            # Paires triées par IoU décroissante, association gloutonne
+            for flat in np.argsort(-ious, axis=None):
+                t, d = divmod(int(flat), ious.shape[1])
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if t in matched_tracks or d in matched_dets:
+                    continue
+                self.tracks[t].update(detections[d])
+                matched_tracks.add(t)
+                matched_dets.add(d)
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for d in range(len(detections)):
+            if d not in matched_dets:
+                self.tracks.append(Track(next(self._ids), detections[d], self.use_kalman))
+
+        return [t for t in self.tracks if t.misses == 0]
+
+    def ready_tracks(self, min_hits, vote_ratio=TRACK_VOTE_RATIO):
+        """
+        Pistes prêtes pour le tri : vues assez souvent, classe stable, pas encore triées.
+        Triées de la plus vue à la moins vue.
+        """
+        ready = [
+            t for t in self.tracks
+            if not t.sorted and t.misses == 0
+            and t.hits >= min_hits and t.vote_ratio >= vote_ratio
+        ]
+        return sorted(ready, key=lambda t: (t.hits, t.mean_confidence), reverse=True)
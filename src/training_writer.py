@@ -0,0 +1,303 @@
+"""
+Smart Bin SI - Écriture asynchrone des images d'apprentissage
+- Encodage JPEG et écriture hors de la boucle caméra (threads + file bornée)
+- Noms sans collision (horodatage à la microseconde + compteur)
+- fsync par lots, puis ajout au manifeste (une ligne JSON par image)
+- Images quasi identiques (dHash) ignorées ou remplacées (DEDUP_MODE) ; une image
+  remplacée est retirée du manifeste par une entrée "removed" (read_manifest)
+"""
+
+import itertools
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+import cv2
+
+from image_dedup import HashIndex, dhash
+from metrics import metrics
+
+try:
+    from config import (
+        TRAINING_DIR, TRAINING_MANIFEST, TRAINING_WRITER_THREADS,
+        TRAINING_QUEUE_SIZE, TRAINING_FSYNC_BATCH, TRAINING_JPEG_QUALITY,
+        DEDUP_ENABLED, DEDUP_HAMMING_THRESHOLD, DEDUP_MODE,
+    )
+except ImportError:
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import (
+        TRAINING_DIR, TRAINING_MANIFEST, TRAINING_WRITER_THREADS,
+        TRAINING_QUEUE_SIZE, TRAINING_FSYNC_BATCH, TRAINING_JPEG_QUALITY,
+        DEDUP_ENABLED, DEDUP_HAMMING_THRESHOLD, DEDUP_MODE,
+    )
+
+_STOP = object()
+
+
+def training_folder(class_name, correct=True, root=TRAINING_DIR):
+    """Dossier d'une classe : <root>/<classe>/ ou <root>/_errors/<classe>/."""
+    return root / class_name if correct else root / "_errors" / class_name
+
+
+def yolo_label_line(bbox, class_id, frame_shape):
+    """
+    Ligne de label YOLO : class_id x_center y_center width height (normalisé 0-1)
+
+    Args:
+        bbox: [x1, y1, x2, y2] en pixels
+        class_id: Index de la classe
+        frame_shape: Forme de l'image
+    """
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2 = [float(x) for x in bbox]
+    x_center = ((x1 + x2) / 2) / w
+    y_center = ((y1 + y2) / 2) / h
+    width = (x2 - x1) / w
+    height = (y2 - y1) / h
+    return f"{class_id} {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}\n"
+
+
+def read_manifest(manifest_path=TRAINING_MANIFEST):
+    """
+    Entrées du manifeste encore valables (dans l'ordre d'écriture)
+    Les entrées "removed" (images remplacées par la déduplication) retirent
+    l'entrée précédente du même chemin.
+
+    Retourne:
+        list[dict]: Une entrée par image, [] si le manifeste est absent
+    """
+    entries = {}
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("removed"):
+                entries.pop(entry.get("path"), None)
+            elif entry.get("path"):
+                entries[entry["path"]] = entry
+    return list(entries.values())
+
+
+def fsync_path(path):
+    """fsync d'un fichier ou d'un dossier (ignoré si non supporté)."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class TrainingImageWriter:
+    """Pool de threads qui encode et écrit les images d'apprentissage."""
+
+    def __init__(self, root=TRAINING_DIR, manifest_path=TRAINING_MANIFEST,
+                 workers=TRAINING_WRITER_THREADS, queue_size=TRAINING_QUEUE_SIZE,
+                 fsync_batch=TRAINING_FSYNC_BATCH, model_version=None,
+                 dedup=DEDUP_ENABLED, dedup_mode=DEDUP_MODE):
+        """
+        Args:
+            root: Dossier racine des images (TRAINING_DIR)
+            manifest_path: Manifeste JSONL (ajout seulement)
+            workers: Nombre de threads d'écriture
+            queue_size: Images en attente max (au-delà : image ignorée)
+            fsync_batch: Nombre d'images écrites avant un fsync groupé
+            model_version: Version du modèle notée dans le manifeste
+            dedup: Comparer chaque image aux images de sa classe (dHash)
+            dedup_mode: "skip" (garder l'ancienne) ou "replace" (garder la nouvelle)
+        """
+        self.root = root
+        self.manifest_path = manifest_path
+        self.workers = max(1, workers)
+        self.fsync_batch = max(1, fsync_batch)
+        self.model_version = model_version
+        self.saved = 0
+        self.dropped = 0
+        self.deduplicated = 0  # Doublons ignorés ou remplacés
+        self.dedup = HashIndex(DEDUP_HAMMING_THRESHOLD) if dedup else None
+        self.dedup_mode = dedup_mode
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._unsynced = []  # (chemins écrits, entrées de manifeste) en attente de fsync
+        self._threads = []
+
+    def start(self):
+        """Démarre les threads d'écriture."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"training-writer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self):
+        """Écrit les images en attente, fait le dernier fsync et arrête les threads."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.flush()
+
+    def submit(self, frame, class_name, bbox=None, class_id=None, correct=True):
+        """
+        Programme l'écriture d'une image (sans bloquer).
+        L'image ne doit plus être modifiée par l'appelant.
+
+        Retourne:
+            Path: Chemin de l'image à venir, ou None si la file est pleine
+        """
+        job = self._job(frame, class_name, bbox, class_id, correct)
+        path = job[1]
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            print(f"⚠ File d'écriture pleine - image {class_name} ignorée")
+            return None
+        return path
+
+    def write(self, frame, class_name, bbox=None, class_id=None, correct=True):
+        """
+        Écrit une image tout de suite (hors boucle caméra, ex. interface admin),
+        avec fsync et entrée de manifeste.
+
+        Retourne:
+            Path: Chemin de l'image écrite
+        """
+        path = self._write(*self._job(frame, class_name, bbox, class_id, correct))
+        self.flush()
+        return path
+
+    def _job(self, frame, class_name, bbox, class_id, correct):
+        class_name = class_name.strip().lower().replace(" ", "_")
+        now = datetime.now()
+        prefix = "ok" if correct else "err"
+        base = f"{prefix}_{now.strftime('%Y%m%d_%H%M%S_%f')}_{next(self._seq):04d}"
+        path = training_folder(class_name, correct, self.root) / f"{base}.jpg"
+        return (frame, path, class_name, bbox, class_id, correct, now)
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                # Inactivité : ne pas laisser un lot partiel sans fsync
+                self.flush()
+                continue
+            if job is _STOP:
+                return
+            try:
+                self._write(*job)
+            except Exception as e:
+                print(f"⚠ Erreur écriture image d'apprentissage : {e}")
+
+    def _write(self, frame, path, class_name, bbox, class_id, correct, timestamp):
+        # Doublon d'une image déjà sauvegardée (même objet, même position) ?
+        duplicate = None
+        if self.dedup is not None:
+            image_hash = dhash(frame, bbox)
+            duplicate = self.dedup.find_duplicate(path.parent, image_hash)
+            if duplicate is not None and self.dedup_mode != "replace":
+                self._count(deduplicated=True)
+                return None
+
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, TRAINING_JPEG_QUALITY])
+        if not ok:
+            raise ValueError(f"encodage JPEG impossible ({path.name})")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                with open(path, "xb") as f:
+                    f.write(encoded.tobytes())
+                break
+            except FileExistsError:
+                path = path.with_name(f"{path.stem}_{next(self._seq):04d}.jpg")
+        written = [path]
+
+        # Fichier label YOLO (si bbox et classe connues)
+        if bbox is not None and class_id is not None and len(bbox) == 4:
+            label_path = path.with_suffix(".txt")
+            with open(label_path, "w") as f:
+                f.write(yolo_label_line(bbox, class_id, frame.shape))
+            written.append(label_path)
+
+        if self.dedup is not None:
+            if duplicate is not None:
+                # Mode "replace" : la nouvelle image remplace l'ancienne
+                old_path = path.parent / duplicate
+                old_path.unlink(missing_ok=True)
+                old_path.with_suffix(".txt").unlink(missing_ok=True)
+                self.dedup.remove(path.parent, duplicate)
+            self.dedup.add(path.parent, path.name, image_hash)
+
+        entry = {
+            "path": path.relative_to(self.root).as_posix(),
+            "class": class_name,
+            "class_id": class_id,
+            "bbox": [round(float(v), 1) for v in bbox] if bbox is not None else None,
+            "correct": correct,
+            "timestamp": timestamp.isoformat(),
+            "model_version": self.model_version,
+        }
+        entries = [entry]
+        if duplicate is not None:
+            replaced = (path.parent / duplicate).relative_to(self.root).as_posix()
+            entry["replaces"] = replaced
+            # L'ancienne image n'existe plus : la retirer du manifeste
+            entries.insert(0, {"path": replaced, "removed": True, "replaced_by": entry["path"],
+                               "timestamp": timestamp.isoformat()})
+        with self._lock:
+            self._unsynced.append((written, entries))
+            batch_full = len(self._unsynced) >= self.fsync_batch
+        self._count(deduplicated=duplicate is not None)
+        if batch_full:
+            self.flush()
+        return path
+
+    def _count(self, deduplicated):
+        """Compteurs d'images écrites / dédupliquées (aussi dans les métriques)."""
+        with self._lock:
+            if deduplicated:
+                self.deduplicated += 1
+                metrics.incr("training_deduplicated")
+            if not deduplicated or self.dedup_mode == "replace":
+                self.saved += 1
+                metrics.incr("training_saved")
+            total = self.saved + (self.deduplicated if self.dedup_mode != "replace" else 0)
+            metrics.set_gauge("training_dedup_rate",
+                              round(self.deduplicated / total, 3) if total else 0.0)
+
+    def flush(self):
+        """fsync des images du lot, puis ajout au manifeste (toujours après les données)."""
+        with self._lock:
+            batch, self._unsynced = self._unsynced, []
+        if not batch:
+            return
+        folders = set()
+        for written, _ in batch:
+            for path in written:
+                fsync_path(path)
+                folders.add(path.parent)
+        for folder in folders:
+            fsync_path(folder)
+
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                for _, entries in batch:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
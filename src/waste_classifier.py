@@ -1,11 +1,16 @@
 """
 Smart Bin SI - Base de données (objet → bac) + Arduino (tri)
 Utilisé par yolo_detector.py pour le tri et l'apprentissage des associations.
+ClassifierService porte la base et la série d'un processus ; les fonctions
+du module (init_database, classify_and_sort, ...) appellent le service partagé.
 """
 
 import sqlite3
+import threading
+import time
 import serial
 import serial.tools.list_ports
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
@@ -13,7 +18,8 @@ from datetime import datetime
 try:
     from config import (
         DB_PATH, ARDUINO_PORT, BAUD_RATE, SORTING_DURATION,
-        VALID_BINS, WASTE_TO_BIN_MAPPING,
+        VALID_BINS, WASTE_TO_BIN_MAPPING, ACTUATOR_MAX_PENDING,
+        BIN_CACHE_CHECK_INTERVAL,
     )
 except ImportError:
     import sys
@@ -21,136 +27,410 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).resolve().parent))
     from config import (
         DB_PATH, ARDUINO_PORT, BAUD_RATE, SORTING_DURATION,
-        VALID_BINS, WASTE_TO_BIN_MAPPING,
+        VALID_BINS, WASTE_TO_BIN_MAPPING, ACTUATOR_MAX_PENDING,
+        BIN_CACHE_CHECK_INTERVAL,
     )
 
-# Connexions globales
-_conn = None
-_serial = None
-
-
-def init_database():
-    """Crée la base SQLite et toutes les tables si besoin."""
-    global _conn
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    _conn = sqlite3.connect(str(DB_PATH))
-    
-    # Table 1 : Classification (objet → bac)
-    _conn.execute("""
-        CREATE TABLE IF NOT EXISTS waste_classification (
-            item_name TEXT PRIMARY KEY,
-            bin_color TEXT NOT NULL,
-            created_at TEXT,
-            usage_count INTEGER DEFAULT 1
-        )
-    """)
-    
-    # Table 2 : Historique de tri (pour tracking remplissage)
-    _conn.execute("""
-        CREATE TABLE IF NOT EXISTS sorting_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            bin_color TEXT NOT NULL,
-            item_name TEXT,
-            timestamp TEXT NOT NULL,
-            confidence REAL DEFAULT 1.0
-        )
-    """)
-    
-    # Table 3 : État des bacs (remplissage, dernière vidange)
-    _conn.execute("""
-        CREATE TABLE IF NOT EXISTS bin_status (
-            bin_color TEXT PRIMARY KEY,
-            fill_level REAL DEFAULT 0.0,
-            item_count INTEGER DEFAULT 0,
-            last_emptied TEXT,
-            capacity_liters REAL DEFAULT 10.0
-        )
-    """)
-    
-    # Initialiser les bacs s'ils n'existent pas
-    from config import VALID_BINS
-    for bin_color in VALID_BINS:
-        _conn.execute("""
-            INSERT OR IGNORE INTO bin_status (bin_color, last_emptied)
-            VALUES (?, ?)
-        """, (bin_color, datetime.now().isoformat()))
-    
-    _conn.commit()
-
-
-def init_serial_connection():
-    """Ouvre la connexion série vers l'Arduino. En mode simulation si pas d'Arduino."""
-    global _serial
-    if _serial is not None:
-        return
-    try:
-        _serial = serial.Serial(ARDUINO_PORT, BAUD_RATE, timeout=1)
-        # Laisser le temps à l'Arduino de reset
-        import time
-        time.sleep(2)
-        print("✓ Arduino connecté")
-    except Exception as e:
-        print(f"⚠ Arduino non détecté ({e}) - mode simulation")
-        _serial = None
-
-
-def init_serial():
-    """Alias pour compatibilité."""
-    init_serial_connection()
-
+from actuator import ActuatorWorker, ACCEPTED, COALESCED, REJECTED
+from metrics import metrics
+from storage import Database
+from write_behind import WriteBehindBuffer, FILL_PER_ITEM
 
-def cleanup():
-    """Ferme la DB et la série."""
-    global _conn, _serial
-    if _conn:
-        _conn.close()
-        _conn = None
-    if _serial and _serial.is_open:
-        _serial.close()
-        _serial = None
-
-
-def get_bin_color(item_name):
+class ClassifierService:
     """
-    Retourne la couleur du bac pour un objet (sans sauvegarder).
-    Cherche en DB, sinon mapping par défaut dans config.
+    Base objet → bac + Arduino, partagés par tous les threads d'un processus
+    (boucle caméra, worker de tri, requêtes de l'interface admin)
+    - SQLite : pool de connexions (storage.Database), chaque appel emprunte la sienne
+    - Série : un seul propriétaire, envois sérialisés par un verrou
+    - Cycle de vie explicite : open_database() / open_serial() / start_actuator() puis close()
     """
-    if not item_name:
-        return None
-    item_name = item_name.strip().lower()
-    # 1. Base de données
-    if _conn:
+
+    def __init__(self):
+        self.db = None
+        self.writes = None    # Tampon d'écriture de l'historique (write_behind)
+        self.serial = None
+        self.actuator = None  # Worker de tri (None = envoi bloquant)
+        self.sorting_duration = SORTING_DURATION
+        self._lock = threading.Lock()         # Ouverture / fermeture
+        self._serial_lock = threading.Lock()  # Une commande à la fois sur la série
+
+        # Cache objet → bac (la boucle caméra ne touche pas SQLite)
+        self._bin_cache = {}            # item_name -> bin_color, ou None (objet inconnu)
+        self._bin_cache_version = None  # data_version de waste_classification au dernier contrôle
+        self._bin_cache_checked = 0.0   # Dernier contrôle de la version (time.monotonic)
+
+    # ---------- Cycle de vie ----------
+
+    @property
+    def db_open(self):
+        return self.db is not None
+
+    def open_database(self, db_path=None):
+        """
+        Ouvre la base SQLite, schéma créé ou migré si besoin (une seule fois).
+        - db_path: autre fichier que DB_PATH (tests de charge) ; ferme l'ancienne base
+        """
+        db_path = Path(db_path or DB_PATH)
+        with self._lock:
+            if self.db is not None and self.db.path == db_path:
+                return
+            self._close_database()
+            db = Database(db_path)
+            # Initialiser les bacs s'ils n'existent pas (VALID_BINS peut changer)
+            with db.connection() as conn:
+                conn.executemany("""
+                    INSERT OR IGNORE INTO bin_status (bin_color, last_emptied)
+                    VALUES (?, ?)
+                """, [(bin_color, datetime.now().isoformat()) for bin_color in VALID_BINS])
+                conn.commit()
+            self.writes = WriteBehindBuffer(db)
+            self.writes.start()
+            self.db = db
+        self.invalidate_bin_cache()
+
+    def open_serial(self, port=None):
+        """
+        Ouvre la connexion série vers l'Arduino. En mode simulation si pas d'Arduino.
+        - port: autre port que ARDUINO_PORT, ou URL pyserial ("loop://" : série
+          simulée en mémoire pour les tests de charge)
+        """
+        with self._lock:
+            if self.serial is not None:
+                return
+            port = port or ARDUINO_PORT
+            try:
+                self.serial = serial.serial_for_url(port, BAUD_RATE, timeout=1)
+                if "://" not in port:
+                    # Laisser le temps à l'Arduino de reset
+                    time.sleep(2)
+                print(f"✓ Arduino connecté ({port})")
+            except Exception as e:
+                print(f"⚠ Arduino non détecté ({e}) - mode simulation")
+                self.serial = None
+
+    def start_actuator(self, sorting_duration=None):
+        """
+        Démarre le worker de tri : classify_and_sort ne bloque plus pendant SORTING_DURATION.
+        Le worker devient le seul à envoyer des commandes sur la série.
+        - sorting_duration: durée d'un mouvement (s) si différente de SORTING_DURATION
+        """
+        with self._lock:
+            if self.actuator is not None:
+                return
+            if sorting_duration is not None:
+                self.sorting_duration = sorting_duration
+            self.actuator = ActuatorWorker(self._run_sort_job, max_pending=ACTUATOR_MAX_PENDING)
+            self.actuator.start()
+
+    def stop_actuator(self):
+        """Arrête le worker de tri en laissant finir le tri en cours."""
+        actuator, self.actuator = self.actuator, None
+        if actuator is not None:
+            actuator.stop()
+
+    def close(self):
+        """Ferme la DB et la série (après le dernier tri)."""
+        self.stop_actuator()
+        with self._lock:
+            self._close_database()
+            self._bin_cache.clear()
+            if self.serial is not None and self.serial.is_open:
+                with self._serial_lock:
+                    self.serial.close()
+            self.serial = None
+
+    def _close_database(self):
+        writes, self.writes = self.writes, None
+        if writes is not None:
+            writes.close()  # Dernières détections écrites avant la fermeture
+        db, self.db = self.db, None
+        if db is not None:
+            db.close()
+
+    # ---------- Connexions SQLite ----------
+
+    @contextmanager
+    def connection(self):
+        """
+        Connexion SQLite empruntée au pool pour la durée du with
+        (None si la base n'est pas ouverte). Transaction annulée en cas d'erreur.
+        """
+        db = self.db
+        if db is None:
+            yield None
+            return
+        with db.connection() as conn:
+            yield conn
+
+    # ---------- Cache objet → bac ----------
+
+    def _classification_version(self):
+        """
+        Version des associations objet → bac (table data_version, incrémentée par
+        des triggers quel que soit le processus qui écrit), ou None sans base.
+        L'historique et les usage_count ne la changent pas.
+        """
+        with self.connection() as conn:
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT version FROM data_version WHERE name = 'waste_classification'"
+                ).fetchone()
+            except sqlite3.OperationalError:
+                return None
+        return row[0] if row else None
+
+    def invalidate_bin_cache(self):
+        """Vide le cache objet → bac (après une écriture dans waste_classification)."""
+        self._bin_cache.clear()
+        self._bin_cache_version = self._classification_version()
+        self._bin_cache_checked = time.monotonic()
+
+    def _check_bin_cache(self):
+        """Vide le cache si les associations ont changé (interface admin, autre processus)."""
+        now = time.monotonic()
+        if now - self._bin_cache_checked < BIN_CACHE_CHECK_INTERVAL:
+            return
+        self._bin_cache_checked = now
+        version = self._classification_version()
+        if version != self._bin_cache_version:
+            self._bin_cache.clear()
+            self._bin_cache_version = version
+
+    # ---------- Objet → bac ----------
+
+    def get_bin_color(self, item_name):
+        """
+        Retourne la couleur du bac pour un objet (sans sauvegarder).
+        Cherche dans le cache, puis en DB, sinon mapping par défaut dans config.
+        Les objets inconnus sont aussi mis en cache (entrée None).
+        """
+        if not item_name:
+            return None
+        item_name = item_name.strip().lower()
+        self._check_bin_cache()
         try:
-            row = _conn.execute(
-                "SELECT bin_color FROM waste_classification WHERE item_name = ?",
-                (item_name,)
-            ).fetchone()
-            if row:
-                return row[0]
-        except sqlite3.OperationalError:
+            return self._bin_cache[item_name]
+        except KeyError:
             pass
-    # 2. Mapping par défaut (config)
-    return WASTE_TO_BIN_MAPPING.get(item_name)
+        # 1. Base de données
+        with self.connection() as conn:
+            if conn is None:
+                # DB pas encore ouverte : ne pas figer le résultat
+                return WASTE_TO_BIN_MAPPING.get(item_name)
+            try:
+                start = time.perf_counter()
+                row = conn.execute(
+                    "SELECT bin_color FROM waste_classification WHERE item_name = ?",
+                    (item_name,)
+                ).fetchone()
+                metrics.observe("db_lookup", time.perf_counter() - start)
+                if row:
+                    self._bin_cache[item_name] = row[0]
+                    return row[0]
+            except sqlite3.OperationalError:
+                return WASTE_TO_BIN_MAPPING.get(item_name)
+        # 2. Mapping par défaut (config)
+        bin_color = WASTE_TO_BIN_MAPPING.get(item_name)
+        self._bin_cache[item_name] = bin_color
+        return bin_color
+
+    def save_to_database(self, item_name, bin_color):
+        """Enregistre ou met à jour l'association objet → bac."""
+        if bin_color not in VALID_BINS:
+            return False
+        item_name = item_name.strip().lower()
+        now = datetime.now().isoformat()
+        with self.connection() as conn:
+            if conn is None:
+                return False
+            try:
+                conn.execute("""
+                    INSERT INTO waste_classification (item_name, bin_color, created_at, usage_count)
+                    VALUES (?, ?, ?, 1)
+                    ON CONFLICT(item_name) DO UPDATE SET
+                        bin_color = excluded.bin_color,
+                        usage_count = usage_count + 1
+                """, (item_name, bin_color, now))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                return False
+        self.invalidate_bin_cache()
+        return True
 
+    # ---------- Tri (Arduino) ----------
+
+    def is_sorting(self):
+        """True si le worker a un tri en cours ou en attente."""
+        actuator = self.actuator
+        return actuator is not None and actuator.busy
+
+    def send_sort_command(self, bin_color):
+        """Envoie la commande de tri à l'Arduino."""
+        with self._serial_lock:
+            port = self.serial
+            if port and port.is_open:
+                try:
+                    start = time.perf_counter()
+                    port.write(f"{bin_color}\n".encode())
+                    port.flush()
+                    metrics.observe("serial", time.perf_counter() - start)
+                except Exception as e:
+                    print(f"⚠ Erreur envoi Arduino : {e}")
+                    return False
+                return True
+        print(f"[Simulation] → Tri vers bac {bin_color}")
+        return True
 
-def save_to_database(item_name, bin_color):
-    """Enregistre ou met à jour l'association objet → bac."""
-    if not _conn or bin_color not in VALID_BINS:
-        return False
-    item_name = item_name.strip().lower()
-    now = datetime.now().isoformat()
-    try:
-        _conn.execute("""
-            INSERT INTO waste_classification (item_name, bin_color, created_at, usage_count)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(item_name) DO UPDATE SET
-                bin_color = excluded.bin_color,
-                usage_count = usage_count + 1
-        """, (item_name, bin_color, now))
-        _conn.commit()
+    def _run_sort_job(self, bin_color):
+        """Envoie la commande puis attend la fin du mouvement (Arduino connecté)."""
+        self.send_sort_command(bin_color)
+        if self.serial and self.serial.is_open:
+            time.sleep(self.sorting_duration)
+
+    def dispatch_sort(self, bin_color):
+        """
+        Lance le tri : via le worker s'il est démarré, sinon de façon bloquante.
+        Retourne ACCEPTED, COALESCED ou REJECTED.
+        """
+        actuator = self.actuator
+        if actuator is not None:
+            return actuator.submit(bin_color)
+        self._run_sort_job(bin_color)
+        return ACCEPTED
+
+    def classify_and_sort(self, item_name, ask_if_unknown=True, auto_mode=False, confidence=1.0):
+        """
+        Détermine le bac pour l'objet, enregistre si nouveau, envoie la commande de tri.
+        - ask_if_unknown: si True, demande à l'utilisateur pour un objet inconnu
+        - auto_mode: si True, utilise uniquement le mapping sans demander
+        - confidence: confiance de la détection (0-1)
+        Retourne la couleur du bac utilisée, ou None.
+        """
+        if not item_name:
+            return None
+        item_name = item_name.strip().lower()
+        bin_color = self.get_bin_color(item_name)
+        known = bin_color is not None
+
+        if not known:
+            if ask_if_unknown and not auto_mode:
+                bin_color = ask_user_for_bin(item_name)
+                if bin_color:
+                    self.save_to_database(item_name, bin_color)
+            else:
+                return None
+
+        if bin_color:
+            # Envoyer commande Arduino (non bloquant si le worker tourne)
+            status = self.dispatch_sort(bin_color)
+            if status == REJECTED:
+                print(f"⏳ Tri déjà en cours - '{item_name}' ignoré")
+                return None
+            if status == COALESCED:
+                # Même bac déjà en cours de tri : c'est le même objet
+                return bin_color
+
+            # LOG LA DÉTECTION
+            self.log_detection(bin_color, item_name, confidence)
+            if known:
+                # Incrémenter usage_count (écrit avec le prochain lot de l'historique ;
+                # un nouvel objet est déjà compté par save_to_database)
+                writes = self.writes
+                if writes is not None:
+                    writes.add_usage(item_name)
+        return bin_color
+
+    # ---------- Historique et bacs ----------
+
+    def get_stats(self):
+        """Retourne les stats de la base (pour affichage), usages en attente compris."""
+        writes = self.writes
+        if writes is None:
+            return []
+        try:
+            rows, pending = writes.read(lambda conn: conn.execute("""
+                SELECT item_name, bin_color, usage_count
+                FROM waste_classification
+            """).fetchall())
+        except Exception:
+            return []
+        rows = [(item, bin_color, count + pending.usage.get(item, 0))
+                for item, bin_color, count in rows]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def log_detection(self, bin_color, item_name, confidence=1.0):
+        """Enregistre une détection dans l'historique (écrite en lot par le tampon)."""
+        writes = self.writes
+        if writes is None:
+            return False
+        writes.add_detection(bin_color, item_name, datetime.now().isoformat(), confidence)
         return True
-    except Exception:
-        return False
+
+    def flush(self):
+        """Écrire tout de suite les détections en attente (avant une lecture externe)."""
+        writes = self.writes
+        return writes.flush() if writes is not None else 0
+
+    def get_bin_status(self):
+        """Retourne l'état des 3 bacs (remplissage, items, dernière vidange), à jour."""
+        writes = self.writes
+        if writes is None:
+            return []
+        try:
+            rows, pending = writes.read(lambda conn: conn.execute("""
+                SELECT bin_color, fill_level, item_count, last_emptied, capacity_liters
+                FROM bin_status
+                ORDER BY bin_color ASC
+            """).fetchall())
+        except Exception as e:
+            print(f"⚠ Erreur get_bin_status : {e}")
+            return []
+        counts = pending.bin_counts()
+        return [
+            (bin_color, fill_level + counts.get(bin_color, 0) * FILL_PER_ITEM,
+             item_count + counts.get(bin_color, 0), last_emptied, capacity)
+            for bin_color, fill_level, item_count, last_emptied, capacity in rows
+        ]
+
+    def empty_bin(self, bin_color):
+        """Vide un bac (reset remplissage et compteur)."""
+        writes = self.writes
+        if writes is None:
+            return False
+        writes.flush()  # Objets déjà triés : comptés avant la vidange
+        with self.connection() as conn:
+            if conn is None:
+                return False
+            try:
+                conn.execute("""
+                    UPDATE bin_status
+                    SET fill_level = 0, item_count = 0, last_emptied = ?
+                    WHERE bin_color = ?
+                """, (datetime.now().isoformat(), bin_color))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                return False
+        return True
+
+    def get_detection_history(self, limit=50):
+        """Retourne l'historique des détections (les plus récentes d'abord, en attente comprises)."""
+        writes = self.writes
+        if writes is None:
+            return []
+        try:
+            rows, pending = writes.read(lambda conn: conn.execute("""
+                SELECT bin_color, item_name, timestamp, confidence
+                FROM sorting_history
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (limit,)).fetchall())
+        except Exception:
+            return []
+        return (pending.history[::-1] + rows)[:limit]
 
 
 def ask_user_for_bin(item_name):
@@ -175,147 +455,129 @@ def ask_user_for_bin(item_name):
     return None
 
 
-def send_sort_command(bin_color):
-    """Envoie la commande de tri à l'Arduino."""
-    if _serial and _serial.is_open:
-        try:
-            _serial.write(f"{bin_color}\n".encode())
-            _serial.flush()
-        except Exception as e:
-            print(f"⚠ Erreur envoi Arduino : {e}")
-            return False
-    else:
-        print(f"[Simulation] → Tri vers bac {bin_color}")
-    return True
+# ============================================
+# FONCTIONS DU MODULE (service partagé du processus)
+# ============================================
 
+_service = None
+_service_lock = threading.Lock()
 
-def classify_and_sort(item_name, ask_if_unknown=True, auto_mode=False, confidence=1.0):
+
+def get_service():
+    """Service du processus (créé à la première utilisation, rien d'ouvert)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ClassifierService()
+    return _service
+
+
+def init_database(db_path=None):
     """
-    Détermine le bac pour l'objet, enregistre si nouveau, envoie la commande de tri.
-    - ask_if_unknown: si True, demande à l'utilisateur pour un objet inconnu
-    - auto_mode: si True, utilise uniquement le mapping sans demander
-    - confidence: confiance de la détection (0-1)
-    Retourne la couleur du bac utilisée, ou None.
+    Crée la base SQLite et toutes les tables si besoin (sans effet si déjà ouverte).
+    - db_path: autre fichier que DB_PATH (tests de charge) ; rouvre la base
     """
-    if not item_name:
-        return None
-    item_name = item_name.strip().lower()
-    bin_color = get_bin_color(item_name)
-
-    if bin_color is None:
-        if ask_if_unknown and not auto_mode:
-            bin_color = ask_user_for_bin(item_name)
-            if bin_color:
-                save_to_database(item_name, bin_color)
-        else:
-            return None
-    else:
-        # Incrémenter usage_count
-        if _conn:
-            try:
-                _conn.execute(
-                    "UPDATE waste_classification SET usage_count = usage_count + 1 WHERE item_name = ?",
-                    (item_name,)
-                )
-                _conn.commit()
-            except Exception:
-                pass
+    get_service().open_database(db_path)
+
+
+def connection():
+    """Connexion SQLite du service, à utiliser dans un with (None si base fermée)."""
+    return get_service().connection()
+
+
+def init_serial_connection(port=None):
+    """Ouvre la connexion série vers l'Arduino (voir ClassifierService.open_serial)."""
+    get_service().open_serial(port)
+
+
+def init_serial():
+    """Alias pour compatibilité."""
+    init_serial_connection()
+
+
+def start_actuator(sorting_duration=None):
+    """Démarre le worker de tri (voir ClassifierService.start_actuator)."""
+    get_service().start_actuator(sorting_duration)
+
+
+def stop_actuator():
+    """Arrête le worker de tri en laissant finir le tri en cours."""
+    get_service().stop_actuator()
+
+
+def is_sorting():
+    """True si le worker a un tri en cours ou en attente."""
+    return get_service().is_sorting()
+
+
+def cleanup():
+    """Ferme la DB (détections en attente écrites avant) et la série."""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.close()
+
 
-    if bin_color:
-        # LOG LA DÉTECTION
-        log_detection(bin_color, item_name, confidence)
-        
-        # Envoyer commande Arduino
-        send_sort_command(bin_color)
-        if _serial and _serial.is_open:
-            import time
-            time.sleep(SORTING_DURATION)
-    return bin_color
+def invalidate_bin_cache():
+    """Vide le cache objet → bac (après une écriture dans waste_classification)."""
+    get_service().invalidate_bin_cache()
+
+
+def get_bin_color(item_name):
+    """Retourne la couleur du bac pour un objet (sans sauvegarder)."""
+    return get_service().get_bin_color(item_name)
+
+
+def save_to_database(item_name, bin_color):
+    """Enregistre ou met à jour l'association objet → bac."""
+    return get_service().save_to_database(item_name, bin_color)
+
+
+def send_sort_command(bin_color):
+    """Envoie la commande de tri à l'Arduino."""
+    return get_service().send_sort_command(bin_color)
+
+
+def dispatch_sort(bin_color):
+    """Lance le tri. Retourne ACCEPTED, COALESCED ou REJECTED."""
+    return get_service().dispatch_sort(bin_color)
+
+
+def classify_and_sort(item_name, ask_if_unknown=True, auto_mode=False, confidence=1.0):
+    """Détermine le bac pour l'objet et lance le tri (voir ClassifierService.classify_and_sort)."""
+    return get_service().classify_and_sort(item_name, ask_if_unknown, auto_mode, confidence)
 
 
 def get_stats():
     """Retourne les stats de la base (pour affichage)."""
-    if not _conn:
-        return []
-    try:
-        return _conn.execute("""
-            SELECT item_name, bin_color, usage_count
-            FROM waste_classification
-            ORDER BY usage_count DESC
-        """).fetchall()
-    except Exception:
-        return []
+    return get_service().get_stats()
 
 
 def log_detection(bin_color, item_name, confidence=1.0):
     """Enregistre une détection dans l'historique."""
-    if not _conn:
-        return False
-    try:
-        _conn.execute("""
-            INSERT INTO sorting_history (bin_color, item_name, timestamp, confidence)
-            VALUES (?, ?, ?, ?)
-        """, (bin_color, item_name, datetime.now().isoformat(), confidence))
-        
-        # Mise à jour du bac : +1 item
-        _conn.execute("""
-            UPDATE bin_status 
-            SET item_count = item_count + 1,
-                fill_level = fill_level + 0.5
-            WHERE bin_color = ?
-        """, (bin_color,))
-        
-        _conn.commit()
-        return True
-    except Exception as e:
-        print(f"⚠ Erreur log_detection : {e}")
-        return False
+    return get_service().log_detection(bin_color, item_name, confidence)
+
+
+def flush():
+    """Écrire tout de suite les détections en attente."""
+    return get_service().flush()
 
 
 def get_bin_status():
     """Retourne l'état des 3 bacs (remplissage, items, dernière vidange)."""
-    if not _conn:
-        return []
-    try:
-        return _conn.execute("""
-            SELECT bin_color, fill_level, item_count, last_emptied, capacity_liters
-            FROM bin_status
-            ORDER BY bin_color ASC
-        """).fetchall()
-    except Exception as e:
-        print(f"⚠ Erreur get_bin_status : {e}")
-        return []
+    return get_service().get_bin_status()
 
 
 def empty_bin(bin_color):
     """Vide un bac (reset remplissage et compteur)."""
-    if not _conn:
-        return False
-    try:
-        _conn.execute("""
-            UPDATE bin_status
-            SET fill_level = 0, item_count = 0, last_emptied = ?
-            WHERE bin_color = ?
-        """, (datetime.now().isoformat(), bin_color))
-        _conn.commit()
-        return True
-    except Exception:
-        return False
+    return get_service().empty_bin(bin_color)
 
 
 def get_detection_history(limit=50):
     """Retourne l'historique des détections."""
-    if not _conn:
-        return []
-    try:
-        return _conn.execute("""
-            SELECT bin_color, item_name, timestamp, confidence
-            FROM sorting_history
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,)).fetchall()
-    except Exception:
-        return []
+    return get_service().get_detection_history(limit)
 
 
 # ============================================
@@ -0,0 +1,165 @@
+"""
+Smart Bin SI - Écriture différée de l'historique de tri (write-behind)
+- Les détections (sorting_history + bin_status) et les usage_count sont gardés
+  en mémoire puis écrits en une transaction (executemany) toutes les
+  DB_FLUSH_EVENTS détections ou DB_FLUSH_INTERVAL_MS : un commit (fsync) par lot
+  au lieu de deux par tri
+- Les lectures du même processus ajoutent les compteurs en attente (pending())
+- flush() à l'arrêt : rien n'est perdu par cleanup()
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from metrics import metrics
+
+try:
+    from config import DB_FLUSH_EVENTS, DB_FLUSH_INTERVAL_MS
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from config import DB_FLUSH_EVENTS, DB_FLUSH_INTERVAL_MS
+
+FILL_PER_ITEM = 0.5  # Remplissage ajouté au bac par objet trié
+
+_INSERT_HISTORY = """
+    INSERT INTO sorting_history (bin_color, item_name, timestamp, confidence)
+    VALUES (?, ?, ?, ?)
+"""
+_UPDATE_BIN = """
+    UPDATE bin_status
+    SET item_count = item_count + ?,
+        fill_level = fill_level + ?
+    WHERE bin_color = ?
+"""
+_UPDATE_USAGE = """
+    UPDATE waste_classification SET usage_count = usage_count + ? WHERE item_name = ?
+"""
+
+
+class PendingWrites:
+    """Écritures en attente (copie pour les lectures)."""
+
+    def __init__(self, history=(), usage=None):
+        self.history = list(history)      # (bin_color, item_name, timestamp, confidence)
+        self.usage = dict(usage or {})    # item_name -> usage_count à ajouter
+
+    def bin_counts(self):
+        """bin_color -> objets en attente."""
+        counts = {}
+        for bin_color, _, _, _ in self.history:
+            counts[bin_color] = counts.get(bin_color, 0) + 1
+        return counts
+
+    def __len__(self):
+        return len(self.history) + len(self.usage)
+
+
+class WriteBehindBuffer:
+    """Tampon des détections, vidé en lot par un thread dédié."""
+
+    def __init__(self, db, flush_events=DB_FLUSH_EVENTS, flush_interval_ms=DB_FLUSH_INTERVAL_MS):
+        """
+        Args:
+            db: storage.Database
+            flush_events: Détections en attente qui déclenchent l'écriture
+            flush_interval_ms: Attente max avant l'écriture d'une détection
+        """
+        self.db = db
+        self.flush_events = max(1, flush_events)
+        self.interval = max(0.001, flush_interval_ms / 1000.0)
+        self.flushed = 0
+        self._history = []
+        self._usage = {}
+        self._lock = threading.Lock()          # Ajouts (rapide, jamais pendant un commit)
+        self._flush_lock = threading.Lock()    # Un lot à la fois ; lectures cohérentes
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Arrêter le thread et écrire ce qui reste."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.flush()
+
+    def add_detection(self, bin_color, item_name, timestamp, confidence):
+        with self._lock:
+            self._history.append((bin_color, item_name, timestamp, confidence))
+            full = len(self._history) >= self.flush_events
+        if full:
+            self._wake.set()
+
+    def add_usage(self, item_name):
+        with self._lock:
+            self._usage[item_name] = self._usage.get(item_name, 0) + 1
+
+    def read(self, read_fn):
+        """
+        Lire la base et les écritures en attente sans qu'un lot soit écrit entre-temps
+        (sinon ce lot serait compté deux fois ou pas du tout)
+
+        Args:
+            read_fn: Fonction conn -> résultat
+
+        Retourne:
+            (résultat de read_fn, PendingWrites)
+        """
+        with self._flush_lock:
+            with self.db.connection() as conn:
+                result = read_fn(conn)
+            with self._lock:
+                pending = PendingWrites(self._history, self._usage)
+        return result, pending
+
+    def flush(self):
+        """
+        Écrire les détections en attente en une transaction
+
+        Retourne:
+            int: Écritures faites (0 si rien en attente ou en cas d'erreur)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = PendingWrites(self._history, self._usage)
+                self._history, self._usage = [], {}
+            if not len(batch):
+                return 0
+            start = time.perf_counter()
+            try:
+                with self.db.connection() as conn:
+                    conn.executemany(_INSERT_HISTORY, batch.history)
+                    conn.executemany(_UPDATE_BIN, [
+                        (n, n * FILL_PER_ITEM, bin_color)
+                        for bin_color, n in batch.bin_counts().items()
+                    ])
+                    conn.executemany(_UPDATE_USAGE, [
+                        (n, item_name) for item_name, n in batch.usage.items()
+                    ])
+                    conn.commit()
+            except Exception as e:
+                # Base occupée trop longtemps : le lot repart en tête pour le prochain essai
+                with self._lock:
+                    self._history[:0] = batch.history
+                    for item_name, n in batch.usage.items():
+                        self._usage[item_name] = self._usage.get(item_name, 0) + n
+                print(f"⚠ Écriture de l'historique reportée : {e}")
+                return 0
+            metrics.observe("db_write", time.perf_counter() - start)
+            self.flushed += len(batch.history)
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
@@ -5,20 +5,46 @@ Smart Bin SI - Détecteur YOLO avec apprentissage au fur et à mesure
 - Utilise waste_classifier pour le tri (DB + Arduino)
 """
 
-import cv2
-import torch
 import time
+_IMPORT_START = time.perf_counter()  # Mesure du temps d'import au démarrage
+
+import cv2
+import threading
 import numpy as np
+from concurrent.futures import Future
 from pathlib import Path
-from datetime import datetime
 
 import waste_classifier
+import inference_backends
+import inference_pool
+import labeling_queue
 from config import (
-    MODEL_PATH, CONFIDENCE_THRESHOLD, IOU_THRESHOLD,
+    MODEL_PATH, WARMUP_RUNS, INFERENCE_WORKERS,
     CAMERA_SOURCE, USE_CSI_CAMERA, FRAME_WIDTH, FRAME_HEIGHT, SHOW_DISPLAY,
-    AUTO_SORT_DELAY, MIN_DETECTIONS, LEARNING_MODE, SAVE_IMAGES,
-    TRAINING_DIR, BIN_COLORS,
+    AUTO_SORT_DELAY, MIN_DETECTIONS, TRACK_VOTE_RATIO, LEARNING_MODE, SAVE_IMAGES,
+    TRAINING_DIR, BIN_COLORS, CLASS_FILTER, INFERENCE_BACKEND, INFERENCE_PRECISION,
+    PIPELINE_MODE, PIPELINE_QUEUE_SIZE, PIPELINE_DROP_POLICY, MOTION_GATING,
+    HEADLESS, STREAM_ENABLED, GOVERNOR_ENABLED, LABELING_ASYNC, FRAME_RING_ENABLED,
+    MODEL_RELOAD_ENABLED, SHADOW_MODEL_PATH, METRICS_PATH,
 )
+from frame_pipeline import DetectionPipeline
+from motion_gate import MotionGate
+from rate_governor import RateGovernor
+from tracker import IoUTracker
+from training_writer import TrainingImageWriter
+from metrics import metrics, MetricsExporter
+from stream_server import MjpegStreamer
+from frame_ring import FrameRingWriter
+from model_reloader import ModelReloader
+from shadow_eval import ShadowEvaluator
+from frame_sources import SyntheticCamera
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+# Colonnes du tableau de détections (N, 6) : x1, y1, x2, y2, confiance, classe
+COL_CONF = 4
+COL_CLASS = 5
+EMPTY_DETECTIONS = np.zeros((0, 6), dtype=np.float32)
 
 
 # ============================================
@@ -49,6 +75,39 @@ def get_csi_pipeline(camera_id=0, width=640, height=480, fps=30):
     )
 
 
+def open_camera():
+    """
+    Ouvrir la caméra configurée (CSI ou USB)
+    
+    Retourne:
+        cv2.VideoCapture ou None en cas d'échec
+    """
+    if USE_CSI_CAMERA:
+        print("📷 Ouverture caméra CSI...")
+        pipeline = get_csi_pipeline(width=FRAME_WIDTH, height=FRAME_HEIGHT)
+        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+    else:
+        print(f"📷 Ouverture caméra : {CAMERA_SOURCE}")
+        cap = cv2.VideoCapture(CAMERA_SOURCE)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+        # Un seul buffer : pas d'images périmées en attente dans V4L2
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    
+    if not cap.isOpened():
+        print("✗ Échec d'ouverture de la caméra")
+        return None
+    
+    return cap
+
+
+def inference_mode(model):
+    """("pool", N) pour un pool de N processus, ("local", 1) pour un backend dans ce processus."""
+    if isinstance(model, inference_pool.InferencePool):
+        return ("pool", model.workers)
+    return ("local", 1)
+
+
 # ============================================
 # CLASSE DÉTECTEUR DE DÉCHETS
 # ============================================
@@ -59,19 +118,65 @@ class WasteDetector:
     Utilise waste_classifier pour la logique de tri
     """
     
-    def __init__(self, model_path=MODEL_PATH):
+    def __init__(self, model_path=MODEL_PATH, hardware=True, backend=None,
+                 db_path=None, metrics_path=METRICS_PATH):
         """
         Initialiser le détecteur YOLO
         
         Args:
             model_path: Chemin vers les poids YOLO entraînés (fichier .pt)
+            hardware: False pour ne pas ouvrir l'Arduino (rejeu, benchmark)
+            backend: Backend déjà créé (ex. StubBackend pour les tests de charge) :
+                pas de chargement ni de rechargement à chaud
+            db_path: Base SQLite autre que DB_PATH (tests de charge)
+            metrics_path: Fichier des métriques exportées (lu par /api/detector/metrics)
         """
         print("\n" + "="*50)
         print("🤖 SMART BIN SI - DÉTECTEUR YOLO")
         print("="*50)
         
-        # Charger le modèle YOLO
-        self.model = self.load_model(model_path)
+        # Dossier pour les images d'apprentissage (quand tu confirmes "correct")
+        self.training_writer = None
+        if SAVE_IMAGES:
+            TRAINING_DIR.mkdir(parents=True, exist_ok=True)
+            self.training_writer = TrainingImageWriter()
+            self.training_writer.start()
+        
+        # Demandes d'étiquetage écrites hors boucle caméra (LABELING_ASYNC)
+        self.labeling_writer = None
+        if LABELING_ASYNC:
+            self.labeling_writer = labeling_queue.LabelingWriter()
+            self.labeling_writer.start()
+        
+        # Charger le modèle YOLO en arrière-plan (pendant l'init série/DB/caméra)
+        self.model = None
+        self.class_names = []
+        self.allowed_class_ids = None
+        self.startup_times = {"import": IMPORT_SECONDS}
+        self._startup_begin = time.perf_counter()
+        self._loop_start = self._startup_begin
+        self._model_error = None
+        self.model_path = model_path
+        self.reloader = None
+        self.shadow = None
+        self._load_thread = threading.Thread(
+            target=self._load_model_background, args=(model_path, backend),
+            name="model-loader", daemon=True
+        )
+        self._load_thread.start()
+        
+        # Modes (modifiables par instance : rejeu sans affichage ni input())
+        self.show_display = SHOW_DISPLAY and not HEADLESS
+        self.streamer = None
+        self.frame_ring = None
+        self.learning_mode = LEARNING_MODE
+        self.dry_run = False           # True = décisions notées sans tri réel
+        self.sort_delay = AUTO_SORT_DELAY  # Délai min. entre deux tris (s)
+        self.drop_policy = PIPELINE_DROP_POLICY  # File capture → inférence du pipeline
+        self.stream_enabled = STREAM_ENABLED
+        self.frame_ring_enabled = FRAME_RING_ENABLED
+        self.reload_enabled = MODEL_RELOAD_ENABLED and backend is None
+        self.sort_decisions = []       # (time.time(), classe, id de piste)
         
         # Suivi des détections
         self.last_detection = None
@@ -79,52 +184,169 @@ class WasteDetector:
         self.last_sort_time = 0
         self.last_frame = None  # Pour sauvegarder l'image lors de corrections
         
-        # Initialiser les connexions via waste_classifier
-        waste_classifier.init_serial_connection()
-        waste_classifier.init_database()
+        # Suivi multi-objets (un tri par objet physique)
+        # Le tracker appartient à l'étage décision ; les autres étages lisent
+        # seulement _active_tracks, publié après chaque mise à jour
+        self.tracker = IoUTracker()
+        self._active_tracks = 0
         
-        # Dossier pour les images d'apprentissage (quand tu confirmes "correct")
-        if SAVE_IMAGES:
-            TRAINING_DIR.mkdir(parents=True, exist_ok=True)
+        # Filtre de mouvement (évite YOLO sur scène statique)
+        self.motion_gate = MotionGate() if MOTION_GATING else None
+        self.governor = RateGovernor() if GOVERNOR_ENABLED else None
+        self._last_detection_count = 0
         
-        print("✓ Détecteur initialisé\n")
+        # Compteur FPS (étage rendu)
+        self.fps_time = time.time()
+        self.fps_counter = 0
+        self.fps_display = 0
+        
+        # Initialiser les connexions via waste_classifier
+        if hardware:
+            waste_classifier.init_serial_connection()
+        waste_classifier.init_database(db_path)
+        self.metrics_path = metrics_path
+        # Tri dans un thread dédié : la caméra continue pendant que le mécanisme bouge
+        if hardware:
+            waste_classifier.start_actuator()
+        
+        print("✓ Détecteur initialisé (modèle en cours de chargement)\n")
     
     def load_model(self, model_path):
         """
         Charger le modèle YOLO depuis un fichier
-        Supporte YOLOv5 et YOLOv8 via torch.hub ou ultralytics
+        Backend choisi par INFERENCE_BACKEND (torch.hub, ONNX Runtime ou OpenVINO),
+        dans ce processus ou dans un pool de INFERENCE_WORKERS processus
+        """
+        print(f"📦 Chargement du modèle depuis : {model_path} "
+              f"(backend {INFERENCE_BACKEND}, {INFERENCE_PRECISION})")
+        return inference_pool.create_inference(
+            INFERENCE_BACKEND, model_path, INFERENCE_PRECISION,
+            workers=INFERENCE_WORKERS, shape=(FRAME_HEIGHT, FRAME_WIDTH),
+        )
+    
+    def load_replacement(self, model_path):
         """
-        print(f"📦 Chargement du modèle depuis : {model_path}")
+        Charger un nouveau modèle pour le rechargement à chaud (même backend, même pool)
         
-        if not Path(model_path).exists():
-            print(f"⚠ Fichier du modèle introuvable : {model_path}")
-            print("   Utilisation du YOLOv5s par défaut (pré-entraîné sur COCO)")
-            print("   Pour utiliser un modèle custom, entraîne-le d'abord !")
+        Lève:
+            RuntimeError: Mode d'inférence différent du modèle en service (ex. pool
+                impossible à démarrer) : l'étage d'inférence du pipeline ne suivrait pas
+        """
+        print(f"📦 Chargement du nouveau modèle : {model_path}")
+        model = inference_pool.create_inference(
+            INFERENCE_BACKEND, model_path, INFERENCE_PRECISION,
+            workers=getattr(self.model, "workers", 1), shape=(FRAME_HEIGHT, FRAME_WIDTH),
+        )
+        if inference_mode(model) != inference_mode(self.model):
+            if hasattr(model, "close"):
+                model.close()
+            new_kind, new_workers = inference_mode(model)
+            kind, workers = inference_mode(self.model)
+            raise RuntimeError(f"mode d'inférence différent ({new_kind} x{new_workers} "
+                               f"au lieu de {kind} x{workers})")
+        return model
+    
+    def swap_model(self):
+        """Remplacer le modèle par celui préparé par le rechargement à chaud (entre deux images)."""
+        candidate = self.reloader.take()
+        if candidate is None:
+            return
+        old = self.model
+        self.set_class_names(candidate.model.names)
+        self.model = candidate.model
+        self.model_path = candidate.model_path
+        if self.training_writer is not None:
+            self.training_writer.model_version = candidate.version  # Calculée par le rechargeur
+        if self.shadow is not None:
+            self.shadow.primary_version = candidate.version  # Nouvelle session dans le journal
+        metrics.set_gauge("backend", getattr(self.model, "name", INFERENCE_BACKEND))
+        print(f"✓ Modèle remplacé à chaud : {Path(candidate.model_path).name}")
+        if isinstance(old, inference_pool.InferencePool):
+            # Images encore en vol dans l'ancien pool : fermeture en arrière-plan
+            threading.Thread(target=old.close, kwargs={"drain": True}, daemon=True).start()
+    
+    def _load_model_background(self, model_path, backend=None):
+        """Thread de chargement : import du runtime, chargement puis warm-up."""
+        try:
+            if backend is None:
+                start = time.perf_counter()
+                inference_backends.import_runtime(INFERENCE_BACKEND)
+                self.startup_times["import"] += time.perf_counter() - start
+                
+                start = time.perf_counter()
+                model = self.load_model(model_path)
+                self.startup_times["load"] = time.perf_counter() - start
+            else:
+                model = backend
             
-            # Charger YOLOv5s pré-entraîné comme solution de secours
-            model = torch.hub.load('ultralytics/yolov5', 'yolov5s', pretrained=True)
-        else:
-            # Charger le modèle custom entraîné
-            try:
-                model = torch.hub.load('ultralytics/yolov5', 'custom', path=model_path)
-                print("✓ Modèle custom chargé avec succès")
-            except Exception as e:
-                print(f"✗ Erreur lors du chargement du modèle custom : {e}")
-                print("   Retour au YOLOv5s pré-entraîné")
-                model = torch.hub.load('ultralytics/yolov5', 'yolov5s', pretrained=True)
-        
-        # Définir les paramètres du modèle
-        model.conf = CONFIDENCE_THRESHOLD
-        model.iou = IOU_THRESHOLD
-        
-        # Utiliser le GPU si disponible (important pour Jetson)
-        if torch.cuda.is_available():
-            model = model.cuda()
-            print("✓ Accélération GPU activée")
-        else:
-            print("⚠ Exécution sur CPU (plus lent)")
+            # Warm-up : la première inférence est beaucoup plus lente
+            start = time.perf_counter()
+            inference_backends.warm_up(model, (FRAME_HEIGHT, FRAME_WIDTH), WARMUP_RUNS)
+            self.startup_times["warmup"] = time.perf_counter() - start
+            
+            self.set_class_names(model.names)
+            if self.training_writer is not None:
+                self.training_writer.model_version = inference_backends.model_version(model_path)
+            self.model = model
+        except Exception as e:
+            self._model_error = e
+    
+    def wait_for_model(self):
+        """
+        Attendre la fin du chargement du modèle (lancé dans __init__)
         
-        return model
+        Retourne:
+            Le backend d'inférence chargé
+        """
+        if self.model is None:
+            if self._load_thread.is_alive():
+                print("⏳ Attente du chargement du modèle...")
+            self._load_thread.join()
+            if self.model is None:
+                raise RuntimeError(f"Chargement du modèle impossible : {self._model_error}")
+        return self.model
+    
+    def log_startup_times(self):
+        """Afficher le détail du temps de démarrage."""
+        labels = [
+            ("import", "import"), ("load", "chargement"),
+            ("warmup", "warm-up"), ("first_frame", "1ère image"),
+        ]
+        parts = [f"{label} {self.startup_times[key]:.2f} s"
+                 for key, label in labels if key in self.startup_times]
+        total = self.startup_times.get("total")
+        if total is not None:
+            parts.append(f"total {total:.2f} s")
+        print("⏱ Démarrage : " + " | ".join(parts))
+    
+    def _record_first_frame(self):
+        """Noter l'arrivée de la première image traitée (une seule fois)."""
+        if "first_frame" in self.startup_times:
+            return
+        now = time.perf_counter()
+        self.startup_times["first_frame"] = now - self._loop_start
+        self.startup_times["total"] = IMPORT_SECONDS + now - self._startup_begin
+        self.log_startup_times()
+    
+    def set_class_names(self, names):
+        """
+        Préparer les noms de classes et le filtre de classes (indexés par ID)
+        
+        Args:
+            names: model.names (dict int -> str ou liste)
+        """
+        if isinstance(names, dict):
+            names = [names[i] for i in sorted(names)]
+        self.class_names = list(names)
+        
+        if CLASS_FILTER is None:
+            self.allowed_class_ids = None
+        else:
+            wanted = {name.strip().lower() for name in CLASS_FILTER}
+            self.allowed_class_ids = np.array(
+                [i for i, name in enumerate(self.class_names) if name.lower() in wanted],
+                dtype=np.int64
+            )
     
     def detect_waste(self, frame):
         """
@@ -134,12 +356,69 @@ class WasteDetector:
             frame: Image OpenCV (format BGR)
         
         Retourne:
-            results: Résultats de détection YOLO
+            results: Tableau (N, 6) de détections du backend
         """
+        # Taille d'entrée choisie par le régulateur (backends à taille variable)
+        size = None
+        if self.governor is not None and getattr(self.model, "resizable", False):
+            size = self.governor.img_size
+        
         # Exécuter l'inférence
-        results = self.model(frame)
+        results = self.model(frame) if size is None else self.model(frame, size=size)
         return results
     
+    def extract_detections(self, results):
+        """
+        Extraire les détections YOLO sous forme de tableau NumPy (sans pandas)
+        
+        Args:
+            results: Sortie du backend (tableau) ou résultats YOLOv5 (results.xyxy)
+        
+        Retourne:
+            np.ndarray: Tableau (N, 6) float32 [x1, y1, x2, y2, confiance, classe]
+        """
+        pred = results.xyxy[0] if hasattr(results, 'xyxy') else results
+        if hasattr(pred, 'cpu'):
+            pred = pred.cpu().numpy()
+        pred = np.asarray(pred, dtype=np.float32).reshape(-1, 6)
+        
+        # Filtrage des classes (vectorisé)
+        if self.allowed_class_ids is not None and len(pred):
+            pred = pred[np.isin(pred[:, COL_CLASS].astype(np.int64), self.allowed_class_ids)]
+        
+        return pred
+    
+    def detection_to_dict(self, row):
+        """
+        Convertir une ligne du tableau de détections en dictionnaire
+        
+        Args:
+            row: Ligne [x1, y1, x2, y2, confiance, classe]
+        
+        Retourne:
+            dict: {'class', 'confidence', 'bbox'}
+        """
+        x1, y1, x2, y2, conf, cls = row.tolist()
+        return {
+            'class': self.class_names[int(cls)],
+            'confidence': conf,
+            'bbox': [x1, y1, x2, y2]
+        }
+    
+    def best_detection(self, detections):
+        """
+        Sélectionner la détection la plus confiante
+        
+        Args:
+            detections: Tableau (N, 6) de détections
+        
+        Retourne:
+            dict: Meilleure détection ou None si aucune
+        """
+        if len(detections) == 0:
+            return None
+        return self.detection_to_dict(detections[np.argmax(detections[:, COL_CONF])])
+    
     def process_detections(self, results):
         """
         Traiter les résultats YOLO et extraire les déchets
@@ -150,45 +429,16 @@ class WasteDetector:
         Retourne:
             list: Déchets détectés avec [nom_classe, confiance, bbox]
         """
-        detections = []
-        
-        # Extraire les résultats (format dépend de YOLOv5 vs YOLOv8)
-        try:
-            # Format YOLOv5
-            predictions = results.pandas().xyxy[0]
-            
-            for idx, row in predictions.iterrows():
-                class_name = row['name']
-                confidence = row['confidence']
-                bbox = [row['xmin'], row['ymin'], row['xmax'], row['ymax']]
-                
-                detections.append({
-                    'class': class_name,
-                    'confidence': confidence,
-                    'bbox': bbox
-                })
-        except:
-            # Analyse alternative si pandas non disponible
-            pred = results.xyxy[0].cpu().numpy()
-            for detection in pred:
-                x1, y1, x2, y2, conf, cls = detection
-                class_name = self.model.names[int(cls)]
-                
-                detections.append({
-                    'class': class_name,
-                    'confidence': float(conf),
-                    'bbox': [float(x1), float(y1), float(x2), float(y2)]
-                })
-        
-        return detections
+        return [self.detection_to_dict(row) for row in self.extract_detections(results)]
     
-    def should_trigger_sort(self, detection):
+    def should_trigger_sort(self, track):
         """
-        Décider si on doit déclencher l'action de tri
-        Utilise un filtrage temporel pour éviter les faux positifs
+        Décider si on doit déclencher l'action de tri pour un objet suivi
+        Un seul tri par objet physique (piste), après MIN_DETECTIONS images
+        et un vote de classe stable
         
         Args:
-            detection: Dictionnaire de détection actuel
+            track: Piste du tracker
         
         Retourne:
             bool: True si on doit trier maintenant
@@ -196,27 +446,64 @@ class WasteDetector:
         current_time = time.time()
         
         # Vérifier si assez de temps s'est écoulé depuis le dernier tri
-        if current_time - self.last_sort_time < AUTO_SORT_DELAY:
+        if current_time - self.last_sort_time < self.sort_delay:
             return False
         
-        # Vérifier si le même objet est détecté plusieurs fois
-        if detection and self.last_detection:
-            if detection['class'] == self.last_detection['class']:
-                self.detection_count += 1
-            else:
-                self.detection_count = 1
-                self.last_detection = detection
-        else:
-            self.detection_count = 1
-            self.last_detection = detection
+        # Le mécanisme bouge encore : l'objet vu est celui en cours de tri
+        if waste_classifier.is_sorting():
+            return False
         
-        # Déclencher si le minimum de détections consécutives est atteint
-        if self.detection_count >= MIN_DETECTIONS:
-            self.detection_count = 0
-            self.last_sort_time = current_time
-            return True
+        # Objet déjà trié, pas assez vu, ou classe encore instable
+        if track.sorted or track.hits < MIN_DETECTIONS or track.vote_ratio < TRACK_VOTE_RATIO:
+            return False
         
-        return False
+        track.sorted = True
+        self.last_sort_time = current_time
+        return True
+    
+    def track_to_detection(self, track):
+        """
+        Convertir une piste en dictionnaire de détection (classe votée)
+        
+        Args:
+            track: Piste du tracker
+        
+        Retourne:
+            dict: {'class', 'confidence', 'bbox', 'track_id'}
+        """
+        return {
+            'class': self.class_names[track.class_id],
+            'confidence': track.mean_confidence,
+            'bbox': track.bbox.tolist(),
+            'track_id': track.id
+        }
+    
+    def update_tracks(self, detections):
+        """
+        Mettre à jour le suivi et déclencher au plus un tri
+        
+        Args:
+            detections: Tableau (N, 6) de détections
+        
+        Retourne:
+            list: Pistes visibles sur cette image
+        """
+        visible = self.tracker.update(detections)
+        
+        # Objet principal suivi (affichage et correction 'c')
+        pending = [t for t in visible if not t.sorted]
+        if pending:
+            lead = max(pending, key=lambda t: t.hits)
+            self.last_detection = self.track_to_detection(lead)
+            self.detection_count = lead.hits
+        
+        for track in self.tracker.ready_tracks(MIN_DETECTIONS):
+            if self.should_trigger_sort(track):
+                self.trigger_sort(self.track_to_detection(track))
+                break
+        
+        self._active_tracks = self.tracker.active_count
+        return visible
     
     def get_bin_color_for_display(self, waste_class):
         """
@@ -238,18 +525,28 @@ class WasteDetector:
         
         Args:
             frame: Image OpenCV
-            detections: Liste des dictionnaires de détection
+            detections: Tableau (N, 6) de détections
         
         Retourne:
             frame: Image annotée
         """
-        for det in detections:
-            x1, y1, x2, y2 = [int(v) for v in det['bbox']]
-            class_name = det['class']
-            confidence = det['confidence']
+        if len(detections) == 0:
+            return frame
+        
+        # Une seule recherche de bac par classe présente (pas par boîte)
+        class_ids = detections[:, COL_CLASS].astype(np.int64)
+        bins = {
+            cls: self.get_bin_color_for_display(self.class_names[cls])
+            for cls in np.unique(class_ids).tolist()
+        }
+        boxes = detections[:, :4].astype(np.int32)
+        
+        for (x1, y1, x2, y2), cls, confidence in zip(
+                boxes.tolist(), class_ids.tolist(), detections[:, COL_CONF].tolist()):
+            class_name = self.class_names[cls]
             
             # Obtenir la couleur du bac pour ce déchet (juste pour affichage)
-            bin_color = self.get_bin_color_for_display(class_name)
+            bin_color = bins[cls]
             
             color = BIN_COLORS.get(bin_color, BIN_COLORS["unknown"])
             
@@ -286,41 +583,21 @@ class WasteDetector:
             class_id: index de la classe (pour le .txt YOLO)
             correct: True = bonne détection, False = erreur (sauvegardé dans _errors/)
         """
-        if not SAVE_IMAGES:
+        if not SAVE_IMAGES or self.training_writer is None:
             return
-        class_name = class_name.strip().lower().replace(" ", "_")
-        if correct:
-            folder = TRAINING_DIR / class_name
-        else:
-            folder = TRAINING_DIR / "_errors" / class_name
-        folder.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        prefix = "ok" if correct else "err"
-        base = f"{prefix}_{timestamp}"
-        filename = folder / f"{base}.jpg"
-        cv2.imwrite(str(filename), frame)
-        # Fichier label YOLO (une ligne : class_id x_center y_center width height, normalisé 0-1)
-        if bbox is not None and class_id is not None and len(bbox) == 4:
-            h, w = frame.shape[:2]
-            x1, y1, x2, y2 = [float(x) for x in bbox]
-            x_center = ((x1 + x2) / 2) / w
-            y_center = ((y1 + y2) / 2) / h
-            width = (x2 - x1) / w
-            height = (y2 - y1) / h
-            label_path = folder / f"{base}.txt"
-            with open(label_path, "w") as f:
-                f.write(f"{class_id} {x_center:.6f} {y_center:.6f} {width:.6f} {height:.6f}\n")
-        print(f"💾 Image sauvegardée pour apprentissage : {filename.name} ({class_name})")
+        # Encodage et écriture dans le thread d'écriture (pas dans la boucle caméra)
+        path = self.training_writer.submit(
+            frame, class_name, bbox=bbox, class_id=class_id, correct=correct
+        )
+        if path is not None:
+            print(f"💾 Image programmée pour apprentissage : {path.name} ({path.parent.name})")
     
     def _class_name_to_id(self, class_name):
         """Retourne l'index de la classe dans le modèle (pour le label YOLO)."""
-        if not hasattr(self.model, "names"):
+        try:
+            return self.class_names.index(class_name)
+        except ValueError:
             return None
-        names = self.model.names  # dict int -> str
-        for idx, name in names.items():
-            if name == class_name:
-                return idx
-        return None
 
     def handle_correction(self, frame, best_detection):
         """
@@ -363,164 +640,522 @@ class WasteDetector:
         print("⊘ Détection ignorée")
         return None
     
-    def run_camera_detection(self):
+    def queue_for_labeling(self, best_detection, reason=labeling_queue.REASON_CONFIRM):
         """
-        Boucle principale : capturer images, détecter déchets, déclencher tri
+        Ajouter la détection à la file d'étiquetage (réponse depuis l'interface admin)
+        
+        Args:
+            best_detection: dict avec 'class', 'confidence', 'bbox' et 'track_id'
+            reason: REASON_CONFIRM (détection correcte ?) ou REASON_UNKNOWN (quel bac ?)
         """
-        # Initialiser la caméra
-        if USE_CSI_CAMERA:
-            print("📷 Ouverture caméra CSI...")
-            pipeline = get_csi_pipeline(width=FRAME_WIDTH, height=FRAME_HEIGHT)
-            cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
-        else:
-            print(f"📷 Ouverture caméra : {CAMERA_SOURCE}")
-            cap = cv2.VideoCapture(CAMERA_SOURCE)
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+        if self.labeling_writer is None:
+            return
+        # Image et ligne SQLite écrites par le thread de la file (last_frame est une copie)
+        self.labeling_writer.submit(
+            self.last_frame, best_detection, reason=reason,
+            class_id=self._class_name_to_id(best_detection['class'])
+        )
+    
+    def queue_if_unknown(self, best_detection):
+        """
+        Avec LABELING_ASYNC, mettre un objet sans bac connu dans la file d'étiquetage
+        
+        Args:
+            best_detection: dict avec 'class', 'confidence', 'bbox' et 'track_id'
+        
+        Retourne:
+            bool: True si l'objet a été mis en file (pas de tri)
+        """
+        waste_class = best_detection['class']
+        if not LABELING_ASYNC or waste_classifier.get_bin_color(waste_class) is not None:
+            return False
+        self.queue_for_labeling(best_detection, reason=labeling_queue.REASON_UNKNOWN)
+        print(f"\n📦 Objet inconnu : '{waste_class}' - bac à choisir dans l'interface admin")
+        return True
+    
+    def infer(self, frame, timings=None):
+        """
+        Étage d'inférence : détection YOLO + extraction des déchets
         
-        if not cap.isOpened():
-            print("✗ Échec d'ouverture de la caméra")
+        Args:
+            frame: Image OpenCV (format BGR)
+            timings: dict optionnel étape -> liste de durées (s), complété ici
+        
+        Retourne:
+            np.ndarray: Tableau (N, 6) de détections
+        """
+        if self.reloader is not None and self.reloader.ready:
+            self.swap_model()
+        start = time.perf_counter()
+        
+        # Scène statique et rien à suivre : pas besoin de YOLO
+        if self.motion_gate is not None and not self.motion_gate.should_infer(
+                frame, tracking=self.is_tracking()):
+            gated = time.perf_counter() - start
+            metrics.observe("preprocess", gated)
+            metrics.incr("inferences_skipped")
+            if timings is not None:
+                timings["motion"].append(gated)
+            return EMPTY_DETECTIONS
+        gated = time.perf_counter()
+        
+        results = self.detect_waste(frame)
+        inferred = time.perf_counter()
+        detections = self.extract_detections(results)
+        self._last_detection_count = len(detections)
+        done = time.perf_counter()
+        
+        # Même image pour le modèle candidat (échantillon, thread de basse priorité)
+        if self.shadow is not None:
+            self.shadow.offer(frame, detections, inferred - gated, self.class_names)
+        
+        metrics.observe("preprocess", gated - start)
+        metrics.observe("inference", inferred - gated)
+        metrics.observe("postprocess", done - inferred)
+        metrics.incr("inferences")
+        if timings is not None:
+            timings["motion"].append(gated - start)
+            timings["inference"].append(inferred - gated)
+            timings["postprocess"].append(done - inferred)
+        return detections
+    
+    def infer_async(self, frame):
+        """
+        Étage d'inférence avec un pool de processus : l'image est envoyée
+        à un worker sans attendre son résultat
+        
+        Args:
+            frame: Image OpenCV (format BGR)
+        
+        Retourne:
+            concurrent.futures.Future: Tableau (N, 6) de détections
+        """
+        if self.reloader is not None and self.reloader.ready:
+            self.swap_model()
+        start = time.perf_counter()
+        future = Future()
+        
+        # Scène statique et rien à suivre : pas besoin de YOLO
+        if self.motion_gate is not None and not self.motion_gate.should_infer(
+                frame, tracking=self.is_tracking()):
+            metrics.observe("preprocess", time.perf_counter() - start)
+            metrics.incr("inferences_skipped")
+            future.set_result(EMPTY_DETECTIONS)
+            return future
+        
+        size = None
+        if self.governor is not None and self.model.resizable:
+            size = self.governor.img_size
+        submitted = time.perf_counter()
+        metrics.observe("preprocess", submitted - start)
+        
+        def done(result):
+            # Thread du pool : extraction dès que le worker a répondu
+            try:
+                inferred = time.perf_counter()
+                detections = self.extract_detections(result.result())
+                self._last_detection_count = len(detections)
+                metrics.observe("inference", inferred - submitted)
+                metrics.observe("postprocess", time.perf_counter() - inferred)
+                metrics.incr("inferences")
+                if self.shadow is not None:
+                    self.shadow.offer(frame, detections, inferred - submitted, self.class_names)
+                future.set_result(detections)
+            except Exception as e:
+                future.set_exception(e)
+        
+        self.model.submit(frame, size).add_done_callback(done)
+        return future
+    
+    def pace(self):
+        """Attendre le prochain créneau d'inférence fixé par le régulateur de cadence."""
+        if self.governor is not None:
+            self.governor.pace(tracking=self.is_tracking())
+    
+    def is_tracking(self):
+        """
+        True si un objet est en cours de suivi (piste pas encore triée ou dernière
+        inférence non vide). Appelé par l'étage d'inférence : lit les compteurs
+        publiés, jamais les pistes que l'étage décision modifie.
+        """
+        return self._active_tracks > 0 or self._last_detection_count > 0
+    
+    def handle_detections(self, frame, detections, latency=None):
+        """
+        Étage rendu/décision : tri, calcul des FPS, affichage et flux MJPEG
+        
+        Args:
+            frame: Image OpenCV sur laquelle les détections ont été faites
+            detections: Tableau (N, 6) de détections
+            latency: Latence capture → décision en secondes (mode pipeline)
+        """
+        self._record_first_frame()
+        
+        # Sauvegarder la dernière frame pour corrections
+        self.last_frame = frame.copy()
+        
+        # Suivre les objets et vérifier si on doit déclencher le tri
+        start = time.perf_counter()
+        tracks = self.update_tracks(detections)
+        metrics.observe("decision", time.perf_counter() - start)
+        if latency is not None:
+            metrics.observe("capture_to_decision", latency)
+        
+        # Calculer les FPS
+        self.fps_counter += 1
+        metrics.incr("frames")
+        if time.time() - self.fps_time > 1.0:
+            self.fps_display = self.fps_counter
+            self.fps_counter = 0
+            self.fps_time = time.time()
+            metrics.set_gauge("fps", self.fps_display)
+        
+        # Image + détections pour les autres processus (mémoire partagée)
+        if self.frame_ring is not None:
+            self.frame_ring.fps = self.fps_display
+            self.frame_ring.publish(frame, detections)
+        
+        # Dessiner seulement si quelqu'un regarde (fenêtre ou client MJPEG)
+        stream = self.streamer is not None and self.streamer.wants_frame()
+        if not (self.show_display or stream):
+            return
+        start = time.perf_counter()
+        frame = self.annotate(frame, detections, tracks, latency)
+        metrics.observe("draw", time.perf_counter() - start)
+        if stream:
+            self.streamer.publish(frame)
+        if self.show_display:
+            cv2.imshow('Smart Bin - Detection', frame)
+    
+    def annotate(self, frame, detections, tracks, latency=None):
+        """
+        Dessiner détections, pistes et infos sur l'image
+        
+        Args:
+            frame: Image OpenCV (modifiée sur place)
+            detections: Tableau (N, 6) de détections
+            tracks: Pistes visibles sur cette image
+            latency: Latence capture → décision en secondes
+        
+        Retourne:
+            Image annotée
+        """
+        # Dessiner les détections
+        frame = self.draw_detections(frame, detections)
+        
+        # Info FPS et détections
+        info_text = f"FPS: {self.fps_display} | Detections: {len(detections)}"
+        if latency is not None:
+            info_text += f" | Latence: {latency * 1000:.0f} ms"
+        cv2.putText(frame, info_text, (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        
+        # Identifiants des pistes
+        for track in tracks:
+            x1, _, _, y2 = [int(v) for v in track.bbox]
+            cv2.putText(frame, f"#{track.id}", (x1, y2 + 15),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+        # Suivi de détection
+        if self.last_detection:
+            status_text = f"Suivi: {self.last_detection['class']} ({self.detection_count}/{MIN_DETECTIONS})"
+            cv2.putText(frame, status_text, (10, 60), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+        
+        # Mode
+        mode_text = "Mode: Apprentissage" if self.learning_mode else "Mode: Auto"
+        cv2.putText(frame, mode_text, (10, FRAME_HEIGHT - 10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 255), 2)
+        return frame
+    
+    def trigger_sort(self, best_detection):
+        """
+        Déclencher le tri automatique de la meilleure détection
+        
+        Args:
+            best_detection: dict avec 'class', 'confidence', 'bbox'
+        """
+        waste_class = best_detection['class']
+        self.sort_decisions.append((time.time(), waste_class, best_detection.get('track_id')))
+        if self.dry_run:
+            return
+        
+        # Objet sans bac connu : seule la demande de bac part dans la file
+        # (elle vaut confirmation, pas d'input() dans la boucle)
+        if self.queue_if_unknown(best_detection):
+            return
+        
+        # En mode apprentissage, demander confirmation
+        if self.learning_mode:
+            if LABELING_ASYNC:
+                # Confirmation depuis l'interface admin : le tri continue
+                self.queue_for_labeling(best_detection)
+            else:
+                corrected_class = self.handle_correction(self.last_frame, best_detection)
+                if corrected_class is None:
+                    return  # Ignoré par l'utilisateur
+                waste_class = corrected_class
+        
+        print(f"\n🎯 TRI AUTO DÉCLENCHÉ : {waste_class}")
+        
+        # Utiliser waste_classifier pour le tri
+        # ask_if_unknown=True pour permettre d'apprendre (invite console)
+        bin_color = waste_classifier.classify_and_sort(
+            waste_class,
+            ask_if_unknown=not LABELING_ASYNC,
+            auto_mode=False,
+            confidence=best_detection['confidence']
+        )
+        
+        if bin_color:
+            print(f"✓ Trié vers le bac {bin_color}")
+    
+    def poll_key(self):
+        """Lire le clavier OpenCV (aucune touche sans fenêtre d'affichage)."""
+        if not self.show_display:
+            return 0xFF
+        return cv2.waitKey(1) & 0xFF
+    
+    def handle_key(self, key, detections):
+        """
+        Gérer une touche clavier
+        
+        Args:
+            key: Code de la touche (cv2.waitKey)
+            detections: Tableau (N, 6) des détections de la dernière image
+        
+        Retourne:
+            bool: False pour quitter la boucle
+        """
+        if key == ord('q'):
+            print("\n👋 Arrêt de la détection...")
+            return False
+        
+        elif key == ord('s'):
+            # Tri manuel forcé
+            best = self.best_detection(detections)
+            if best:
+                waste_class = best['class']
+                print(f"\n⚡ TRI MANUEL FORCÉ : {waste_class}")
+                if not self.queue_if_unknown(best):
+                    waste_classifier.classify_and_sort(
+                        waste_class,
+                        ask_if_unknown=not LABELING_ASYNC,
+                        auto_mode=False
+                    )
+        
+        elif key == ord('r'):
+            # Réinitialiser le compteur
+            self.detection_count = 0
+            self.last_detection = None
+            self.tracker.reset()
+            self._active_tracks = 0
+            print("\n↻ Compteur de détections réinitialisé")
+        
+        elif key == ord('c') and self.learning_mode:
+            # Corriger la dernière détection
+            if self.last_detection and LABELING_ASYNC:
+                self.queue_for_labeling(self.last_detection)
+            elif self.last_detection:
+                corrected = self.handle_correction(
+                    self.last_frame,
+                    self.last_detection
+                )
+                if corrected:
+                    bin_color = waste_classifier.ask_user_for_bin(corrected)
+                    if bin_color:
+                        waste_classifier.save_to_database(corrected, bin_color)
+        
+        return True
+    
+    def run_serial_loop(self, cap):
+        """
+        Boucle série : capture, inférence et affichage l'un après l'autre
+        
+        Args:
+            cap: Caméra ouverte
+        """
+        while True:
+            self.pace()
+            
+            # Capturer l'image
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            metrics.observe("capture", time.perf_counter() - start)
+            if not ret:
+                print("✗ Échec de lecture de l'image")
+                break
+            
+            detections = self.infer(frame)
+            self.handle_detections(frame, detections)
+            
+            # Gérer les entrées clavier
+            key = self.poll_key()
+            if not self.handle_key(key, detections):
+                break
+    
+    def run_pipelined_loop(self, cap):
+        """
+        Boucle pipeline : capture et inférence dans des threads,
+        rendu et décision dans le thread principal (OpenCV + input())
+        
+        Args:
+            cap: Caméra ouverte
+        """
+        # Pool de processus : plusieurs images en vol, résultats dans l'ordre
+        pooled = isinstance(self.model, inference_pool.InferencePool)
+        pipeline = DetectionPipeline(
+            cap, self.infer_async if pooled else self.infer,
+            queue_size=PIPELINE_QUEUE_SIZE,
+            drop_policy=self.drop_policy,
+            pace_fn=self.pace,
+            max_in_flight=self.model.workers if pooled else 1,
+        )
+        pipeline.start()
+        detections = EMPTY_DETECTIONS
+        
+        try:
+            while True:
+                result = pipeline.get_result(timeout=0.05)
+                metrics.set_gauge("frames_dropped", pipeline.dropped)
+                if result is not None:
+                    _, t_capture, frame, detections = result
+                    self.handle_detections(
+                        frame, detections,
+                        latency=time.monotonic() - t_capture
+                    )
+                elif not pipeline.running:
+                    if pipeline.error:
+                        print(pipeline.error)
+                    break
+                
+                # Gérer les entrées clavier
+                key = self.poll_key()
+                if not self.handle_key(key, detections):
+                    break
+        finally:
+            pipeline.stop()
+            print(f"📉 Images ignorées (plus récente d'abord) : {pipeline.dropped}")
+    
+    def run_camera_detection(self, cap=None):
+        """
+        Boucle principale : capturer images, détecter déchets, déclencher tri
+        
+        Args:
+            cap: Source d'images déjà ouverte (par défaut : caméra configurée)
+        """
+        # La caméra s'ouvre pendant que le modèle finit de charger
+        if cap is None:
+            cap = open_camera()
+        if cap is None:
             return
         
         print("✓ Caméra prête")
+        try:
+            self.wait_for_model()
+        except RuntimeError as e:
+            print(f"✗ {e}")
+            cap.release()
+            return
+        
+        # Rechargement à chaud de best.pt (sans fermer caméra, série ni base)
+        if self.reload_enabled:
+            self.reloader = ModelReloader(self.load_replacement)
+            self.reloader.start(self.model)
+        
+        # Modèle candidat évalué sur les mêmes images (résumé : /api/detector/shadow)
+        if SHADOW_MODEL_PATH:
+            self.shadow = ShadowEvaluator(
+                SHADOW_MODEL_PATH, primary_version=inference_backends.model_version(self.model_path))
+            self.shadow.start()
+        self._loop_start = time.perf_counter()
+        
+        # Anneau d'images partagé (lu par l'interface admin, /api/camera/status)
+        if self.frame_ring_enabled:
+            if isinstance(cap, SyntheticCamera):
+                source = "synthétique"
+            elif USE_CSI_CAMERA:
+                source = "CSI"
+            elif isinstance(CAMERA_SOURCE, int):
+                source = f"/dev/video{CAMERA_SOURCE}"
+            else:
+                source = str(CAMERA_SOURCE)
+            self.frame_ring = FrameRingWriter(source=source)
+        
+        # Aperçu MJPEG (utile surtout sans écran)
+        if self.stream_enabled:
+            self.streamer = MjpegStreamer()
+            if not self.streamer.start():
+                self.streamer = None
+        
         print("\n" + "="*50)
+        if not self.show_display:
+            print("Mode sans écran : Ctrl+C pour quitter")
         print("CONTRÔLES :")
         print("  'q' - Quitter")
         print("  's' - Forcer le tri de la détection actuelle")
         print("  'r' - Réinitialiser le compteur de détections")
-        if LEARNING_MODE:
+        if self.learning_mode:
             print("  'c' - Corriger la dernière détection")
         print("  'stats' - Voir les statistiques")
         print("="*50 + "\n")
         
-        fps_time = time.time()
-        fps_counter = 0
-        fps_display = 0
+        # Export des métriques pour l'interface admin (/api/detector/metrics)
+        metrics.reset()
+        metrics.set_gauge("backend", getattr(self.model, "name", INFERENCE_BACKEND))
+        exporter = MetricsExporter(self.metrics_path)
+        exporter.start()
         
         try:
-            while True:
-                # Capturer l'image
-                ret, frame = cap.read()
-                if not ret:
-                    print("✗ Échec de lecture de l'image")
-                    break
-                
-                # Sauvegarder la dernière frame pour corrections
-                self.last_frame = frame.copy()
-                
-                # Exécuter la détection YOLO
-                results = self.detect_waste(frame)
-                detections = self.process_detections(results)
-                
-                # Dessiner les détections
-                if SHOW_DISPLAY:
-                    frame = self.draw_detections(frame, detections)
-                
-                # Vérifier si on doit déclencher le tri
-                if detections:
-                    best_detection = max(detections, key=lambda x: x['confidence'])
-                    
-                    if self.should_trigger_sort(best_detection):
-                        waste_class = best_detection['class']
-                        
-                        # En mode apprentissage, demander confirmation
-                        if LEARNING_MODE:
-                            corrected_class = self.handle_correction(self.last_frame, best_detection)
-                            if corrected_class is None:
-                                continue  # Ignoré par l'utilisateur
-                            waste_class = corrected_class
-                        
-                        print(f"\n🎯 TRI AUTO DÉCLENCHÉ : {waste_class}")
-                        
-                        # Utiliser waste_classifier pour le tri
-                        # ask_if_unknown=True pour permettre d'apprendre
-                        bin_color = waste_classifier.classify_and_sort(
-                            waste_class,
-                            ask_if_unknown=True,
-                            auto_mode=False
-                        )
-                        
-                        if bin_color:
-                            print(f"✓ Trié vers le bac {bin_color}")
-                
-                # Calculer les FPS
-                fps_counter += 1
-                if time.time() - fps_time > 1.0:
-                    fps_display = fps_counter
-                    fps_counter = 0
-                    fps_time = time.time()
-                
-                # Afficher les infos sur l'image
-                if SHOW_DISPLAY:
-                    # Info FPS et détections
-                    info_text = f"FPS: {fps_display} | Detections: {len(detections)}"
-                    cv2.putText(frame, info_text, (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    
-                    # Suivi de détection
-                    if self.last_detection:
-                        status_text = f"Suivi: {self.last_detection['class']} ({self.detection_count}/{MIN_DETECTIONS})"
-                        cv2.putText(frame, status_text, (10, 60), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-                    
-                    # Mode
-                    mode_text = "Mode: Apprentissage" if LEARNING_MODE else "Mode: Auto"
-                    cv2.putText(frame, mode_text, (10, FRAME_HEIGHT - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 255), 2)
-                    
-                    cv2.imshow('Smart Bin - Detection', frame)
-                
-                # Gérer les entrées clavier
-                key = cv2.waitKey(1) & 0xFF
-                
-                if key == ord('q'):
-                    print("\n👋 Arrêt de la détection...")
-                    break
-                
-                elif key == ord('s'):
-                    # Tri manuel forcé
-                    if detections:
-                        best = max(detections, key=lambda x: x['confidence'])
-                        waste_class = best['class']
-                        print(f"\n⚡ TRI MANUEL FORCÉ : {waste_class}")
-                        waste_classifier.classify_and_sort(
-                            waste_class,
-                            ask_if_unknown=True,
-                            auto_mode=False
-                        )
-                
-                elif key == ord('r'):
-                    # Réinitialiser le compteur
-                    self.detection_count = 0
-                    self.last_detection = None
-                    print("\n↻ Compteur de détections réinitialisé")
-                
-                elif key == ord('c') and LEARNING_MODE:
-                    # Corriger la dernière détection
-                    if self.last_detection:
-                        corrected = self.handle_correction(
-                            self.last_frame,
-                            self.last_detection
-                        )
-                        if corrected:
-                            bin_color = waste_classifier.ask_user_for_bin(corrected)
-                            if bin_color:
-                                waste_classifier.save_to_database(corrected, bin_color)
-                
-                # Commande textuelle pour stats
-                # (Note: ne fonctionne que si on redirige stdin, sinon utiliser 's' dans le menu)
+            if PIPELINE_MODE:
+                self.run_pipelined_loop(cap)
+            else:
+                self.run_serial_loop(cap)
         
         except KeyboardInterrupt:
             print("\n\n⚠ Interrompu par l'utilisateur")
         
         finally:
             # Nettoyage
+            exporter.stop()
+            if self.reloader is not None:
+                self.reloader.stop()
+                self.reloader = None
+            if self.shadow is not None:
+                self.shadow.stop()
+                if self.shadow.compared:
+                    print(f"🔍 Modèle candidat : {self.shadow.compared} images comparées "
+                          f"({self.shadow.dropped} ignorées, candidat occupé)")
+                self.shadow = None
+            if self.streamer is not None:
+                self.streamer.stop()
+                self.streamer = None
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+                self.frame_ring = None
             cap.release()
-            if SHOW_DISPLAY:
+            if self.show_display:
                 cv2.destroyAllWindows()
+            if isinstance(self.model, inference_pool.InferencePool):
+                self.model.close()
+            
+            if self.training_writer is not None:
+                writer = self.training_writer
+                writer.close()
+                if writer.saved or writer.deduplicated:
+                    print(f"💾 Images d'apprentissage : {writer.saved} sauvegardées, "
+                          f"{writer.deduplicated} doublons ({writer.dedup_mode})")
+            
+            if self.labeling_writer is not None:
+                self.labeling_writer.close()  # Avant la fermeture de la base
             
             waste_classifier.cleanup()
             
+            if self.motion_gate is not None:
+                gate = self.motion_gate
+                print(f"💤 Inférences évitées (scène statique) : {gate.skipped}/"
+                      f"{gate.skipped + gate.inferred} ({gate.skip_ratio:.0%})")
+            
             print("\n✓ Système de détection arrêté\n")
 
 
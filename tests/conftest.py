@@ -0,0 +1,9 @@
+"""
+Smart Bin SI - Tests unitaires (modules sans caméra, modèle ni Arduino)
+Les modules de src/ s'importent comme depuis src/ (import config, ...).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,96 @@
+"""Anneau d'images partagé : publication, lecture de la dernière case, seqlock."""
+
+import os
+import struct
+from multiprocessing import resource_tracker
+
+import numpy as np
+import pytest
+
+import frame_ring
+from frame_ring import FrameRingWriter
+
+
+@pytest.fixture
+def writer(request):
+    ring = FrameRingWriter(name=f"sb_test_{os.getpid()}_{request.node.name}"[:30],
+                           slots=3, max_detections=4, source="test")
+    yield ring
+    ring.close()
+
+
+def open_reader(name):
+    """
+    Lecteur dans le processus de l'écrivain : le segment est ré-enregistré auprès
+    du resource_tracker (le lecteur le désenregistre, l'écrivain le supprime)
+    """
+    reader = frame_ring.FrameRingReader(name)
+    resource_tracker.register(reader.shm._name, "shared_memory")
+    return reader
+
+
+def frame(value, shape=(8, 12, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_reader_needs_writer():
+    with pytest.raises(FileNotFoundError):
+        frame_ring.FrameRingReader(name=f"sb_missing_{os.getpid()}")
+
+
+def test_latest_frame_and_detections(writer):
+    detections = np.array([[1, 2, 3, 4, 0.9, 1]] * 6, dtype=np.float32)
+    writer.publish(frame(0), detections[:1])
+    writer.publish(frame(7), detections, frame_id=42)
+    reader = open_reader(writer.name)
+    try:
+        view = reader.read_latest()
+        assert view.frame_id == 42
+        assert view.frame.shape == (8, 12, 3)
+        assert (view.frame == 7).all()
+        assert len(view.detections) == 4  # Tronqué à max_detections
+        status = reader.status()
+        assert status["frames"] == 2
+        assert status["source"] == "test"
+        del view
+    finally:
+        reader.close()
+
+
+def test_nothing_published(writer):
+    writer.publish(frame(1), np.zeros((0, 6), np.float32))
+    reader = open_reader(writer.name)
+    try:
+        struct.pack_into("<Q", writer.shm.buf, 32, 0)  # Dernière séquence remise à 0
+        assert reader.read_latest() is None
+    finally:
+        reader.close()
+
+
+def test_view_invalid_after_slot_reuse(writer):
+    writer.publish(frame(1), np.zeros((0, 6), np.float32))
+    reader = open_reader(writer.name)
+    try:
+        view = reader.read_latest()
+        assert view.still_valid()
+        for i in range(writer.slots):  # L'anneau fait un tour : la case est réécrite
+            writer.publish(frame(10 + i), np.zeros((0, 6), np.float32))
+        assert not view.still_valid()
+        assert view.copy() is None
+        del view
+    finally:
+        reader.close()
+
+
+def test_slot_being_written_is_skipped(writer):
+    writer.publish(frame(1), np.zeros((0, 6), np.float32))
+    reader = open_reader(writer.name)
+    try:
+        seq = reader.latest_seq()
+        slot = reader.layout.slot_offset(seq)
+        struct.pack_into("<Q", writer.shm.buf, slot, 2 * seq - 1)  # Écriture en cours (impair)
+        assert reader.read_latest() is None
+        struct.pack_into("<Q", writer.shm.buf, slot, 2 * seq)
+        assert reader.read_latest() is not None
+    finally:
+        reader.close()
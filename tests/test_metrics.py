@@ -0,0 +1,58 @@
+"""Histogrammes de latence : percentiles interpolés, jamais au-delà du maximum."""
+
+import pytest
+
+from metrics import LatencyHistogram, Metrics
+
+
+def histogram(*ms, buckets_ms=(1, 2, 5, 10)):
+    h = LatencyHistogram(buckets_ms)
+    for value in ms:
+        h.observe(value / 1000.0)
+    return h
+
+
+def test_empty_histogram():
+    h = histogram()
+    assert h.percentile(50) == 0.0
+    assert h.snapshot()["mean_ms"] == 0.0
+
+
+def test_percentile_interpolates_inside_bucket():
+    # 4 mesures dans le seau ]2, 5] : le rang 2 tombe à mi-seau
+    h = histogram(3, 3, 4, 5)
+    assert h.percentile(50) == pytest.approx(3.5, abs=1e-3)
+    # Seau plafonné au maximum observé (4.5 au lieu de 5)
+    h = histogram(3, 3, 4, 4.5)
+    assert h.percentile(50) == pytest.approx(3.25, abs=1e-3)
+
+
+def test_percentile_never_exceeds_max():
+    h = histogram(6, 6.5, 7)
+    for q in (50, 90, 99, 100):
+        assert h.percentile(q) <= h.max_ms + 1e-9
+
+
+def test_last_bucket_uses_observed_max():
+    h = histogram(40, 50, buckets_ms=(1, 10))
+    assert h.percentile(100) == pytest.approx(50.0)
+    assert 10.0 <= h.percentile(50) <= 50.0
+
+
+def test_percentiles_are_monotonic():
+    h = histogram(0.5, 1.5, 1.7, 3, 4, 8, 9, 20)
+    values = [h.percentile(q) for q in (10, 25, 50, 75, 90, 99)]
+    assert values == sorted(values)
+
+
+def test_snapshot_counts():
+    m = Metrics()
+    m.observe("inference", 0.004)
+    m.observe("inference", 0.006)
+    m.incr("inferences", 2)
+    snapshot = m.snapshot()
+    stage = snapshot["stages"]["inference"]
+    assert stage["count"] == 2
+    assert stage["mean_ms"] == pytest.approx(5.0)
+    assert stage["max_ms"] == pytest.approx(6.0)
+    assert snapshot["counters"] == {"inferences": 2}
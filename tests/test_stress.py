@@ -0,0 +1,24 @@
+"""Test de charge court : chaque décision de tri arrive en base et sur la série."""
+
+import argparse
+
+import pytest
+
+pytest.importorskip("serial")
+
+import stress_test
+
+
+def test_short_stress_run(tmp_path):
+    args = argparse.Namespace(
+        seconds=2.0, fps=0.0, width=320, height=240, objects_per_minute=600.0,
+        crossing_seconds=0.5, latency_ms=1.0, miss_rate=0.0, seed=0, serial="loop://",
+        sort_duration=0.0, sort_delay=0.0,
+    )
+    report = stress_test.run(args, tmp_path / "stress.db", tmp_path / "metrics.json")
+
+    assert report["frames"] > 0
+    assert report["sort_decisions"] > 0
+    assert sum(report["db_rows"].values()) == report["sort_decisions"]
+    assert report["serial_commands"] == report["db_rows"]
+    assert (tmp_path / "metrics.json").exists()
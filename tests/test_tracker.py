@@ -0,0 +1,86 @@
+"""Suivi multi-objets : association IoU, oubli des pistes, vote de classe."""
+
+import numpy as np
+import pytest
+
+from tracker import IoUTracker, iou_matrix
+
+
+def dets(*rows):
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+    assert iou_matrix(a, b)[0] == pytest.approx([1.0, 50 / 150, 0.0], abs=1e-6)
+
+
+def test_same_object_keeps_its_track():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=False)
+    first = tracker.update(dets([0, 0, 10, 10, 0.9, 0]))
+    second = tracker.update(dets([1, 0, 11, 10, 0.8, 0]))
+    assert len(first) == len(second) == 1
+    assert second[0].id == first[0].id
+    assert second[0].hits == 2
+
+
+def test_distant_detection_starts_new_track():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=False)
+    tracker.update(dets([0, 0, 10, 10, 0.9, 0]))
+    visible = tracker.update(dets([0, 0, 10, 10, 0.9, 0], [50, 50, 60, 60, 0.9, 1]))
+    assert sorted(t.id for t in visible) == [1, 2]
+
+
+def test_greedy_association_prefers_best_iou():
+    tracker = IoUTracker(iou_threshold=0.1, max_misses=2, use_kalman=False)
+    tracker.update(dets([0, 0, 10, 10, 0.9, 0], [8, 0, 18, 10, 0.9, 1]))
+    # La boîte décalée de 1 recouvre surtout la première piste
+    tracker.update(dets([1, 0, 11, 10, 0.9, 0], [9, 0, 19, 10, 0.9, 1]))
+    by_id = {t.id: t for t in tracker.tracks}
+    assert by_id[1].bbox[0] == pytest.approx(1)
+    assert by_id[2].bbox[0] == pytest.approx(9)
+
+
+def test_track_dropped_after_max_misses():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=False)
+    tracker.update(dets([0, 0, 10, 10, 0.9, 0]))
+    for _ in range(2):
+        assert tracker.update(dets()) == []
+        assert len(tracker.tracks) == 1
+    tracker.update(dets())
+    assert tracker.tracks == []
+
+
+def test_ready_tracks_need_hits_and_stable_vote():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=False)
+    box = [0, 0, 10, 10]
+    tracker.update(dets(box + [0.9, 0]))
+    tracker.update(dets(box + [0.9, 1]))
+    assert tracker.ready_tracks(min_hits=2, vote_ratio=0.6) == []  # Vote partagé
+    tracker.update(dets(box + [0.9, 0]))
+    tracker.update(dets(box + [0.9, 0]))
+    ready = tracker.ready_tracks(min_hits=3, vote_ratio=0.6)
+    assert len(ready) == 1
+    assert ready[0].class_id == 0
+    assert ready[0].vote_ratio == pytest.approx(0.75)
+
+
+def test_sorted_track_not_ready_again():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=False)
+    for _ in range(3):
+        tracker.update(dets([0, 0, 10, 10, 0.9, 0]))
+    track = tracker.ready_tracks(min_hits=3, vote_ratio=0.6)[0]
+    track.sorted = True
+    tracker.update(dets([0, 0, 10, 10, 0.9, 0]))
+    assert tracker.ready_tracks(min_hits=3, vote_ratio=0.6) == []
+    assert tracker.active_count == 0
+
+
+def test_kalman_follows_moving_object():
+    tracker = IoUTracker(iou_threshold=0.3, max_misses=2, use_kalman=True)
+    ids = set()
+    for x in range(0, 60, 6):
+        visible = tracker.update(dets([x, 0, x + 20, 20, 0.9, 0]))
+        ids.update(t.id for t in visible)
+    assert ids == {1}
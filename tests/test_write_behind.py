@@ -0,0 +1,96 @@
+"""Écriture différée de l'historique : lots, lectures cohérentes, rien de perdu à l'arrêt."""
+
+import pytest
+
+from storage import Database
+from write_behind import FILL_PER_ITEM, WriteBehindBuffer
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(tmp_path / "waste.db")
+    with database.connection() as conn:
+        conn.executemany("INSERT INTO bin_status (bin_color) VALUES (?)", [("yellow",), ("green",)])
+        conn.execute("INSERT INTO waste_classification (item_name, bin_color, usage_count) "
+                     "VALUES ('can', 'yellow', 1)")
+        conn.commit()
+    yield database
+    database.close()
+
+
+def history_count(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM sorting_history").fetchone()[0]
+
+
+def test_flush_writes_batch(db):
+    writes = WriteBehindBuffer(db, flush_events=100, flush_interval_ms=10_000)
+    for _ in range(3):
+        writes.add_detection("yellow", "can", "2026-01-01T00:00:00", 0.9)
+        writes.add_usage("can")
+    writes.add_detection("green", "peel", "2026-01-01T00:00:01", 0.8)
+    assert history_count(db) == 0
+
+    assert writes.flush() == 5  # 4 lignes d'historique + 1 objet (usage)
+    assert writes.flushed == 4
+    with db.connection() as conn:
+        bins = dict(conn.execute("SELECT bin_color, item_count FROM bin_status").fetchall())
+        fill = conn.execute("SELECT fill_level FROM bin_status WHERE bin_color = 'yellow'").fetchone()[0]
+        usage = conn.execute("SELECT usage_count FROM waste_classification").fetchone()[0]
+    assert bins == {"yellow": 3, "green": 1}
+    assert fill == pytest.approx(3 * FILL_PER_ITEM)
+    assert usage == 4
+    assert writes.flush() == 0
+
+
+def test_read_includes_pending(db):
+    writes = WriteBehindBuffer(db, flush_events=100, flush_interval_ms=10_000)
+    writes.add_detection("yellow", "can", "t", 1.0)
+    writes.add_usage("can")
+    rows, pending = writes.read(lambda conn: conn.execute(
+        "SELECT COUNT(*) FROM sorting_history").fetchone()[0])
+    assert rows == 0
+    assert pending.bin_counts() == {"yellow": 1}
+    assert pending.usage == {"can": 1}
+
+
+def test_close_flushes_remaining(db):
+    writes = WriteBehindBuffer(db, flush_events=100, flush_interval_ms=10_000)
+    writes.start()
+    writes.add_detection("yellow", "can", "t", 1.0)
+    writes.close()
+    assert history_count(db) == 1
+
+
+def test_background_thread_flushes_full_batch(db):
+    writes = WriteBehindBuffer(db, flush_events=2, flush_interval_ms=10_000)
+    writes.start()
+    try:
+        writes.add_detection("yellow", "can", "t", 1.0)
+        writes.add_detection("yellow", "can", "t", 1.0)
+        for _ in range(200):
+            if writes.flushed == 2:
+                break
+            writes._thread.join(0.01)
+        assert writes.flushed == 2
+    finally:
+        writes.close()
+
+
+def test_failed_flush_keeps_batch(db, monkeypatch):
+    writes = WriteBehindBuffer(db, flush_events=100, flush_interval_ms=10_000)
+    writes.add_detection("yellow", "can", "t", 1.0)
+    writes.add_usage("can")
+
+    def locked():
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(db, "connection", locked)
+    assert writes.flush() == 0
+    monkeypatch.undo()
+
+    writes.add_usage("can")
+    assert writes.flush() == 2
+    with db.connection() as conn:
+        usage = conn.execute("SELECT usage_count FROM waste_classification").fetchone()[0]
+    assert history_count(db) == 1
+    assert usage == 3